@@ -15,7 +15,7 @@ import platform
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 
 def now_iso() -> str:
@@ -39,22 +39,15 @@ def gather_runner_metadata() -> Dict[str, Any]:
     }
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument('--mode', required=True)
-    parser.add_argument('--pr-number', required=False, default='manual')
-    parser.add_argument('--pr-author', required=False)
-    parser.add_argument('--commit-sha', required=False)
-    parser.add_argument('--output', required=True)
-    parser.add_argument('--spec-report', required=False)
-    parser.add_argument('--generated-files', required=False)
-    args = parser.parse_args()
-
+def build_audit(mode: str, pr_number: str = 'manual', pr_author: Optional[str] = None,
+                commit_sha: Optional[str] = None, spec_report: Any = None,
+                generated_files: Any = None) -> Dict[str, Any]:
+    """The audit response for already-loaded spec and generated-files reports."""
     out: Dict[str, Any] = {
-        'mode': args.mode,
-        'pr_number': args.pr_number,
-        'pr_author': args.pr_author,
-        'commit_sha': args.commit_sha or os.environ.get('GITHUB_SHA'),
+        'mode': mode,
+        'pr_number': pr_number,
+        'pr_author': pr_author,
+        'commit_sha': commit_sha or os.environ.get('GITHUB_SHA'),
         'timestamps': {
             'audit': now_iso()
         },
@@ -65,16 +58,12 @@ def main():
     }
 
     # Attempt to attach spec report
-    if args.spec_report:
-        spec = load_json_safe(Path(args.spec_report))
-        out['spec_report'] = spec
-        if spec and spec.get('errors'):
-            out['violations'].extend(spec.get('errors'))
+    out['spec_report'] = spec_report
+    if spec_report and spec_report.get('errors'):
+        out['violations'].extend(spec_report.get('errors'))
 
     # Attach generated_files if provided
-    if args.generated_files:
-        gf = load_json_safe(Path(args.generated_files))
-        out['generated_files'] = gf
+    out['generated_files'] = generated_files
 
     # Add environment sourced metadata where available
     out['env'] = {
@@ -82,6 +71,25 @@ def main():
         'github_run_id': os.environ.get('GITHUB_RUN_ID'),
         'github_actor': os.environ.get('GITHUB_ACTOR'),
     }
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', required=True)
+    parser.add_argument('--pr-number', required=False, default='manual')
+    parser.add_argument('--pr-author', required=False)
+    parser.add_argument('--commit-sha', required=False)
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--spec-report', required=False)
+    parser.add_argument('--generated-files', required=False)
+    args = parser.parse_args()
+
+    out = build_audit(
+        args.mode, args.pr_number, args.pr_author, args.commit_sha,
+        spec_report=load_json_safe(Path(args.spec_report)) if args.spec_report else None,
+        generated_files=load_json_safe(Path(args.generated_files)) if args.generated_files else None,
+    )
 
     # Write output
     try:
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Measure worker cold start: import time plus time to first response.
+
+Each run spawns a fresh interpreter that imports ``src.application.main``
+and drives the app directly over ASGI (no HTTP client import in the timed
+path): first ``/v1/ping``, then the first route of every generated
+controller in the manifest. The median over all runs is compared with the
+budget.
+
+Usage: python scripts/benchmark_cold_start.py [--runs N] [--budget-ms MS] [--output PATH]
+
+Exit codes:
+  0 - within budget
+  1 - budget exceeded
+  2 - probe process failed
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET_MS = float(os.environ.get('COLD_START_BUDGET_MS', '1500'))
+
+PROBE = r'''
+import asyncio, json, time
+t0 = time.perf_counter()
+from src.application.main import app
+t1 = time.perf_counter()
+
+async def call(path):
+    status = []
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+             'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '',
+             'query_string': b'', 'headers': [(b'host', b'localhost')],
+             'client': ('127.0.0.1', 1), 'server': ('localhost', 80)}
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+    await app(scope, receive, send)
+    return status[0]
+
+async def main():
+    out = {'import_ms': (t1 - t0) * 1000}
+    start = time.perf_counter()
+    assert await call('/v1/ping') == 200
+    out['first_response_ms'] = (time.perf_counter() - start) * 1000
+    generated = {}
+    for spec in app.state.router_loader.specs:
+        for route in spec.routes:
+            if '{' in route['path']:
+                continue
+            start = time.perf_counter()
+            await call(route['path'])
+            generated[route['path']] = (time.perf_counter() - start) * 1000
+            break
+    out['first_generated_ms'] = generated
+    print(json.dumps(out))
+
+asyncio.run(main())
+'''
+
+
+def run_probe() -> dict:
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        print(proc.stderr)
+        sys.exit(2)
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['process_wall_ms'] = wall_ms
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help='Budget for import + first response (median), default $COLD_START_BUDGET_MS or 1500')
+    parser.add_argument('--output', required=False, help='Optional JSON report path')
+    args = parser.parse_args()
+
+    run_probe()  # populate __pycache__ so runs measure steady-state cold starts
+    runs = [run_probe() for _ in range(args.runs)]
+    cold = [r['import_ms'] + r['first_response_ms'] for r in runs]
+    report = {
+        'runs': runs,
+        'median_import_ms': round(statistics.median(r['import_ms'] for r in runs), 2),
+        'median_first_response_ms': round(statistics.median(r['first_response_ms'] for r in runs), 2),
+        'median_cold_start_ms': round(statistics.median(cold), 2),
+        'median_process_wall_ms': round(statistics.median(r['process_wall_ms'] for r in runs), 2),
+        'budget_ms': args.budget_ms,
+    }
+
+    print('Cold start:')
+    print(f"  import:          {report['median_import_ms']} ms")
+    print(f"  first response:  {report['median_first_response_ms']} ms")
+    print(f"  import + first:  {report['median_cold_start_ms']} ms (budget {args.budget_ms} ms)")
+    print(f"  process wall:    {report['median_process_wall_ms']} ms")
+    for path, ms in runs[-1]['first_generated_ms'].items():
+        print(f"  first {path}: {ms:.2f} ms")
+
+    if args.output:
+        out = Path(args.output)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, indent=2))
+
+    if report['median_cold_start_ms'] > args.budget_ms:
+        print('Cold start budget exceeded')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Benchmark spec generation on a synthetic corpus.
+
+Copies the generator and templates into a temporary tree, writes N synthetic
+features into nested directories (with a mix of ``@cacheable``,
+``@singleflight``, ``@ratelimit``, ``@execution`` and ``@resource`` tags),
+and times ``generate()`` in a fresh interpreter for each phase:
+
+* ``cold_serial``      -- empty tree and bytecode cache, one process
+* ``cold_parallel``    -- empty tree and bytecode cache, process pool
+* ``full_unchanged``   -- full regeneration, every output already up to date
+* ``incremental_noop`` -- ``--incremental`` with nothing changed
+* ``incremental_1pct`` -- ``--incremental`` after editing 1% of the features
+
+The OpenAPI snapshot and resource-estimator steps of ``run()`` are not
+timed; they do not depend on the number of features rendered.
+
+Usage: python scripts/benchmark_generation.py [--features N] [--workers W] [--output PATH]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DRIVER = r'''
+import json, sys, time
+sys.path.insert(0, 'scripts')
+import generate_from_spec as gen
+incremental, workers = sys.argv[1] == '1', int(sys.argv[2])
+start = time.perf_counter()
+entries, changed, reused = gen.generate(incremental=incremental, workers=workers)
+print(json.dumps({'seconds': time.perf_counter() - start, 'features': len(entries),
+                  'regenerated': len(entries) - reused, 'written': len(changed)}))
+'''
+
+FEATURE = '''{feature_tags}Feature: Synthetic {n}
+  In order to exercise the generator
+  As a benchmark
+  I want feature {n}
+
+{scenario_tags}Scenario: Synthetic scenario {n}
+  Given the service is running
+  When I call GET /synthetic_{n}
+  Then I receive a 200 OK
+  And the response contains "n": {n}
+
+Scenario: Second scenario {n}
+  Given the service is running
+  When I call GET /synthetic_{n} twice
+  Then both responses are equal
+'''
+
+TAGS = ['', '@cacheable:ttl=30', '@singleflight:grace_ms=5', '@ratelimit:rate=50',
+        '@execution:policy=thread', '@cacheable @ratelimit:rate=10,burst=20']
+
+
+def write_corpus(root: Path, count: int) -> list:
+    paths = []
+    for n in range(count):
+        path = root / 'features' / f'area_{n % 20:02d}' / f'team_{n % 7}' / f'synthetic_{n}.feature'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tags = TAGS[n % len(TAGS)]
+        path.write_text(FEATURE.format(
+            n=n,
+            feature_tags=f'{tags}\n' if tags else '',
+            scenario_tags=f'@resource:cpu=0.{n % 9 + 1},memory={64 + n % 128},storage=10\n',
+        ))
+        paths.append(path)
+    return paths
+
+
+def reset(root: Path) -> None:
+    for name in ('src', 'tests', 'docs', 'reports'):
+        shutil.rmtree(root / name, ignore_errors=True)
+
+
+def phase(root: Path, incremental: bool, workers: int) -> dict:
+    proc = subprocess.run([sys.executable, '-c', DRIVER, '1' if incremental else '0', str(workers)],
+                          cwd=root, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(proc.stderr)
+        sys.exit(2)
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['seconds'] = round(result['seconds'], 3)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--features', type=int, default=1000, help='Synthetic features to generate (1000-10000)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--output', required=False, help='Optional JSON report path')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='generation-bench-') as tmp:
+        root = Path(tmp)
+        (root / 'scripts').mkdir()
+        for script in ('generate_from_spec.py', 'spec_parser.py'):
+            shutil.copy(ROOT / 'scripts' / script, root / 'scripts')
+        shutil.copytree(ROOT / 'templates', root / 'templates')
+        started = time.perf_counter()
+        corpus = write_corpus(root, args.features)
+        corpus_s = time.perf_counter() - started
+
+        phases = {}
+        phases['cold_serial'] = phase(root, incremental=False, workers=1)
+        reset(root)
+        phases['cold_parallel'] = phase(root, incremental=False, workers=args.workers)
+        phases['full_unchanged'] = phase(root, incremental=False, workers=args.workers)
+        phases['incremental_noop'] = phase(root, incremental=True, workers=args.workers)
+        for path in corpus[::100]:
+            path.write_text(path.read_text().replace('twice', 'three times'))
+        phases['incremental_1pct'] = phase(root, incremental=True, workers=args.workers)
+
+    report = {'features': args.features, 'workers': args.workers,
+              'corpus_seconds': round(corpus_s, 3), 'phases': phases}
+    print(f'Generation, {args.features} features, {args.workers} workers:')
+    for name, result in phases.items():
+        per_feature_ms = result['seconds'] / args.features * 1000
+        print(f"  {name:18} {result['seconds']:8.3f} s  {per_feature_ms:7.3f} ms/feature  "
+              f"{result['regenerated']:6} rendered  {result['written']:6} written")
+
+    if args.output:
+        out = Path(args.output)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Compare the static-response /healthz and /v1/ping handlers against the
+original per-request dict handlers.
+
+Both variants are driven in-process through httpx's ASGI transport so the
+numbers isolate framework + handler cost from the network stack.
+
+Usage: python scripts/benchmark_static_responses.py [--requests N] [--concurrency C] [--output PATH]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+try:
+    import httpx
+    from fastapi import FastAPI
+except Exception:
+    print('Missing dependency: fastapi/httpx. Install with `pip install -r requirements.txt`')
+    sys.exit(2)
+
+from src.application.main import add_probe_routes  # noqa: E402
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+async def drive(app: FastAPI, path: str, requests: int, concurrency: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        # warm up routing and connection objects before measuring
+        for _ in range(50):
+            await client.get(path)
+
+        remaining = requests
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                r = await client.get(path)
+                latencies.append(time.perf_counter() - start)
+                if r.status_code != 200:
+                    raise RuntimeError(f'{path} returned {r.status_code}')
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def build(static: bool) -> FastAPI:
+    app = FastAPI()
+    add_probe_routes(app, static=static)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--output', required=False, help='Optional JSON report path')
+    args = parser.parse_args()
+
+    results = {}
+    for path in ('/healthz', '/v1/ping'):
+        results[path] = {
+            'dynamic': asyncio.run(drive(build(False), path, args.requests, args.concurrency)),
+            'static': asyncio.run(drive(build(True), path, args.requests, args.concurrency)),
+        }
+
+    print(f"{'route':<10} {'mode':<8} {'rps':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for path, modes in results.items():
+        for mode, r in modes.items():
+            print(f"{path:<10} {mode:<8} {r['rps']:>10} {r['p50_ms']:>9} {r['p99_ms']:>9}")
+        speedup = modes['static']['rps'] / modes['dynamic']['rps']
+        print(f"{path:<10} speedup  {speedup:>10.2f}x")
+
+    if args.output:
+        out = Path(args.output)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(results, indent=2))
+        print('Benchmark written to', out)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Benchmark spec validation on a large, deeply nested synthetic tree.
+
+Writes N synthetic features into a temporary monorepo-shaped tree (several
+levels of nesting, 1-12 scenarios per file, and about 2% invalid files
+missing a ``Then`` step) and times, in a fresh interpreter each:
+
+* ``validate_serial``  -- ``SpecValidator.validate_all`` with one process
+* ``validate_sharded`` -- the same, sharded across ``--workers`` processes
+* ``coverage_serial``  -- ``validate_spec_coverage.check_report``, one process
+* ``coverage_sharded`` -- the same, sharded
+
+The serial and sharded runs must agree exactly (combined SHA, validity,
+per-feature report and violations); the benchmark exits 1 if they do not.
+
+Usage: python scripts/benchmark_validation.py [--features N] [--workers W] [--output PATH]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DRIVER = r'''
+import hashlib, json, logging, sys, time
+from pathlib import Path
+sys.path.insert(0, 'scripts')
+logging.disable(logging.CRITICAL)
+import spec_parser
+tool, workers = sys.argv[1], int(sys.argv[2])
+start = time.perf_counter()
+if tool == 'validate':
+    from validate_specs import SpecValidator
+    validator = SpecValidator('features', 'reports/' + sys.argv[2])
+    valid = validator.validate_all(workers=workers)
+    seconds = time.perf_counter() - start
+    report = json.loads(validator.coverage_report_path.read_text())
+    report.pop('timestamp', None)
+    result = {'valid': valid, 'combined_sha': validator.coverage_report_path.parent.name, 'report': report}
+else:
+    from validate_spec_coverage import check_report
+    violations = check_report({}, spec_parser.discover(Path('features')), workers=workers)
+    seconds = time.perf_counter() - start
+    result = {'violations': violations}
+digest = hashlib.sha256(json.dumps(result, sort_keys=True).encode()).hexdigest()
+print(json.dumps({'seconds': seconds, 'digest': digest, 'valid': result.get('valid'),
+                  'combined_sha': result.get('combined_sha'),
+                  'violations': len(result.get('violations', []))}))
+'''
+
+STEPS = '''  Given the service is running
+  When I call GET /synthetic_{n}/{s}
+  Then I receive a 200 OK
+  And the response contains "n": {n}
+'''
+
+
+def write_corpus(root: Path, count: int) -> int:
+    invalid = 0
+    for n in range(count):
+        parts = [f'org_{n % 5}', f'domain_{n % 11:02d}', f'service_{n % 37:02d}']
+        parts += [f'module_{n % 3}'] * (n % 2)  # mixed depths
+        path = root / 'features' / Path(*parts) / f'synthetic_{n}.feature'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        body = [f'@resource:cpu=0.{n % 9 + 1},memory={64 + n % 128},storage=10',
+                f'Feature: Synthetic {n}', '  In order to exercise the validator', '']
+        for s in range(n % 12 + 1):
+            steps = STEPS.format(n=n, s=s)
+            if n % 50 == 7 and s == 0:
+                steps = steps.replace('Then', 'And')  # no Then: invalid in both tools
+                invalid += 1
+            body += [f'Scenario: Synthetic scenario {n}.{s}', steps]
+        path.write_text('\n'.join(body))
+    return invalid
+
+
+def phase(root: Path, tool: str, workers: int) -> dict:
+    proc = subprocess.run([sys.executable, '-c', DRIVER, tool, str(workers)],
+                          cwd=root, capture_output=True, text=True,
+                          env=dict(os.environ, SPEC_CACHE='0'))
+    if proc.returncode != 0:
+        print(proc.stderr)
+        sys.exit(2)
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['seconds'] = round(result['seconds'], 3)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--features', type=int, default=5000, help='Synthetic features to validate')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--output', required=False, help='Optional JSON report path')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='validation-bench-') as tmp:
+        root = Path(tmp)
+        (root / 'scripts').mkdir()
+        for script in ('validate_specs.py', 'validate_spec_coverage.py', 'spec_parser.py'):
+            shutil.copy(ROOT / 'scripts' / script, root / 'scripts')
+        invalid = write_corpus(root, args.features)
+
+        phases = {}
+        for tool in ('validate', 'coverage'):
+            phases[f'{tool}_serial'] = phase(root, tool, workers=1)
+            phases[f'{tool}_sharded'] = phase(root, tool, workers=args.workers)
+
+    mismatched = [tool for tool in ('validate', 'coverage')
+                  if phases[f'{tool}_serial']['digest'] != phases[f'{tool}_sharded']['digest']]
+    report = {'features': args.features, 'workers': args.workers, 'invalid_files': invalid,
+              'deterministic': not mismatched, 'phases': phases}
+    print(f'Validation, {args.features} features ({invalid} invalid), {args.workers} workers:')
+    for name, result in phases.items():
+        per_feature_ms = result['seconds'] / args.features * 1000
+        print(f"  {name:18} {result['seconds']:8.3f} s  {per_feature_ms:7.3f} ms/feature  {result['digest'][:12]}")
+    if mismatched:
+        print('Serial and sharded results differ for:', ', '.join(mismatched), file=sys.stderr)
+
+    if args.output:
+        out = Path(args.output)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, indent=2))
+    return 1 if mismatched else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,22 +1,79 @@
 #!/usr/bin/env python3
 """Generate hexagonal code, tests, and docs from .feature BDD files using Jinja2 templates.
 
-Usage: python scripts/generate_from_spec.py
+Usage: python scripts/generate_from_spec.py [--incremental] [--workers N]
+
+Every run records what it generated in ``reports/generation-manifest.json``:
+for each feature file, its content hash, its coverage numbers and the
+outputs it owns, plus one hash over the templates, this script and the
+Gherkin parser (scripts/spec_parser.py). With ``--incremental``, a feature
+whose hash and template hash both match the manifest (and whose outputs
+still exist) is neither parsed nor rendered. In either mode an output is
+written only when its bytes differ, so unchanged files keep their mtimes.
+Outputs and route-manifest entries that belonged to features that were
+deleted or renamed are removed. A feature that fails validation keeps the
+outputs and route it generated last time.
+
+Templates are compiled once per process (with an on-disk bytecode cache in
+``reports/.jinja-cache``). Features are parsed and rendered in a process
+pool once there are enough of them. The parent then writes all outputs and
+the route manifest in one batch.
 """
+import argparse
+import hashlib
 import json
 import os
 from pathlib import Path
+import shutil
+import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 try:
-    from jinja2 import Environment, FileSystemLoader
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 except Exception:
     print('Missing dependency: jinja2. Install with `pip install jinja2`')
     sys.exit(2)
 
+import spec_parser  # noqa: E402  (scripts/ is on sys.path when run as a script)
+
 ROOT = Path(__file__).resolve().parent.parent
 TEMPLATES_DIR = ROOT / 'templates'
 REPORTS_DIR = ROOT / 'reports'
+ROUTE_MANIFEST = ROOT / 'src/adapters/http/routes.json'
+GENERATION_MANIFEST = REPORTS_DIR / 'generation-manifest.json'
+TEMPLATE_CACHE = REPORTS_DIR / '.jinja-cache'
+TEMPLATES = ('service.py.j2', 'controller.py.j2', 'unit_test.py.j2', 'integration_test.py.j2', 'docs.md.j2')
+# Below this many features to render, starting worker processes costs more than it saves.
+PARALLEL_THRESHOLD = 64
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Write ``text`` unless ``path`` already holds exactly those bytes; True if written."""
+    data = text.encode()
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.write_bytes(data)
+    return True
+
+
+def templates_hash() -> str:
+    """One hash over every template, this script and the parser (which decide what is rendered)."""
+    digest = hashlib.sha256()
+    for path in sorted(TEMPLATES_DIR.rglob('*')) + [Path(__file__).resolve(), Path(spec_parser.__file__)]:
+        if path.is_file():
+            digest.update(path.name.encode() + b'\0' + path.read_bytes() + b'\0')
+    return digest.hexdigest()
+
+
+def load_generation_manifest() -> dict:
+    try:
+        return json.loads(GENERATION_MANIFEST.read_text())
+    except (OSError, ValueError):
+        return {}
 
 
 def slugify(name: str) -> str:
@@ -27,155 +84,383 @@ def titleize(name: str) -> str:
     return ''.join(part.capitalize() for part in name.split('_'))
 
 
-def parse_feature(path: Path):
-    text = path.read_text()
-    feature = None
-    scenarios = []
-    lines = text.splitlines()
-    cur_scenario = None
-    for i, raw in enumerate(lines, 1):
-        line = raw.strip()
-        if line.startswith('Feature:'):
-            feature = line.split(':', 1)[1].strip()
-        elif line.startswith('Scenario:'):
-            if cur_scenario:
-                scenarios.append(cur_scenario)
-            cur_scenario = {'title': line.split(':', 1)[1].strip(), 'line': i, 'steps': []}
-        elif cur_scenario and (line.startswith('Given ') or line.startswith('When ') or line.startswith('Then ') or line.startswith('And ')):
-            cur_scenario['steps'].append(line)
-    if cur_scenario:
-        scenarios.append(cur_scenario)
-    return feature, scenarios
+def parse_feature(path: Path, data: bytes = None, sha: str = None):
+    """``(feature name, scenarios, feature tags)`` from the shared Gherkin parser (scripts/spec_parser.py)."""
+    feature = spec_parser.parse_bytes(Path(path).read_bytes() if data is None else data, str(path), sha)
+    return feature.name, feature.scenarios, feature.tags
+
+
+def tag_options(feature_tags, scenarios, name):
+    """Options of ``@name`` / ``@name:k=v,...`` on the feature or any scenario, else None."""
+    for tag in list(feature_tags) + [t for s in scenarios for t in s.tags]:
+        tag_name, _, args = tag[1:].partition(':')
+        if tag_name == name:
+            return dict(kv.split('=', 1) for kv in args.split(',') if '=' in kv)
+    return None
+
+
+def resource_budget(feature_tags, scenarios):
+    """Per-route runtime budget from ``@resource`` tags: the largest value of each key, else None."""
+    keys = {'cpu': 'cpu', 'memory': 'memory_mib', 'storage': 'storage_mib'}
+    budget = {}
+    for tag in list(feature_tags) + [t for s in scenarios for t in s.tags]:
+        tag_name, _, args = tag[1:].partition(':')
+        if tag_name != 'resource':
+            continue
+        for kv in args.split(','):
+            key, _, value = kv.partition('=')
+            if key in keys:
+                try:
+                    budget[keys[key]] = max(float(value), budget.get(keys[key], 0.0))
+                except ValueError:
+                    continue
+    return budget or None
 
 
 def validate_scenarios(scenarios):
     issues = []
     implemented = 0
     for s in scenarios:
-        has_given = any(st.startswith('Given ') for st in s['steps'])
-        has_when = any(st.startswith('When ') for st in s['steps'])
-        has_then = any(st.startswith('Then ') for st in s['steps'])
-        if not (has_given and has_when and has_then):
-            issues.append({'line': s['line'], 'title': s['title'], 'issue': 'Incomplete scenario steps'})
+        if not (s.has('given') and s.has('when') and s.has('then')):
+            issues.append({'line': s.line, 'title': s.title, 'issue': 'Incomplete scenario steps'})
         else:
             implemented += 1
     return implemented, issues
 
 
-def render_templates(feature_name, scenarios):
-    env = Environment(loader=FileSystemLoader(str(TEMPLATES_DIR)), keep_trailing_newline=True)
+def load_route_manifest():
+    if ROUTE_MANIFEST.exists():
+        return json.loads(ROUTE_MANIFEST.read_text())
+    return {'version': 1, 'routers': []}
+
+
+def apply_route_entry(manifest, feature_name, slug, paths, rate_limit=None, budget=None, execution=None):
+    """Add or refresh one controller entry in a loaded route manifest."""
+    module = f'src.adapters.http.{slug}_controller'
+    entry = next((r for r in manifest['routers'] if r['module'] == module), None)
+    if entry is None:
+        entry = {'feature': feature_name, 'module': module, 'attr': 'router', 'load': 'background'}
+        manifest['routers'].append(entry)
+    entry['feature'] = feature_name
+    entry['routes'] = [{'path': p, 'methods': ['GET']} for p in paths]
+    if rate_limit:
+        entry['rate_limit'] = {k: float(v) for k, v in rate_limit.items()}
+    else:
+        entry.pop('rate_limit', None)  # the @ratelimit tag was removed
+    if execution in ('thread', 'process'):
+        entry['execution'] = execution  # the launcher sizes for the process pool
+    else:
+        entry.pop('execution', None)
+    if budget:
+        entry['budget'] = budget
+    else:
+        entry.pop('budget', None)  # the @resource tags were removed
+
+
+def write_route_manifest(manifest):
+    """Write the route manifest (sorted by module); returns True if the file changed."""
+    manifest['routers'].sort(key=lambda r: r['module'])
+    ROUTE_MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    return write_if_changed(ROUTE_MANIFEST, json.dumps(manifest, indent=2) + '\n')
+
+
+def update_route_manifest(feature_name, slug, paths, rate_limit=None, budget=None, execution=None):
+    """Add or refresh the controller entry in src/adapters/http/routes.json.
+
+    Hand-edited fields (such as ``load``) on an existing entry are preserved.
+    ``rate_limit`` (from an ``@ratelimit`` tag) and ``budget`` (from
+    ``@resource`` tags) replace the entry's limit and runtime budget, and
+    remove them when None. Returns True if the file changed.
+    """
+    manifest = load_route_manifest()
+    apply_route_entry(manifest, feature_name, slug, paths, rate_limit, budget, execution)
+    return write_route_manifest(manifest)
+
+
+def prune_route_manifest(modules):
+    """Drop the controller entries for ``modules``; returns True if the file changed."""
+    if not modules or not ROUTE_MANIFEST.exists():
+        return False
+    manifest = load_route_manifest()
+    manifest['routers'] = [r for r in manifest['routers'] if r['module'] not in modules]
+    return write_route_manifest(manifest)
+
+
+_env = None
+
+
+def template_env():
+    """The process-wide Jinja environment: templates compile once, bytecode is cached on disk.
+
+    Worker processes forked after the parent built it inherit the compiled
+    templates. Spawned workers load them from ``reports/.jinja-cache`` instead
+    of compiling again.
+    """
+    global _env
+    if _env is None:
+        TEMPLATE_CACHE.mkdir(parents=True, exist_ok=True)
+        _env = Environment(loader=FileSystemLoader(str(TEMPLATES_DIR)), keep_trailing_newline=True,
+                           bytecode_cache=FileSystemBytecodeCache(str(TEMPLATE_CACHE)))
+        for name in TEMPLATES:
+            _env.get_template(name)
+    return _env
+
+
+def render_feature(feature_name, scenarios, feature_tags=()):
+    """Render one feature's outputs without writing them.
+
+    Returns ``(files, route)``: ``(path relative to ROOT, text)`` pairs and the
+    arguments for its route-manifest entry.
+    """
+    env = template_env()
     slug = slugify(feature_name)
     title = titleize(slug)
 
-    outputs = []
-
-    # core service
-    tpl = env.get_template('service.py.j2')
-    core_path = ROOT / f'src/core/{slug}'
-    core_path.mkdir(parents=True, exist_ok=True)
-    service_file = core_path / 'service.py'
-    service_file.write_text(tpl.render(class_name=f'{title}Service'))
-    outputs.append(str(service_file))
-
-    # adapter controller
-    tpl = env.get_template('controller.py.j2')
-    adapters_path = ROOT / f'src/adapters/http'
-    adapters_path.mkdir(parents=True, exist_ok=True)
-    controller_file = adapters_path / f'{slug}_controller.py'
-    controller_file.write_text(tpl.render(endpoint='/' + slug, class_name=f'{title}Service'))
-    outputs.append(str(controller_file))
-
-    # ensure src/main.py exists and includes router
-    main_file = ROOT / 'src/main.py'
-    if not main_file.exists():
-        main_file.parent.mkdir(parents=True, exist_ok=True)
-        main_file.write_text('from fastapi import FastAPI\n\napp = FastAPI()\n')
-        outputs.append(str(main_file))
-    # append import/include if not present
-    main_text = main_file.read_text()
-    include_line = f"from src.adapters.http.{slug}_controller import router as {slug}_router"
-    include_router = f"app.include_router({slug}_router)"
-    if include_line not in main_text:
-        main_file.write_text(main_text + '\n' + include_line + '\n' + include_router + '\n')
-
-    # unit test
-    tpl = env.get_template('unit_test.py.j2')
-    tests_unit_path = ROOT / 'tests/unit'
-    tests_unit_path.mkdir(parents=True, exist_ok=True)
-    unit_file = tests_unit_path / f'test_{slug}_service.py'
-    unit_file.write_text(tpl.render(class_name=f'{title}Service', module=f'src.core.{slug}.service'))
-    outputs.append(str(unit_file))
-
-    # integration test
-    tpl = env.get_template('integration_test.py.j2')
-    tests_integ_path = ROOT / 'tests/integration'
-    tests_integ_path.mkdir(parents=True, exist_ok=True)
-    integ_file = tests_integ_path / f'test_{slug}_endpoint.py'
-    integ_file.write_text(tpl.render(endpoint='/' + slug))
-    outputs.append(str(integ_file))
-
-    # docs
-    tpl = env.get_template('docs.md.j2')
-    docs_path = ROOT / 'docs'
-    docs_path.mkdir(parents=True, exist_ok=True)
-    docs_file = docs_path / f'{slug}.md'
-    docs_file.write_text(tpl.render(feature=feature_name))
-    outputs.append(str(docs_file))
-
-    return outputs
-
-
-def run():
-    features = list((ROOT / 'features').rglob('*.feature'))
-    if not features:
-        print('No feature files found under features/. Create features/*.feature to generate code.')
-        return 1
+    cacheable = tag_options(feature_tags, scenarios, 'cacheable')
+    cache_options = dict(
+        cacheable=cacheable is not None,
+        cache_ttl=float((cacheable or {}).get('ttl', 60)),
+        cache_maxsize=int((cacheable or {}).get('maxsize', 128)),
+    )
+    execution = (tag_options(feature_tags, scenarios, 'execution') or {}).get('policy', 'inline')
+    singleflight = tag_options(feature_tags, scenarios, 'singleflight')
+
+    files = [
+        # core service
+        (f'src/core/{slug}/service.py', env.get_template('service.py.j2').render(
+            class_name=f'{title}Service', execution=execution)),
+        # adapter controller
+        (f'src/adapters/http/{slug}_controller.py', env.get_template('controller.py.j2').render(
+            endpoint='/' + slug,
+            class_name=f'{title}Service',
+            model_name=f'{title}Response',
+            singleflight=singleflight is not None,
+            singleflight_grace=int((singleflight or {}).get('grace_ms', 5)) / 1000,
+            **cache_options,
+        )),
+        # unit test
+        (f'tests/unit/test_{slug}_service.py', env.get_template('unit_test.py.j2').render(
+            class_name=f'{title}Service', module=f'src.core.{slug}.service', execution=execution)),
+        # integration test
+        (f'tests/integration/test_{slug}_endpoint.py', env.get_template('integration_test.py.j2').render(
+            endpoint='/' + slug)),
+        # docs
+        (f'docs/{slug}.md', env.get_template('docs.md.j2').render(feature=feature_name)),
+    ]
+    # the controller's entry in the router manifest read by create_app()
+    route = dict(feature_name=feature_name, slug=slug, paths=['/' + slug],
+                 rate_limit=tag_options(feature_tags, scenarios, 'ratelimit'),
+                 budget=resource_budget(feature_tags, scenarios), execution=execution)
+    return files, route
+
+
+def write_outputs(files, changed):
+    """Write rendered ``(relative path, text)`` pairs in one pass, creating each directory once."""
+    for directory in {(ROOT / rel).parent for rel, _ in files}:
+        directory.mkdir(parents=True, exist_ok=True)
+    for rel, text in files:
+        path = ROOT / rel
+        if write_if_changed(path, text):
+            changed.append(str(path))
+
+
+def render_templates(feature_name, scenarios, feature_tags=(), changed=None):
+    """Render and write one feature's outputs; paths actually rewritten are appended to ``changed``."""
+    changed = [] if changed is None else changed
+    files, route = render_feature(feature_name, scenarios, feature_tags)
+    write_outputs(files, changed)
+    if update_route_manifest(**route):
+        changed.append(str(ROUTE_MANIFEST))
+    return [str(ROOT / rel) for rel, _ in files]
+
+
+def build_feature(path: Path, sha: str, data: bytes = None, feature: spec_parser.Feature = None):
+    """Parse, validate and render one feature file (runs in a worker process).
+
+    An already-parsed ``feature`` is used as is. Returns its
+    generation-manifest entry, its rendered files and its route entry (None
+    when the feature has issues).
+    """
+    if feature is None:
+        feature_name, scenarios, feature_tags = parse_feature(path, data, sha)
+    else:
+        feature_name, scenarios, feature_tags = feature.name, feature.scenarios, feature.tags
+    entry = {'sha': sha, 'feature': feature_name, 'scenarios': 0, 'implemented': 0,
+             'errors': [], 'outputs': [], 'module': None}
+    if not feature_name:
+        entry['errors'].append({'file': str(path), 'issue': 'Missing Feature title'})
+        return entry, [], None
+    implemented, issues = validate_scenarios(scenarios)
+    entry['scenarios'], entry['implemented'] = len(scenarios), implemented
+    if issues:
+        for it in issues:
+            e = {'file': str(path), 'line': it['line'], 'issue': it['issue']}
+            entry['errors'].append(e)
+        # Fail generation if there are missing steps
+        print(f'Found issues in {path}:', issues)
+        return entry, [], None
+
+    files, route = render_feature(feature_name, scenarios, feature_tags)
+    entry['outputs'] = [rel for rel, _ in files]
+    entry['module'] = f"src.adapters.http.{route['slug']}_controller"
+    return entry, files, route
+
+
+def _build_job(job):
+    return build_feature(*job)
+
+
+def build_features(jobs, workers=None, mp_context=None):
+    """``build_feature`` over ``(path, sha, data, feature)`` jobs, in a process pool when there are enough of them.
+
+    Pass a forkserver/spawn ``mp_context`` when the caller runs other threads:
+    forking a threaded process can copy locks held by those threads.
+    """
+    workers = workers or int(os.environ.get('GENERATION_WORKERS') or os.cpu_count() or 1)
+    # Forked workers inherit these compiled templates; the bytecode cache written here
+    # lets forkserver/spawn workers, which warm up in the initializer, skip compiling.
+    template_env()
+    if workers <= 1 or len(jobs) < PARALLEL_THRESHOLD:
+        return [build_feature(*job) for job in jobs]
+    with ProcessPoolExecutor(min(workers, len(jobs)), mp_context=mp_context, initializer=template_env) as pool:
+        return list(pool.map(_build_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def generate(incremental=False, workers=None, mp_context=None, features=None):
+    """Generate every feature under features/ and prune what deleted features owned.
+
+    ``features`` maps each feature file to its already-parsed
+    ``spec_parser.Feature`` (as from ``spec_parser.parse_many``); those files
+    are then neither read nor hashed again, and the workers get the parsed
+    feature instead of the file's bytes. Returns the per-feature manifest
+    entries, the paths written or removed, and the number of features reused
+    from the previous run. Raises ValueError when there are no features at all.
+    """
+    parsed = features or {}
+    paths = list(parsed) if features is not None else spec_parser.discover(ROOT / 'features')
+    if not paths:
+        # an empty or missing checkout would otherwise prune every generated file
+        raise ValueError('No feature files to generate from; refusing to prune the generated tree')
+    changed = []
+    reused = 0
+
+    previous = load_generation_manifest()
+    template_sha = templates_hash()
+    reusable = previous.get('features', {}) if previous.get('templates_sha') == template_sha else {}
+    entries = {}
+    jobs = []
+
+    for f in paths:
+        key = f.relative_to(ROOT).as_posix()
+        feature = parsed.get(f)
+        if feature is None:
+            data = f.read_bytes()
+            sha = hashlib.sha256(data).hexdigest()
+        else:
+            data, sha = None, feature.sha
+        entry = reusable.get(key)
+        if (incremental and entry and entry['sha'] == sha
+                and all((ROOT / o).exists() for o in entry['outputs'])):
+            entries[key] = entry
+            reused += 1
+        else:
+            entries[key] = None  # keeps the features' order
+            jobs.append((f, sha, data, feature))
+
+    # render in parallel, then write everything (and the route manifest once) from this process
+    routes = load_route_manifest()
+    files = []
+    for (f, _, _, _), (entry, rendered, route) in zip(jobs, build_features(jobs, workers, mp_context)):
+        key = f.relative_to(ROOT).as_posix()
+        entries[key] = entry
+        files.extend(rendered)
+        if route:
+            apply_route_entry(routes, **route)
+        elif key in previous.get('features', {}):
+            # a feature that stopped validating keeps what it generated until it is fixed
+            last = previous['features'][key]
+            entry['outputs'], entry['module'] = last['outputs'], last.get('module')
+    write_outputs(files, changed)
+
+    # remove what deleted or renamed features used to own
+    owned = {o for e in entries.values() for o in e['outputs']}
+    stale = {o for e in previous.get('features', {}).values() for o in e['outputs']} - owned
+    for output in sorted(stale):
+        path = ROOT / output
+        if path.exists():
+            path.unlink()
+            changed.append(str(path))
+            package = path.parent
+            if package.parent == ROOT / 'src/core' and all(p.name == '__pycache__' for p in package.iterdir()):
+                shutil.rmtree(package)  # the feature's core package
+    modules = {e['module'] for e in entries.values()}
+    gone = {e['module'] for e in previous.get('features', {}).values() if e.get('module')} - modules
+    routes['routers'] = [r for r in routes['routers'] if r['module'] not in gone]
+    if (jobs or gone) and write_route_manifest(routes):
+        changed.append(str(ROUTE_MANIFEST))
 
     REPORTS_DIR.mkdir(parents=True, exist_ok=True)
-    all_generated = []
-    total = 0
-    total_impl = 0
-    errors = []
-
-    for f in features:
-        feature_name, scenarios = parse_feature(f)
-        if not feature_name:
-            errors.append({'file': str(f), 'issue': 'Missing Feature title'})
-            continue
-        implemented, issues = validate_scenarios(scenarios)
-        total += len(scenarios)
-        total_impl += implemented
-        if issues:
-            for it in issues:
-                e = {'file': str(f), 'line': it['line'], 'issue': it['issue']}
-                errors.append(e)
-            # Fail generation if there are missing steps
-            print(f'Found issues in {f}:', issues)
-            continue
+    with open(GENERATION_MANIFEST, 'w') as fh:
+        json.dump({'version': 1, 'templates_sha': template_sha, 'features': entries}, fh, indent=2)
+    return entries, changed, reused
 
-        outputs = render_templates(feature_name, scenarios)
-        all_generated.extend(outputs)
 
+def coverage_report(entries):
+    """The spec-coverage report for ``generate()``'s entries."""
+    total = sum(e['scenarios'] for e in entries.values())
+    total_impl = sum(e['implemented'] for e in entries.values())
     spec_coverage = round((total_impl / total * 100) if total > 0 else 0, 2)
-    report = {
+    return {
         'spec_coverage': spec_coverage,
         'total_scenarios': total,
         'implemented_scenarios': total_impl,
-        'errors': errors,
-        'generated_files': all_generated,
+        'errors': [e for entry in entries.values() for e in entry['errors']],
+        'generated_files': [str(ROOT / o) for e in entries.values() for o in e['outputs']],
     }
+
+
+def run(incremental=False, workers=None):
+    if not spec_parser.discover(ROOT / 'features'):
+        print('No feature files found under features/. Create features/*.feature to generate code.')
+        return 1
+
+    entries, changed, reused = generate(incremental, workers)
+    report = coverage_report(entries)
+    all_generated = list(report['generated_files'])
     with open(REPORTS_DIR / 'spec-coverage.json', 'w') as fh:
         json.dump(report, fh, indent=2)
 
-    # run resource estimator
-    os.system(f'python {ROOT / "scripts/resource_estimator.py"}')
+    # snapshot the OpenAPI document for the routes just generated (src/application/openapi_snapshot.py)
+    openapi = ROUTE_MANIFEST.with_name('openapi.json')
+    if changed or not incremental or not openapi.exists():
+        snapshot = subprocess.run([sys.executable, '-m', 'src.application.openapi_snapshot'], cwd=ROOT)
+        if snapshot.returncode != 0:
+            print('OpenAPI snapshot failed; /openapi.json will be generated at runtime')
+    if openapi.exists():
+        all_generated.append(str(openapi))
+
+    # run resource estimator (in this process: the features are already parsed)
+    import resource_estimator
+    resource_estimator.estimate()
 
     with open(REPORTS_DIR / 'generated_files.json', 'w') as fh:
         json.dump(all_generated, fh, indent=2)
 
+    print(f'{len(entries) - reused} features regenerated, {reused} unchanged, '
+          f'{len(changed)} files written or removed')
     print('Generation complete. Report written to', REPORTS_DIR / 'spec-coverage.json')
     return 0
 
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate code, tests and docs from features/*.feature')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Skip features whose content and templates are unchanged since the last run')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Rendering processes (default $GENERATION_WORKERS or the CPU count; 1 disables the pool)')
+    args = parser.parse_args(argv)
+    return run(incremental=args.incremental, workers=args.workers)
+
+
 if __name__ == '__main__':
-    sys.exit(run())
+    sys.exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Load generation against a running copy of the service.
+
+Shared by ``scripts/resource_estimator.py --measure`` and the benchmarks in
+``tests/benchmark`` (whose harness re-exports it):
+
+* ``UvicornServer`` serves the app from a local uvicorn process for the
+  duration of a ``with`` block.
+* ``closed_loop`` drives a real HTTP server with a fixed number of
+  connections, each issuing its next request as soon as the previous one
+  completes.
+* ``rss_mib`` reads a process's resident memory, ``slope`` fits a
+  least-squares line through samples.
+
+Defaults come from ``BENCH_CONCURRENCY`` (16) and ``BENCH_DURATION`` (3s).
+Needs httpx.
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+ROUTE_MANIFEST = ROOT / 'src' / 'adapters' / 'http' / 'routes.json'
+
+CONCURRENCY = int(os.environ.get('BENCH_CONCURRENCY', '16'))
+DURATION = float(os.environ.get('BENCH_DURATION', '3'))
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def rss_mib(pid: Optional[int] = None) -> float:
+    status = Path(f'/proc/{pid or "self"}/status')
+    try:
+        for line in status.read_text().splitlines():
+            if line.startswith('VmRSS:'):
+                return round(int(line.split()[1]) / 1024, 2)
+    except OSError:
+        pass
+    import resource
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2)
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int, rss: float) -> Dict[str, float]:
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'rss_mib': rss,
+    }
+
+
+async def run_workers(client: httpx.AsyncClient, path: str, concurrency: int,
+                       requests: Optional[int] = None, duration: Optional[float] = None):
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker():
+        nonlocal remaining, errors
+        while True:
+            if remaining is not None:
+                if remaining <= 0:
+                    return
+                remaining -= 1
+            elif time.perf_counter() >= deadline:
+                return
+            start = time.perf_counter()
+            r = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            if r.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started, errors
+
+
+def closed_loop(base_url: str, path: str, concurrency: int = CONCURRENCY, duration: float = DURATION,
+                server_pid: Optional[int] = None) -> Dict[str, float]:
+    async def run():
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+            await run_workers(client, path, concurrency, requests=concurrency * 10)  # open connections
+            return await run_workers(client, path, concurrency, duration=duration)
+
+    latencies, elapsed, errors = asyncio.run(run())
+    return summarize(latencies, elapsed, errors, rss_mib(server_pid))
+
+
+def slope(points: List[Tuple[float, float]]) -> float:
+    """Least-squares slope of ``(x, y)`` points."""
+    n = len(points)
+    if n < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class UvicornServer:
+    """A local uvicorn process serving ``app`` for the duration of a ``with`` block."""
+
+    def __init__(self, app: str = 'src.application.main:app', env: Optional[Dict[str, str]] = None):
+        self.app = app
+        self.port = free_port()
+        self.base_url = f'http://127.0.0.1:{self.port}'
+        self.env = dict(os.environ, **(env or {}))
+        self.proc: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> 'UvicornServer':
+        self.proc = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', self.app, '--host', '127.0.0.1', '--port', str(self.port),
+             '--log-level', 'warning', '--no-access-log'],
+            cwd=ROOT, env=self.env,
+        )
+        deadline = time.time() + 15
+        while time.time() < deadline:
+            try:
+                if httpx.get(self.base_url + '/healthz', timeout=0.5).status_code == 200:
+                    return self
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        self.__exit__(None, None, None)
+        raise RuntimeError(f'uvicorn did not become ready on port {self.port}')
+
+    def __exit__(self, *exc) -> None:
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.proc.pid if self.proc else None
@@ -1,41 +1,279 @@
 #!/usr/bin/env python3
-"""Resource estimation stub: parses basic hints from feature files and
-produces a JSON estimate for CPU, memory, and storage.
+"""Resource estimation: size pods for the generated service.
+
+Two estimators write ``reports/resource-estimates.json``:
+
+* heuristic (default) -- base resources plus fixed increments for features
+  that mention ``concurrent`` or a database in their name, description,
+  tags or steps (comments do not count). Cheap, needs nothing running.
+* ``--measure`` -- starts the app under uvicorn, drives each feature's
+  parameter-free GET endpoints at several concurrency levels and measures
+  the worker's CPU time (``/proc/<pid>/stat``), steady RSS (``VmRSS``
+  after each step) and peak RSS (``VmHWM``). An idle step with no load
+  calibrates the background CPU. A linear model is fitted per feature::
+
+      cores(rps)       = idle_cores + cpu_s_per_request * rps
+      rss(concurrency) = base_rss_mib + rss_mib_per_inflight * concurrency
+
+  ``cpu_s_per_request`` is the CPU above idle divided by the requests
+  served, over all steps. The model is projected to ``--target-rps``; the
+  requests in flight at that rate come from Little's law (rps x p50 latency
+  at the lowest concurrency, where there is no queueing). Requests use the
+  projected steady values. Limits use the projected peak plus
+  ``--headroom``. The heaviest feature sizes the pod.
+
+The top-level ``cpu_m``, ``memory_mib``, ``storage_mib`` and
+``features_count`` keys keep their meaning (``memory_mib`` is per worker,
+as read by ``src.application.launcher``). In measure mode they hold the
+measured projection: ``cpu_m`` for the pod's target rate, ``memory_mib``
+for one worker with a request in flight, plus ``inflight_memory_mib`` for
+the requests in flight at the target rate, which the launcher spreads over
+however many workers it starts. The heuristic numbers are reported next to
+them under ``heuristic``. Storage cannot be observed by a load test and always
+comes from the heuristic. If the server cannot be started or measured, the
+heuristic is written with ``"source": "heuristic"`` and the reason.
+
+Usage:
+  python scripts/resource_estimator.py
+  python scripts/resource_estimator.py --measure [--target-rps N] [--step-seconds S]
+      [--concurrency 1,4,16] [--headroom 0.25]
+
+Measure mode needs httpx and runs on Linux (it reads ``/proc``). The load
+comes from ``scripts/load_driver.py``, which the benchmarks share.
 """
+import argparse
 import json
+import math
+import os
+import sys
+import time
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import spec_parser
+
 ROOT = Path(__file__).resolve().parent.parent
 REPORTS = ROOT / 'reports'
-REPORTS.mkdir(parents=True, exist_ok=True)
+ESTIMATES = REPORTS / 'resource-estimates.json'
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+DEFAULT_TARGET_RPS = float(os.environ.get('ESTIMATOR_TARGET_RPS', '100'))
+DEFAULT_CONCURRENCY = (1, 4, 16)
 
 
-def estimate():
+def heuristic() -> Dict[str, int]:
     # Simple heuristic: base resources + per-feature increments
-    features = list((ROOT / 'features').rglob('*.feature'))
+    features = spec_parser.discover(ROOT / 'features')
     cpu_m = 50  # base 50m
     mem = 64  # base 64Mi
     storage = 5  # base 5Mi
 
     for f in features:
-        text = f.read_text()
+        text = spec_parser.parse_file(f).prose()
         if 'concurrent' in text:
             cpu_m += 50
         if 'database' in text or 'DB' in text:
             mem += 128
             storage += 50
 
-    report = {
+    return {
         'cpu_m': cpu_m,
         'memory_mib': mem,
         'storage_mib': storage,
         'features_count': len(features)
     }
 
-    with open(REPORTS / 'resource-estimates.json', 'w') as fh:
+
+# Measurement -----------------------------------------------------------------
+
+def cpu_seconds(pid: int) -> float:
+    """User plus system CPU time consumed so far by ``pid``."""
+    fields = Path(f'/proc/{pid}/stat').read_text().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS  # utime, stime
+
+
+def peak_rss_mib(pid: int) -> float:
+    for line in Path(f'/proc/{pid}/status').read_text().splitlines():
+        if line.startswith('VmHWM:'):
+            return round(int(line.split()[1]) / 1024, 2)
+    return 0.0
+
+
+def fit_line(points: List[Tuple[float, float]]) -> Tuple[float, float]:
+    """Least-squares ``(intercept, slope)``; both clamped at zero."""
+    from load_driver import slope
+    gradient = max(0.0, slope(points))
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    return max(0.0, mean_y - gradient * mean_x), gradient
+
+
+def idle_cores(pid: int, seconds: float) -> float:
+    cpu_before = cpu_seconds(pid)
+    time.sleep(seconds)
+    return (cpu_seconds(pid) - cpu_before) / seconds
+
+
+def measure_feature(server, paths: List[str], levels: List[int], seconds: float, idle: float) -> Dict:
+    """Run one load step per concurrency level against ``paths`` and fit the model."""
+    from load_driver import closed_loop, rss_mib
+
+    steps = []
+    for concurrency in levels:
+        for path in paths:
+            cpu_before = cpu_seconds(server.pid)
+            result = closed_loop(server.base_url, path, concurrency=concurrency, duration=seconds,
+                                 server_pid=server.pid)
+            cpu = cpu_seconds(server.pid) - cpu_before
+            steps.append({
+                'path': path,
+                'concurrency': concurrency,
+                'requests': result['requests'],
+                'errors': result['errors'],
+                'rps': result['rps'],
+                'p50_ms': result['p50_ms'],
+                'p95_ms': result['p95_ms'],
+                'cpu_seconds': round(cpu, 4),
+                'rss_mib': rss_mib(server.pid),
+                'peak_rss_mib': peak_rss_mib(server.pid),
+            })
+
+    # closed_loop warms up with ten requests per connection before the timed part.
+    served = sum(s['requests'] + s['concurrency'] * 10 for s in steps)
+    busy = sum(s['cpu_seconds'] for s in steps) - idle * seconds * len(steps)
+    base_rss, rss_per_inflight = fit_line([(s['concurrency'], s['rss_mib']) for s in steps])
+    unloaded = min(steps, key=lambda s: s['concurrency'])
+    return {
+        'paths': paths,
+        'steps': steps,
+        'model': {
+            'idle_cores': round(idle, 4),
+            'cpu_ms_per_request': round(max(0.0, busy) / served * 1000, 4),
+            'base_rss_mib': round(base_rss, 2),
+            'rss_mib_per_inflight': round(rss_per_inflight, 4),
+            'peak_rss_mib': max(s['peak_rss_mib'] for s in steps),
+            'p50_ms': unloaded['p50_ms'],
+            'max_rps': max(s['rps'] for s in steps),
+        },
+    }
+
+
+def project(model: Dict, target_rps: float, headroom: float) -> Dict:
+    """Kubernetes-style requests/limits for one feature's model at ``target_rps``.
+
+    The requests and limits are for one worker serving the whole rate, as
+    measured. ``worker_memory_mib`` (a worker with one request in flight)
+    and ``inflight_memory_mib`` (all requests in flight at the target rate)
+    split that memory into the part every worker pays and the part the
+    pod's workers share.
+    """
+    cores = model['idle_cores'] + model['cpu_ms_per_request'] / 1000 * target_rps
+    inflight = max(1.0, target_rps * model['p50_ms'] / 1000)  # Little's law
+    steady = model['base_rss_mib'] + model['rss_mib_per_inflight'] * inflight
+    peak = max(model['peak_rss_mib'], steady)
+    return {
+        'target_rps': target_rps,
+        'inflight': round(inflight, 2),
+        'cpu_request_m': math.ceil(cores * 1000),
+        'cpu_limit_m': math.ceil(cores * 1000 * (1 + headroom)),
+        'memory_request_mib': math.ceil(steady),
+        'memory_limit_mib': math.ceil(peak * (1 + headroom)),
+        'worker_memory_mib': math.ceil(model['base_rss_mib'] + model['rss_mib_per_inflight']),
+        'inflight_memory_mib': math.ceil(model['rss_mib_per_inflight'] * inflight),
+        'saturated': target_rps > model['max_rps'],
+    }
+
+
+def feature_routes() -> Dict[str, List[str]]:
+    from load_driver import ROUTE_MANIFEST
+    routes: Dict[str, List[str]] = {}
+    if ROUTE_MANIFEST.exists():
+        for entry in json.loads(ROUTE_MANIFEST.read_text()).get('routers', []):
+            paths = [route['path'] for route in entry.get('routes', [])
+                     if '{' not in route['path'] and 'GET' in route.get('methods', ['GET'])]
+            if paths:
+                routes[entry['feature']] = paths
+    return routes
+
+
+def measure(target_rps: float, levels: List[int], seconds: float, headroom: float) -> Dict:
+    from load_driver import UvicornServer
+
+    features: Dict[str, Dict] = {}
+    # Measure the service, not the limiter or the access log writing to our stdout.
+    env = {'RATELIMIT_ENABLED': '0', 'PROFILING_ENABLED': '0', 'ACCESS_LOG_ENABLED': '0'}
+    with UvicornServer(env=env) as server:
+        idle_rss = round(peak_rss_mib(server.pid), 2)
+        idle = idle_cores(server.pid, seconds)
+        for feature, paths in feature_routes().items():
+            measured = measure_feature(server, paths, levels, seconds, idle)
+            measured['projection'] = project(measured['model'], target_rps, headroom)
+            features[feature] = measured
+    if not features:
+        raise RuntimeError('no parameter-free GET routes in the route manifest to measure')
+
+    heaviest = max(features.values(), key=lambda f: (f['projection']['cpu_request_m'],
+                                                     f['projection']['memory_request_mib']))
+    return {
+        'target_rps': target_rps,
+        'headroom': headroom,
+        'idle_rss_mib': idle_rss,
+        'projection': heaviest['projection'],
+        'features': features,
+    }
+
+
+def estimate(measured: bool = False, target_rps: float = DEFAULT_TARGET_RPS,
+             levels: Optional[List[int]] = None, seconds: float = 2.0,
+             headroom: float = 0.25, output: Path = ESTIMATES) -> Dict:
+    report = heuristic()
+    if measured:
+        guess = dict(report)
+        try:
+            result = measure(target_rps, levels or list(DEFAULT_CONCURRENCY), seconds, headroom)
+        except (OSError, RuntimeError, ImportError) as exc:
+            report.update(source='heuristic', measure_error=str(exc))
+        else:
+            projection = result['projection']
+            report.update(
+                source='measured',
+                cpu_m=projection['cpu_request_m'],
+                memory_mib=projection['worker_memory_mib'],
+                inflight_memory_mib=projection['inflight_memory_mib'],
+                heuristic=guess,
+                measured=result,
+            )
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as fh:
         json.dump(report, fh, indent=2)
 
-    print('Resource estimate written to', REPORTS / 'resource-estimates.json')
+    print('Resource estimate written to', output)
+    if 'heuristic' in report:
+        print(f"{'':12}{'measured':>10}{'heuristic':>11}")
+        for key in ('cpu_m', 'memory_mib', 'storage_mib'):
+            print(f"{key:12}{report[key]:>10}{report['heuristic'][key]:>11}")
+    elif measured:
+        print('Measurement failed, wrote the heuristic estimate:', report['measure_error'], file=sys.stderr)
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Estimate CPU, memory and storage for the service.')
+    parser.add_argument('--measure', action='store_true', help='Load-test the app and fit a resource model')
+    parser.add_argument('--target-rps', type=float, default=DEFAULT_TARGET_RPS,
+                        help='Request rate to project requests/limits for (per pod)')
+    parser.add_argument('--concurrency', default=','.join(map(str, DEFAULT_CONCURRENCY)),
+                        help='Comma-separated concurrency levels to calibrate with')
+    parser.add_argument('--step-seconds', type=float, default=2.0, help='Duration of each load step')
+    parser.add_argument('--headroom', type=float, default=0.25, help='Fraction added on top for limits')
+    parser.add_argument('--output', type=Path, default=ESTIMATES)
+    args = parser.parse_args(argv)
+
+    levels = [int(level) for level in args.concurrency.split(',') if level.strip()]
+    estimate(args.measure, args.target_rps, levels, args.step_seconds, args.headroom, args.output)
+    return 0
 
 
 if __name__ == '__main__':
-    estimate()
+    sys.exit(main())
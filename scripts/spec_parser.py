@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""Gherkin parser shared by every spec tool.
+
+``parse_file`` turns a ``.feature`` file into a compact AST::
+
+    Feature(path, sha, name, line, tags, description, background, scenarios)
+      Scenario(title, line, keyword, tags, steps)
+        Step(keyword, kind, text, line)
+
+``Step.kind`` is the effective keyword: ``And`` / ``But`` / ``*`` steps take
+the kind of the step before them, so ``Scenario.has('then')`` is true for
+``Then a`` followed by ``And b``. ``Scenario``, ``Scenario Outline``,
+``Scenario Template`` and ``Example`` all start a scenario. ``Background``
+steps are kept apart. Tag lines attach to the next ``Feature``/scenario
+(scenarios do not copy their feature's tags; use ``Feature.tags_for``).
+Comments, doc strings, tables and ``Examples`` blocks are skipped. Line
+numbers are 1-based.
+
+Parsed files are cached on disk, one JSON file per content hash, in
+``reports/.spec-cache`` (``SPEC_CACHE_DIR``), and in memory for the life of
+the process. A file is parsed at most once per change, whichever tool
+reads it first. ``SPEC_CACHE=0`` turns the disk cache off.
+
+For whole trees, ``parse_many`` runs ``parse_file`` over every path, so
+each file is read once and hashed, and only parsed when neither cache has
+it. It shards large trees across worker processes and returns the results
+in input order.
+
+Usage: python scripts/spec_parser.py FILE...   (prints the AST as JSON)
+"""
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = Path(os.environ.get('SPEC_CACHE_DIR') or ROOT / 'reports' / '.spec-cache')
+# Bump when the AST or the parsing rules change; old cache entries are then ignored.
+PARSER_VERSION = 1
+
+# Below this many files, starting worker processes costs more than parsing them here.
+PARALLEL_THRESHOLD = 256
+
+STEP_KEYWORDS = ('Given', 'When', 'Then', 'And', 'But', '*')
+SCENARIO_KEYWORDS = ('Scenario Outline', 'Scenario Template', 'Scenario', 'Example')
+
+
+@dataclass
+class Step:
+    keyword: str
+    kind: str
+    text: str
+    line: int
+
+
+@dataclass
+class Scenario:
+    title: str
+    line: int
+    keyword: str = 'Scenario'
+    tags: List[str] = field(default_factory=list)
+    steps: List[Step] = field(default_factory=list)
+
+    def has(self, kind: str) -> bool:
+        return any(step.kind == kind for step in self.steps)
+
+
+@dataclass
+class Feature:
+    path: str
+    sha: str
+    name: Optional[str] = None
+    line: int = 0
+    tags: List[str] = field(default_factory=list)
+    description: List[str] = field(default_factory=list)
+    background: List[Step] = field(default_factory=list)
+    scenarios: List[Scenario] = field(default_factory=list)
+
+    def tags_for(self, scenario: Scenario) -> List[str]:
+        """The scenario's tags plus those it inherits from the feature."""
+        return self.tags + scenario.tags
+
+    def prose(self) -> str:
+        """Name, description, scenario titles, step text and tags, one per line."""
+        parts = [self.name or ''] + self.description + self.tags
+        for scenario in self.scenarios:
+            parts.append(scenario.title)
+            parts.extend(scenario.tags)
+            parts.extend(f'{step.keyword} {step.text}' for step in scenario.steps)
+        return '\n'.join(parts)
+
+    def to_dict(self) -> dict:
+        steps = lambda items: [vars(step).copy() for step in items]  # noqa: E731
+        return dict(vars(self), background=steps(self.background),
+                    scenarios=[dict(vars(s), tags=list(s.tags), steps=steps(s.steps)) for s in self.scenarios])
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Feature':
+        steps = lambda items: [Step(**s) for s in items]  # noqa: E731
+        scenarios = [Scenario(**dict(s, steps=steps(s['steps']))) for s in data['scenarios']]
+        return cls(**dict(data, background=steps(data['background']), scenarios=scenarios))
+
+
+def _keyword(line: str, keywords) -> Optional[str]:
+    for keyword in keywords:
+        if line.startswith(keyword + ':'):
+            return keyword
+    return None
+
+
+def parse_text(text: str, path: str = '', sha: str = '') -> Feature:
+    return parse_lines(text.splitlines(), path, sha)
+
+
+def parse_lines(lines: Iterable[str], path: str = '', sha: str = '') -> Feature:
+    """Parse a feature from an iterable of lines, consuming it exactly once."""
+    feature = Feature(path=path, sha=sha)
+    pending_tags: List[str] = []
+    steps: Optional[List[Step]] = None  # where steps go: background, a scenario, or nowhere
+    previous_kind = 'given'
+    in_docstring = None
+    in_examples = False
+
+    for number, raw in enumerate(lines, 1):
+        line = raw.strip()
+        if in_docstring:
+            if line.startswith(in_docstring):
+                in_docstring = None
+            continue
+        if line.startswith('"""') or line.startswith('```'):
+            in_docstring = line[:3]
+            continue
+        if not line or line.startswith('#') or line.startswith('|'):
+            continue
+        if line.startswith('@'):
+            pending_tags.extend(tag for tag in line.split() if tag.startswith('@'))
+            continue
+
+        if line.startswith('Feature:'):
+            feature.name = line.split(':', 1)[1].strip()
+            feature.line = number
+            feature.tags, pending_tags = pending_tags, []
+            steps = None
+            continue
+        if line.startswith('Background:'):
+            steps, in_examples, previous_kind = feature.background, False, 'given'
+            continue
+        keyword = _keyword(line, SCENARIO_KEYWORDS)
+        if keyword:
+            scenario = Scenario(title=line.split(':', 1)[1].strip(), line=number, keyword=keyword,
+                                tags=pending_tags)
+            feature.scenarios.append(scenario)
+            pending_tags, steps, in_examples, previous_kind = [], scenario.steps, False, 'given'
+            continue
+        if line.startswith('Examples:') or line.startswith('Scenarios:'):
+            pending_tags, in_examples = [], True
+            continue
+        if in_examples:
+            continue
+
+        word = line.split(None, 1)[0]
+        if word in STEP_KEYWORDS and steps is not None:
+            kind = word.lower() if word in ('Given', 'When', 'Then') else previous_kind
+            steps.append(Step(keyword=word, kind=kind, text=line[len(word):].strip(), line=number))
+            previous_kind = kind
+        elif steps is None and feature.name is not None and not feature.scenarios:
+            feature.description.append(line)
+    return feature
+
+
+def _cache_path(sha: str) -> Path:
+    return CACHE_DIR / f'v{PARSER_VERSION}-{sha}.json'
+
+
+def _disk_cache() -> bool:
+    return os.environ.get('SPEC_CACHE', '1') != '0'
+
+
+_memo: Dict[str, Feature] = {}
+
+
+def parse_bytes(data: bytes, path: str = '', sha: Optional[str] = None) -> Feature:
+    """Parse already-read file contents, going through the caches."""
+    sha = sha or hashlib.sha256(data).hexdigest()
+    cached = _memo.get(sha)
+    if cached is None and _disk_cache():
+        try:
+            cached = Feature.from_dict(json.loads(_cache_path(sha).read_text()))
+        except (OSError, ValueError, TypeError, KeyError):
+            cached = None
+    if cached is None:
+        cached = parse_text(data.decode('utf-8'), sha=sha)
+        if _disk_cache():
+            _store(cached)
+    _memo[sha] = cached
+    # identical files share one entry; each caller gets it with its own path (treat it as read-only)
+    return replace(cached, path=path)
+
+
+def _store(feature: Feature) -> None:
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        target = _cache_path(feature.sha)
+        tmp = target.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(json.dumps(dict(feature.to_dict(), path=''), separators=(',', ':')))
+        os.replace(tmp, target)  # atomic: concurrent tools never read half a file
+    except OSError:
+        pass
+
+
+def parse_file(path: Path) -> Feature:
+    """Read ``path`` once and return its AST (from the cache when its content was seen before)."""
+    path = Path(path)
+    return parse_bytes(path.read_bytes(), str(path))
+
+
+def _parse_shard(paths: Sequence[str]) -> List[Feature]:
+    return [parse_file(Path(p)) for p in paths]
+
+
+def parse_many(paths: Sequence[Path], workers: Optional[int] = None, mp_context=None) -> List[Feature]:
+    """``parse_file`` every path, sharded across worker processes for large trees.
+
+    Paths are split into contiguous shards and the results are concatenated
+    in input order, so the output does not depend on the worker count or on
+    scheduling. Below ``PARALLEL_THRESHOLD`` files (or with one worker) it
+    runs in this process. Workers write the disk cache for the files they
+    parse. ``SPEC_WORKERS`` sets the default worker count.
+    """
+    paths = [str(p) for p in paths]
+    workers = workers or int(os.environ.get('SPEC_WORKERS') or os.cpu_count() or 1)
+    if workers <= 1 or len(paths) < PARALLEL_THRESHOLD:
+        return _parse_shard(paths)
+    size = -(-len(paths) // (workers * 4))  # a few shards per worker evens out uneven files
+    shards = [paths[i:i + size] for i in range(0, len(paths), size)]
+    with ProcessPoolExecutor(min(workers, len(shards)), mp_context=mp_context) as pool:
+        features = [feature for shard in pool.map(_parse_shard, shards) for feature in shard]
+    for feature in features:
+        _memo.setdefault(feature.sha, replace(feature, path=''))
+    return features
+
+
+def combined_sha(features: Iterable[Feature]) -> str:
+    """SHA-256 over the per-file hashes of ``features`` in path order (no file is re-read)."""
+    digest = hashlib.sha256()
+    for feature in sorted(features, key=lambda f: f.path):
+        digest.update(feature.sha.encode())
+    return digest.hexdigest()
+
+
+def discover(features_dir: Path) -> List[Path]:
+    """Every ``.feature`` file under ``features_dir``, recursively, in sorted order."""
+    return sorted(Path(features_dir).rglob('*.feature'))
+
+
+if __name__ == '__main__':
+    json.dump([parse_file(Path(p)).to_dict() for p in sys.argv[1:]], sys.stdout, indent=2)
+    print()
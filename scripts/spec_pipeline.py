@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Run the spec tools in one process as a DAG of stages.
+
+    parse ──┬── validate ──────────────────────┐
+            ├── generate ──┬── coverage ───────┼── audit
+            │              └── snapshot ───────┤
+            └── estimate ──────────────────────┘
+
+Stages pass their results in memory. ``parse`` reads, hashes and parses
+each feature file once (``spec_parser.parse_many``, sharded across
+processes for large trees), and every later stage reuses that parse. A
+stage starts on a thread as soon as the stages it depends on have
+finished, so ``validate``, ``generate`` and ``estimate`` run concurrently.
+Generation still renders in its own process pool, started with forkserver
+or spawn because this process runs threads.
+
+The report files of the individual tools are still written:
+
+* ``reports/<combined sha>/spec-coverage.json`` -- validate (validate_specs.py)
+* ``reports/spec-coverage.json``, ``reports/generation-manifest.json`` and the
+  generated code -- generate and coverage (generate_from_spec.py,
+  validate_spec_coverage.py)
+* ``reports/generated_files.json``, ``src/adapters/http/openapi.json`` -- snapshot
+* ``reports/resource-estimates.json`` -- estimate (resource_estimator.py)
+* ``reports/audit-response.json`` -- audit (audit_compliance.py)
+
+Per-stage timings are printed and written to ``reports/pipeline-timings.json``.
+
+Usage: python scripts/spec_pipeline.py [--mode compliance|sandbox] [--incremental] [--workers N]
+           [--audit-output PATH] [--pr-number N] [--pr-author NAME] [--commit-sha SHA]
+
+CI runs it in compliance mode for changes to features, templates, scripts
+or src (``.github/workflows/spec-pipeline.yml``).
+
+Exit codes:
+  0 - OK
+  1 - violations (invalid specs, coverage violations, compliance-mode audit)
+  2 - a stage raised
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+REPORTS_DIR = ROOT / 'reports'
+sys.path.insert(0, str(ROOT))
+
+import audit_compliance  # noqa: E402
+import generate_from_spec  # noqa: E402
+import resource_estimator  # noqa: E402
+import spec_parser  # noqa: E402
+import validate_spec_coverage  # noqa: E402
+from validate_specs import SpecValidator  # noqa: E402
+
+Stage = Tuple[str, Tuple[str, ...], Callable[[Dict[str, Any]], Any]]
+
+
+class Pipeline:
+    """Runs stages once their dependencies are done; records timings and failures."""
+
+    def __init__(self):
+        self.stages: List[Stage] = []
+
+    def stage(self, name: str, *deps: str):
+        def decorator(fn):
+            self.stages.append((name, deps, fn))
+            return fn
+        return decorator
+
+    def run(self) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        results: Dict[str, Any] = {}
+        timings: Dict[str, Dict[str, Any]] = {}
+        pending = list(self.stages)
+        running = {}
+        started = time.perf_counter()
+
+        def call(name, fn):
+            begin = time.perf_counter()
+            try:
+                return fn(results)
+            finally:
+                timings[name] = {'start_s': round(begin - started, 4),
+                                 'seconds': round(time.perf_counter() - begin, 4)}
+
+        with ThreadPoolExecutor(max_workers=len(self.stages)) as pool:
+            while pending or running:
+                for stage in list(pending):
+                    name, deps, fn = stage
+                    if any(timings.get(d, {}).get('status') in ('failed', 'skipped') for d in deps):
+                        pending.remove(stage)
+                        timings[name] = {'status': 'skipped'}
+                    elif all(d in results for d in deps):
+                        pending.remove(stage)
+                        running[pool.submit(call, name, fn)] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                        timings[name]['status'] = 'ok'
+                    except Exception:
+                        timings[name]['status'] = 'failed'
+                        timings[name]['error'] = traceback.format_exc(limit=3)
+                        print(f'Stage {name} failed:\n{timings[name]["error"]}', file=sys.stderr)
+        timings['total'] = {'seconds': round(time.perf_counter() - started, 4)}
+        return results, timings
+
+
+def build(args) -> Pipeline:
+    pipeline = Pipeline()
+    features_dir = ROOT / 'features'
+    methods = multiprocessing.get_all_start_methods()
+    mp_context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+    @pipeline.stage('parse')
+    def parse(results):
+        paths = spec_parser.discover(features_dir)
+        return dict(zip(paths, spec_parser.parse_many(paths, args.workers, mp_context)))
+
+    @pipeline.stage('validate', 'parse')
+    def validate(results):
+        validator = SpecValidator(str(features_dir), str(REPORTS_DIR), mode=args.mode)
+        valid = validator.validate_all(list(results['parse'].values()))
+        return {'valid': valid, 'report': str(validator.coverage_report_path)}
+
+    @pipeline.stage('generate', 'parse')
+    def generate(results):
+        entries, changed, reused = generate_from_spec.generate(args.incremental, args.workers, mp_context,
+                                                               features=results['parse'])
+        return {'report': generate_from_spec.coverage_report(entries), 'changed': changed, 'reused': reused}
+
+    @pipeline.stage('estimate', 'parse')
+    def estimate(results):
+        return resource_estimator.estimate()
+
+    @pipeline.stage('coverage', 'generate')
+    def coverage(results):
+        report = dict(results['generate']['report'])
+        violations = validate_spec_coverage.check_report(
+            report, list(results['parse']), list(results['parse'].values()))
+        (REPORTS_DIR / 'spec-coverage.json').write_text(json.dumps(report, indent=2))
+        return {'report': report, 'violations': violations}
+
+    @pipeline.stage('snapshot', 'generate')
+    def snapshot(results):
+        generated = list(results['generate']['report']['generated_files'])
+        openapi = generate_from_spec.ROUTE_MANIFEST.with_name('openapi.json')
+        if results['generate']['changed'] or not args.incremental or not openapi.exists():
+            from src.application import openapi_snapshot  # imports the app: only when routes changed
+
+            if openapi_snapshot.main([]) != 0:
+                print('OpenAPI snapshot failed; /openapi.json will be generated at runtime')
+        if openapi.exists():
+            generated.append(str(openapi))
+        (REPORTS_DIR / 'generated_files.json').write_text(json.dumps(generated, indent=2))
+        return generated
+
+    @pipeline.stage('audit', 'validate', 'coverage', 'snapshot', 'estimate')
+    def audit(results):
+        out = audit_compliance.build_audit(
+            args.mode, args.pr_number, args.pr_author, args.commit_sha,
+            spec_report=results['coverage']['report'], generated_files=results['snapshot'])
+        path = Path(args.audit_output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(out, indent=2))
+        return out
+
+    return pipeline
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Parse, validate, generate, estimate and audit in one process')
+    parser.add_argument('--mode', default=os.environ.get('VALIDATION_MODE', 'compliance').lower(),
+                        choices=['compliance', 'sandbox'])
+    parser.add_argument('--incremental', action='store_true', help='See generate_from_spec.py --incremental')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for the parse and generate stages')
+    parser.add_argument('--audit-output', default=str(REPORTS_DIR / 'audit-response.json'))
+    parser.add_argument('--pr-number', default='manual')
+    parser.add_argument('--pr-author')
+    parser.add_argument('--commit-sha')
+    parser.add_argument('--timings', default=str(REPORTS_DIR / 'pipeline-timings.json'))
+    args = parser.parse_args(argv)
+
+    REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    results, timings = build(args).run()
+
+    print('Spec pipeline:')
+    for name, timing in timings.items():
+        if name == 'total':
+            continue
+        at = f"+{timing['start_s']:.3f}s" if 'start_s' in timing else ''
+        took = f"{timing['seconds']:.3f}s" if 'seconds' in timing else '-'
+        print(f"  {name:10} {timing['status']:8} {took:>9} {at:>10}")
+    print(f"  {'total':10} {'':8} {timings['total']['seconds']:8.3f}s")
+    Path(args.timings).write_text(json.dumps(timings, indent=2))
+
+    if any(t.get('status') in ('failed', 'skipped') for t in timings.values()):
+        return 2
+    violations = bool(results['coverage']['violations']) or not results['validate']['valid']
+    if args.mode == 'compliance':
+        violations = violations or bool(results['audit']['violations'])
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,8 +3,9 @@
 Hardened validator for spec-coverage.json.
 
 Checks each .feature referenced in the generated files (or scans features/) and
-verifies each Scenario contains Given, When, Then steps. Produces detailed
-errors in the spec-coverage.json file and prints a human-readable log.
+verifies each Scenario contains Given, When, Then steps (``And``/``But`` count
+as the kind of the step before them; see scripts/spec_parser.py). Produces
+detailed errors in the spec-coverage.json file and prints a human-readable log.
 
 Exit codes:
   0 - OK (no violations)
@@ -14,15 +15,11 @@ Exit codes:
 import argparse
 import json
 import sys
-import re
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-
-GIVEN_RE = re.compile(r'\bGiven\b', re.IGNORECASE)
-WHEN_RE = re.compile(r'\bWhen\b', re.IGNORECASE)
-THEN_RE = re.compile(r'\bThen\b', re.IGNORECASE)
+import spec_parser
 
 
 def now_iso() -> str:
@@ -40,64 +37,54 @@ def load_json(path: Path) -> Any:
         sys.exit(2)
 
 
-def scan_feature(path: Path) -> List[Dict[str, Any]]:
+def scan_feature(path: Path, feature: Optional[spec_parser.Feature] = None) -> List[Dict[str, Any]]:
     """Return a list of violations found in a .feature file by scenario."""
-    violations = []
-    try:
-        text = path.read_text()
-    except Exception as e:
-        return [{"file": str(path), "line": 0, "issue": f"unreadable: {e}"}]
-
-    lines = text.splitlines()
-    current_scenario = None
-    scenario_start = None
-    buffer = []
-    for i, raw in enumerate(lines, start=1):
-        line = raw.strip()
-        if line.lower().startswith('scenario'):
-            # flush previous
-            if current_scenario is not None:
-                violations.extend(check_scenario_fields(path, current_scenario, scenario_start, buffer))
-            current_scenario = line
-            scenario_start = i
-            buffer = []
-            continue
-        if current_scenario is not None:
-            buffer.append((i, line))
-
-    # flush last
-    if current_scenario is not None:
-        violations.extend(check_scenario_fields(path, current_scenario, scenario_start, buffer))
+    if feature is None:
+        try:
+            feature = spec_parser.parse_file(path)
+        except (OSError, UnicodeDecodeError) as e:
+            return [{"file": str(path), "line": 0, "issue": f"unreadable: {e}"}]
 
+    violations = []
+    for scenario in feature.scenarios:
+        for kind in ('given', 'when', 'then'):
+            if not scenario.has(kind):
+                violations.append({"file": str(path), "line": scenario.line, "issue": f"missing {kind.capitalize()}"})
     return violations
 
 
-def check_scenario_fields(path: Path, scenario_line: str, start_line: int, buffer: List) -> List[Dict[str, Any]]:
-    has_given = False
-    has_when = False
-    has_then = False
-    for ln, text in buffer:
-        if GIVEN_RE.search(text):
-            has_given = True
-        if WHEN_RE.search(text):
-            has_when = True
-        if THEN_RE.search(text):
-            has_then = True
-
-    issues = []
-    if not has_given:
-        issues.append({"file": str(path), "line": start_line, "issue": "missing Given"})
-    if not has_when:
-        issues.append({"file": str(path), "line": start_line, "issue": "missing When"})
-    if not has_then:
-        issues.append({"file": str(path), "line": start_line, "issue": "missing Then"})
-    return issues
+def check_report(report: Dict[str, Any], feature_paths: List[Path],
+                 features: Optional[List[spec_parser.Feature]] = None,
+                 workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Scan ``feature_paths`` and record the violations in ``report`` (in place).
+
+    Files are read once each and parsed through the shared parser's caches,
+    sharded across ``workers`` processes for large trees, unless their parsed
+    ``features`` are given.
+    """
+    if features is None:
+        try:
+            features = spec_parser.parse_many(feature_paths, workers)
+        except (OSError, UnicodeDecodeError):
+            features = None  # scan file by file to report which one is unreadable
+    all_violations = []
+    for i, fp in enumerate(feature_paths):
+        v = scan_feature(fp, features[i] if features else None)
+        all_violations.extend(v)
+
+    # Update report with detailed errors
+    report['errors'] = all_violations
+    report['checked_at'] = now_iso()
+    report['checked_files'] = [str(p) for p in feature_paths]
+    return all_violations
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--report', required=True, help='Path to spec-coverage.json')
     parser.add_argument('--features-dir', required=False, default='features', help='Directory with .feature files')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Parser processes for large trees (default: SPEC_WORKERS or CPU count)')
     args = parser.parse_args()
 
     report_path = Path(args.report)
@@ -120,17 +107,9 @@ def main():
             feature_paths.append(p)
 
     if not feature_paths:
-        feature_paths = list(Path(args.features_dir).glob('**/*.feature'))
+        feature_paths = spec_parser.discover(Path(args.features_dir))
 
-    all_violations = []
-    for fp in feature_paths:
-        v = scan_feature(fp)
-        all_violations.extend(v)
-
-    # Update report with detailed errors
-    report['errors'] = all_violations
-    report['checked_at'] = now_iso()
-    report['checked_files'] = [str(p) for p in feature_paths]
+    all_violations = check_report(report, feature_paths, workers=args.workers)
 
     # Write back the report
     try:
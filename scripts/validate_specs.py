@@ -1,7 +1,22 @@
 #!/usr/bin/env python3
+"""Validate every feature file under features/ and write a coverage report.
+
+Usage: python scripts/validate_specs.py   (``VALIDATION_MODE=compliance|sandbox``)
+
+The report goes to ``reports/<combined sha>/spec-coverage.json``, next to a
+``spec-validation-failed`` marker when any spec is invalid. Exits 1 if any
+spec is invalid.
+
+The combined SHA is the first 8 hex digits of ``spec_parser.combined_sha``:
+a SHA-256 over each file's own SHA-256, in sorted path order. Earlier
+versions hashed the concatenated file contents instead, so the same tree
+now gets a different ``reports/<sha>/`` directory than it used to.
+Anything that looks reports up by SHA (CI artifact paths, dashboards,
+audit links) has to compute it with ``spec_parser.combined_sha``. Reports
+written before the change stay under their old directory names.
+"""
 
 import datetime
-import hashlib
 import json
 import logging
 import os
@@ -12,6 +27,8 @@ from datetime import UTC
 from pathlib import Path
 from typing import Dict, List, Optional, Set
 
+import spec_parser
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -68,15 +85,20 @@ class FeatureValidation:
     sha: str
 
 class SpecValidator:
-    def __init__(self, features_dir: str = "features"):
+    def __init__(self, features_dir: str = "features", reports_dir: str = "reports", mode: Optional[str] = None):
         self.features_dir = Path(features_dir)
+        self.reports_dir = Path(reports_dir)
         self.coverage_report_path = None  # Will be set per run
-        self.mode = os.environ.get("VALIDATION_MODE", "compliance").lower()
+        self.mode = (mode or os.environ.get("VALIDATION_MODE", "compliance")).lower()
         logging.info(f"Initializing SpecValidator in {self.mode} mode")
         
-    def validate_all(self) -> bool:
+    def validate_all(self, features: Optional[List[spec_parser.Feature]] = None,
+                     workers: Optional[int] = None) -> bool:
         """
-        Validates all feature files in the features directory.
+        Validates all feature files under the features directory (recursively).
+        Each file is read once, hashed and parsed through the shared parser's
+        caches; large trees are sharded across ``workers`` processes. Already-parsed
+        ``features`` can be passed in instead.
         Returns True if all specs are valid, False otherwise.
         """
         logging.info(f"Starting validation of all feature files in {self.features_dir}")
@@ -84,26 +106,27 @@ class SpecValidator:
         feature_validations = []
         
         # Get all .feature files
-        feature_files = list(self.features_dir.glob("*.feature"))
-        if not feature_files:
+        if features is None:
+            features = spec_parser.parse_many(spec_parser.discover(self.features_dir), workers)
+        features = sorted(features, key=lambda f: f.path)
+        if not features:
             logging.error(f"No feature files found in {self.features_dir}")
             return False
             
-        logging.info(f"Found {len(feature_files)} feature files to validate")
+        logging.info(f"Found {len(features)} feature files to validate")
             
         # Calculate combined SHA
-        combined_sha = self._calculate_combined_sha(feature_files)
+        combined_sha = self._calculate_combined_sha(features)
         logging.info(f"Generated combined SHA: {combined_sha}")
         
-        reports_dir = Path("reports")
-        feature_sha_dir = reports_dir / combined_sha
+        feature_sha_dir = self.reports_dir / combined_sha
         feature_sha_dir.mkdir(parents=True, exist_ok=True)
         logging.info(f"Created reports directory: {feature_sha_dir}")
         
         self.coverage_report_path = feature_sha_dir / "spec-coverage.json"
 
-        for feature_file in feature_files:
-            validation = self._validate_feature(feature_file)
+        for feature in features:
+            validation = self._validate_feature(Path(feature.path), feature)
             feature_validations.append(validation)
             if not validation.is_valid:
                 all_valid = False
@@ -120,84 +143,35 @@ class SpecValidator:
 
         return all_valid
         
-    def _calculate_combined_sha(self, feature_files: List[Path]) -> str:
+    def _calculate_combined_sha(self, features: List[spec_parser.Feature]) -> str:
         """
-        Calculate combined SHA of all feature files.
-        Files are processed in sorted order for deterministic output.
+        Calculate combined SHA of all feature files: a hash of the per-file
+        hashes, in sorted path order, so no file has to be read again.
         """
-        sha = hashlib.sha256()
-        
-        for file in sorted(feature_files):
-            content = file.read_bytes()
-            sha.update(content)
-            
-        return sha.hexdigest()[:8]
+        return spec_parser.combined_sha(features)[:8]
         
-    def _validate_feature(self, feature_file: Path) -> FeatureValidation:
+    def _validate_feature(self, feature_file: Path,
+                          feature: Optional[spec_parser.Feature] = None) -> FeatureValidation:
         """Validates a single feature file"""
-        scenarios = []
-        feature_name = ""
+        feature = feature or spec_parser.parse_file(feature_file)
+        feature_name = feature.name or ""
         is_valid = True
-        
-        with open(feature_file) as f:
-            lines = f.readlines()
 
-        current_scenario = None
-        pending_resource_tag = None
-        pending_resource_errors = None
-        for i, line in enumerate(lines, 1):
-            line = line.strip()
-            # Extract feature name
-            if line.startswith("Feature:"):
-                feature_name = line[8:].strip()
-                continue
-            # Check for resource tags (store for next scenario)
-            if "@resource:" in line:
-                match = re.search(r"@resource:cpu=([0-9.]+),memory=(\d+),storage=(\d+),story_points=(\d+)", line)
-                if match:
-                    try:
-                        pending_resource_tag = ResourceValidation(
-                            cpu=float(match.group(1)),
-                            memory=int(match.group(2)),
-                            storage=int(match.group(3)),
-                            story_points=int(match.group(4))
-                        )
-                        pending_resource_errors = pending_resource_tag.get_validation_errors()
-                    except Exception as e:
-                        pending_resource_tag = None
-                        pending_resource_errors = [f"Parse error: {str(e)}"]
-                else:
-                    pending_resource_tag = None
-                    pending_resource_errors = ["Resource tag format invalid"]
-                continue
-            # Start new scenario
-            if line.startswith("Scenario:"):
-                if current_scenario:
-                    scenarios.append(current_scenario)
-                current_scenario = ScenarioValidation(
-                    name=line[9:].strip(),
-                    has_given=False,
-                    has_when=False,
-                    has_then=False,
-                    has_resource_tag=pending_resource_tag is not None,
-                    resources=pending_resource_tag,
-                    resource_errors=pending_resource_errors,
-                    line_number=i
-                )
-                pending_resource_tag = None
-                pending_resource_errors = None
-                continue
-            # Check for Given/When/Then
-            if current_scenario:
-                if line.startswith("Given "):
-                    current_scenario.has_given = True
-                elif line.startswith("When "):
-                    current_scenario.has_when = True
-                elif line.startswith("Then "):
-                    current_scenario.has_then = True
-        # Add final scenario
-        if current_scenario:
-            scenarios.append(current_scenario)
+        scenarios = []
+        for parsed in feature.scenarios:
+            # The scenario's own @resource tag wins over one inherited from the feature
+            tags = [t for t in feature.tags_for(parsed) if t.startswith("@resource:")]
+            resources, resource_errors = self._parse_resource_tag(tags[-1]) if tags else (None, None)
+            scenarios.append(ScenarioValidation(
+                name=parsed.title,
+                has_given=parsed.has("given"),
+                has_when=parsed.has("when"),
+                has_then=parsed.has("then"),
+                has_resource_tag=resources is not None,
+                resources=resources,
+                resource_errors=resource_errors,
+                line_number=parsed.line
+            ))
         # Validate scenarios
         for scenario in scenarios:
             errors = []
@@ -224,8 +198,25 @@ class SpecValidator:
             feature_name=feature_name,
             scenarios=scenarios,
             is_valid=is_valid,
-            sha=hashlib.sha256(feature_file.read_bytes()).hexdigest()[:8]
+            sha=feature.sha[:8]
         )
+
+    @staticmethod
+    def _parse_resource_tag(tag: str):
+        """``(ResourceValidation or None, errors)`` for one ``@resource:`` tag."""
+        match = re.search(r"@resource:cpu=([0-9.]+),memory=(\d+),storage=(\d+),story_points=(\d+)", tag)
+        if not match:
+            return None, ["Resource tag format invalid"]
+        try:
+            resources = ResourceValidation(
+                cpu=float(match.group(1)),
+                memory=int(match.group(2)),
+                storage=int(match.group(3)),
+                story_points=int(match.group(4))
+            )
+        except Exception as e:
+            return None, [f"Parse error: {str(e)}"]
+        return resources, resources.get_validation_errors()
         
     def _generate_coverage_report(self, validations: List[FeatureValidation], combined_sha: str):
         """Generates the coverage report JSON file"""
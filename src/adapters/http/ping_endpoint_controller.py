@@ -1,9 +1,19 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Request
+from pydantic import BaseModel
+from src.adapters.http.registry import invoke, provide
+from src.adapters.http.serialization import ResponseEncoder
 from src.core.ping_endpoint.service import PingEndpointService
 
 router = APIRouter()
 
-@router.get("/ping_endpoint")
-def ping_endpoint():
-    service = PingEndpointService()
-    return {"message": service.check()}
+
+class PingEndpointResponse(BaseModel):
+    message: str
+
+
+encoder = ResponseEncoder(PingEndpointResponse)
+
+
+@router.get("/ping_endpoint", response_model=PingEndpointResponse)
+async def ping_endpoint(request: Request, service: PingEndpointService = Depends(provide(PingEndpointService))):
+    return encoder.respond(request, PingEndpointResponse(message=await invoke(service.check)))
@@ -0,0 +1,85 @@
+"""Worker-scoped registry of core services for HTTP controllers.
+
+Each core service is constructed once per worker process and handed to
+route handlers through ``Depends(provide(ServiceClass))``. Providers are
+``async def`` so FastAPI resolves them on the event loop instead of the
+threadpool.
+
+Handlers call service methods through ``invoke``, which dispatches on the
+method's execution policy (see ``src.core.execution``). Coroutine methods
+are awaited. ``thread`` methods, including those on services that set
+``blocking = True``, go to the threadpool. ``process`` methods go to the
+warm process pool, whose worker processes build services with the same
+registered factories. Everything else (the generated ``check()`` stubs)
+runs inline on the event loop.
+"""
+from typing import Any, Awaitable, Callable, Dict, Optional, Type, TypeVar
+
+from starlette.concurrency import run_in_threadpool
+
+from src.core.execution import ASYNC, INLINE, THREAD, metered, policy_of, process_executor, set_factory_resolver
+
+T = TypeVar('T')
+
+
+class ServiceRegistry:
+    def __init__(self):
+        self._factories: Dict[type, Callable[[], Any]] = {}
+        self._instances: Dict[type, Any] = {}
+        self._providers: Dict[type, Callable[[], Awaitable[Any]]] = {}
+
+    def register(self, service_cls: Type[T], factory: Optional[Callable[[], T]] = None) -> None:
+        """Override how ``service_cls`` is built; drops any existing instance."""
+        self._factories[service_cls] = factory or service_cls
+        self._instances.pop(service_cls, None)
+
+    def factory(self, service_cls: Type[T]) -> Callable[[], T]:
+        """The callable that builds ``service_cls`` (the class itself unless registered)."""
+        return self._factories.get(service_cls, service_cls)
+
+    def get(self, service_cls: Type[T]) -> T:
+        try:
+            return self._instances[service_cls]
+        except KeyError:
+            pass
+        instance = self.factory(service_cls)()
+        self._instances[service_cls] = instance
+        return instance
+
+    def provider(self, service_cls: Type[T]) -> Callable[[], Awaitable[T]]:
+        """Return the (cached) FastAPI dependency that yields ``service_cls``."""
+        try:
+            return self._providers[service_cls]
+        except KeyError:
+            pass
+
+        async def provide_service() -> T:
+            return self.get(service_cls)
+
+        provide_service.__name__ = f'provide_{service_cls.__name__}'
+        self._providers[service_cls] = provide_service
+        return provide_service
+
+    def reset(self) -> None:
+        """Forget constructed instances (tests, or after fork)."""
+        self._instances.clear()
+
+
+registry = ServiceRegistry()
+set_factory_resolver(registry.factory)
+
+
+def provide(service_cls: Type[T]) -> Callable[[], Awaitable[T]]:
+    return registry.provider(service_cls)
+
+
+async def invoke(method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Call a core-service method without blocking the event loop."""
+    policy = policy_of(method)
+    if policy == INLINE:
+        return method(*args, **kwargs)
+    if policy == ASYNC:
+        return await method(*args, **kwargs)
+    if policy == THREAD:
+        return await run_in_threadpool(metered(method), *args, **kwargs)
+    return await process_executor().run(method, *args, **kwargs)
@@ -0,0 +1,60 @@
+"""Encoded-response cache with strong ETags for cacheable controllers.
+
+    encoder = ResponseEncoder(Thing)
+    responses = CachedResponses('/thing', ttl=30, encoder=encoder)
+
+    @router.get("/thing")
+    async def thing(request: Request, service: ThingService = Depends(provide(ThingService))):
+        return await responses.respond(request, _payload, service)
+
+On a miss the payload coroutine runs once and its result is stored under
+the request key. Each representation a client negotiates (media type from
+``Accept``, content coding from ``Accept-Encoding``) is encoded with the
+route's ``ResponseEncoder`` the first time it is asked for, hashed into its
+own strong ETag, and kept next to the value; every response carries the
+encoder's ``Vary`` header. Until the entry expires, requests are answered
+from the stored bytes. A request whose ``If-None-Match`` names the ETag of
+its representation gets a 304 without calling the service or touching the
+body.
+"""
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from src.adapters.http.serialization import ResponseEncoder
+from src.adapters.http.singleflight import request_key
+from src.application.static_responses import StaticBody
+from src.core.cache import TTLCache
+
+
+class _Entry:
+    __slots__ = ('value', 'variants')
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.variants: Dict[Tuple[str, Optional[str]], StaticBody] = {}
+
+
+class CachedResponses:
+    def __init__(self, name: str, ttl: float = 60.0, maxsize: int = 128, encoder: Optional[ResponseEncoder] = None):
+        self.cache = TTLCache(f'responses:{name}', maxsize=maxsize, ttl=ttl)
+        self.encoder = encoder or ResponseEncoder()
+
+    def _variant(self, entry: _Entry, media_type: str, coding: Optional[str]) -> StaticBody:
+        variant = entry.variants.get((media_type, coding))
+        if variant is None:
+            body, applied = self.encoder.body(entry.value, media_type, coding)
+            headers = {'vary': self.encoder.vary}
+            if applied is not None:
+                headers['content-encoding'] = applied
+            variant = entry.variants[(media_type, coding)] = StaticBody(body, media_type, headers=headers)
+        return variant
+
+    async def respond(self, request: Request, payload: Callable[..., Awaitable[Any]], *args: Any) -> Response:
+        key = request_key(request)
+        entry = self.cache.get(key)
+        if entry is None:
+            entry = _Entry(await payload(*args))
+            self.cache.set(key, entry)
+        return self._variant(entry, *self.encoder.negotiate(request)).response(request)
@@ -0,0 +1,170 @@
+"""Response serialization with content negotiation and compression.
+
+Controllers declare a pydantic response model and hand instances to a
+``ResponseEncoder`` built once at import time::
+
+    class ThingResponse(BaseModel):
+        message: str
+
+    encoder = ResponseEncoder(ThingResponse)
+
+    @router.get("/thing", response_model=ThingResponse)
+    async def thing(request: Request, ...):
+        return encoder.respond(request, ThingResponse(message=...))
+
+The encoder wraps a pre-built ``TypeAdapter``, so the model's serializer is
+compiled once instead of per request. Because the handler returns a ready
+``Response``, FastAPI skips its own validate-and-``jsonable_encoder`` pass.
+``response_model`` still gives the route a typed OpenAPI schema.
+
+* JSON is produced by pydantic-core's serializer. Plain values, without a
+  model, use ``orjson`` when it is installed and the stdlib otherwise.
+* ``Accept: application/msgpack`` gets msgpack when the ``msgpack`` package
+  is installed and the client does not rank JSON higher (by ``q``);
+  otherwise JSON is served.
+* Bodies of at least ``SERIALIZATION_COMPRESS_MIN_BYTES`` (default 1024)
+  are compressed with the coding the client ranks highest: zstd (if the
+  ``zstandard`` package is installed) or gzip, zstd winning ties. A coding
+  with ``q=0`` is never used. Set the threshold to 0 to disable
+  compression.
+
+orjson, msgpack and zstandard are in requirements.txt, so the service image
+has them; without them the module falls back as described.
+"""
+import gzip
+import json
+import os
+from typing import Any, Dict, Optional, Tuple, Type
+
+from pydantic import TypeAdapter
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional; msgpack is only offered when installed
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip is always available
+    zstandard = None
+
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+MSGPACK_TYPES = (MSGPACK, 'application/x-msgpack')
+COMPRESS_MIN_BYTES = int(os.environ.get('SERIALIZATION_COMPRESS_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.environ.get('SERIALIZATION_GZIP_LEVEL', '5'))
+ZSTD_LEVEL = int(os.environ.get('SERIALIZATION_ZSTD_LEVEL', '3'))
+_zstd = zstandard.ZstdCompressor(level=ZSTD_LEVEL) if zstandard is not None else None
+
+
+def dumps_json(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+
+def qvalues(header: str) -> Dict[str, float]:
+    """``{token: q}`` for an ``Accept``-style header; a malformed ``q`` counts as 0."""
+    out: Dict[str, float] = {}
+    for part in header.lower().split(','):
+        token, *params = part.split(';')
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    q = 0.0
+        out[token.strip()] = q
+    return out
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """True when msgpack is named with q > 0 and JSON is not ranked higher."""
+    if msgpack is None or not accept:
+        return False
+    ranks = qvalues(accept)
+    q_msgpack = max(ranks.get(media, 0.0) for media in MSGPACK_TYPES)
+    q_json = next((ranks[media] for media in (JSON, 'application/*', '*/*') if media in ranks), 0.0)
+    return q_msgpack > 0 and q_msgpack >= q_json
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """The coding the client ranks highest (zstd winning ties), or None for identity."""
+    if not accept_encoding:
+        return None
+    ranks = qvalues(accept_encoding)
+    wildcard = ranks.get('*', 0.0)
+    q_gzip = ranks.get('gzip', wildcard)
+    q_zstd = ranks.get('zstd', wildcard) if _zstd is not None else 0.0
+    if q_zstd > 0 and q_zstd >= q_gzip:
+        return 'zstd'
+    if q_gzip > 0:
+        return 'gzip'
+    return None
+
+
+def _encode_content(body: bytes, coding: str) -> bytes:
+    if coding == 'zstd':
+        return _zstd.compress(body)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress(body: bytes, accept_encoding: Optional[str], min_bytes: int = COMPRESS_MIN_BYTES):
+    """Return ``(body, content_encoding)``; encoding is None when left uncompressed."""
+    if not min_bytes or len(body) < min_bytes:
+        return body, None
+    coding = choose_encoding(accept_encoding)
+    return (_encode_content(body, coding), coding) if coding else (body, None)
+
+
+class ResponseEncoder:
+    """Serializes one response model (or, with ``model=None``, plain values)."""
+
+    def __init__(self, model: Optional[Type[Any]] = None, compress_min_bytes: Optional[int] = None):
+        self.model = model
+        self.adapter = TypeAdapter(model) if model is not None else None
+        self.compress_min_bytes = COMPRESS_MIN_BYTES if compress_min_bytes is None else compress_min_bytes
+
+    def encode(self, value: Any, media_type: str = JSON) -> bytes:
+        if media_type == MSGPACK:
+            data = self.adapter.dump_python(value, mode='json') if self.adapter is not None else value
+            return msgpack.packb(data)
+        if self.adapter is not None:
+            return self.adapter.dump_json(value)
+        return dumps_json(value)
+
+    @property
+    def vary(self) -> str:
+        return 'Accept, Accept-Encoding' if self.compress_min_bytes else 'Accept'
+
+    def negotiate(self, request: Request) -> Tuple[str, Optional[str]]:
+        """``(media type, content coding)`` the request asked for; the coding is None for identity."""
+        headers = request.headers
+        media_type = MSGPACK if wants_msgpack(headers.get('accept')) else JSON
+        coding = choose_encoding(headers.get('accept-encoding')) if self.compress_min_bytes else None
+        return media_type, coding
+
+    def body(self, value: Any, media_type: str = JSON, coding: Optional[str] = None) -> Tuple[bytes, Optional[str]]:
+        """The encoded body, compressed with ``coding`` above the threshold, and the coding applied."""
+        body = self.encode(value, media_type)
+        if coding is None or len(body) < self.compress_min_bytes:
+            return body, None
+        return _encode_content(body, coding), coding
+
+    def respond(self, request: Request, value: Any, status_code: int = 200) -> Response:
+        media_type, coding = self.negotiate(request)
+        body, encoding = self.body(value, media_type, coding)
+        response = Response(body, status_code=status_code, media_type=media_type)
+        if encoding is not None:
+            response.headers['content-encoding'] = encoding
+        response.headers['vary'] = self.vary
+        return response
@@ -0,0 +1,67 @@
+"""Request coalescing (single-flight) for controller calls into core services.
+
+Concurrent calls that share a key share one in-flight execution::
+
+    coalesce = SingleFlight(grace=0.005)
+
+    @router.get("/thing")
+    async def thing(request: Request, service: ThingService = Depends(provide(ThingService))):
+        return {"message": await coalesce.do(request_key(request), invoke, service.check)}
+
+The shared call runs in its own task, so a caller that disconnects does not
+cancel the work for the others. All callers get the same result or the same
+exception. With ``grace > 0`` a successful result is also handed to
+callers that arrive up to ``grace`` seconds after it finished, which
+absorbs bursts that arrive just after the call completes.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from starlette.requests import Request
+
+
+def request_key(request: Request) -> Tuple[str, str, bytes]:
+    """Identity of a GET request for coalescing: method, path and raw query string."""
+    scope = request.scope
+    return scope['method'], scope['path'], scope.get('query_string', b'')
+
+
+class SingleFlight:
+    def __init__(self, grace: float = 0.0):
+        self.grace = grace
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._recent: Dict[Hashable, Tuple[float, Any]] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        if self.grace:
+            recent = self._recent.get(key)
+            if recent is not None and recent[0] > time.monotonic():
+                self.shared += 1
+                return recent[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn(*args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return  # exception() also marks it retrieved when every caller went away
+        if self.grace:
+            entry = (time.monotonic() + self.grace, task.result())
+            self._recent[key] = entry
+            asyncio.get_running_loop().call_later(self.grace, self._expire, key, entry)
+
+    def _expire(self, key: Hashable, entry: Tuple[float, Any]) -> None:
+        if self._recent.get(key) is entry:
+            del self._recent[key]
@@ -0,0 +1,190 @@
+"""Non-blocking, batched JSON access logging.
+
+The middleware formats one JSON line per response and appends it to a
+bounded in-memory queue; it never touches a file or stdout itself. A
+background thread drains the queue in batches and writes each batch with a
+single ``write`` + ``flush``. When the queue is full the record is dropped
+and counted (``access_log_dropped_total``) instead of blocking the event
+loop.
+
+    {"ts":1700000000.123,"pid":7,"method":"GET","path":"/v1/ping","route":"/v1/ping","status":200,"duration_ms":0.412,"bytes":61,"client":"10.0.0.5"}
+
+Configuration (per worker):
+
+  ACCESS_LOG_ENABLED=0          disable the middleware
+  ACCESS_LOG_PATH=-             file to append to; ``-`` is stdout
+  ACCESS_LOG_QUEUE=8192         records buffered before dropping
+  ACCESS_LOG_BATCH=256          records that wake the writer early
+  ACCESS_LOG_FLUSH_MS=200       longest a record waits to be written
+  ACCESS_LOG_SAMPLE='{"/healthz": 0.01, "/readyz": 0.01, "/v1/ping": 0.01, "/metrics": 0.01}'
+
+Sample rates are matched on the exact request path. By default probe and
+scrape traffic is logged at 1% and everything else in full. A 5xx response is
+always logged, whatever the rate. The writer thread is started by the app
+lifespan and flushed on shutdown.
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from json.encoder import encode_basestring_ascii
+from typing import BinaryIO, Deque, Dict, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.application.metrics import Registry
+
+DEFAULT_SAMPLE = {'/healthz': 0.01, '/readyz': 0.01, '/v1/ping': 0.01, '/metrics': 0.01}
+
+
+class AccessLogWriter:
+    """Drains queued records to ``stream`` (stdout by default) on a background thread.
+
+    Given ``path`` instead, the writer opens the file itself, closes it on
+    ``stop()`` and reopens it on the next ``start()``.
+    """
+
+    def __init__(self, stream: Optional[BinaryIO] = None, max_queue: int = 8192, batch_size: int = 256,
+                 flush_interval: float = 0.2, path: Optional[str] = None):
+        self.path = path if stream is None else None
+        if self.path is not None:
+            stream = open(self.path, 'ab')
+        self.stream = stream if stream is not None else sys.stdout.buffer
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: Deque[bytes] = deque()
+        self.written = 0
+        self.dropped = 0
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, line: bytes) -> bool:
+        """Queue one record; returns False (and counts a drop) when full. Never blocks."""
+        queue = self.queue
+        if len(queue) >= self.max_queue:
+            self.dropped += 1
+            return False
+        queue.append(line)  # deque.append is atomic, so the writer needs no lock
+        if len(queue) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def start(self) -> None:
+        if self.path is not None and self.stream.closed:
+            self.stream = open(self.path, 'ab')
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='access-log-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        if self.path is not None:
+            self.stream.close()
+
+    def flush(self) -> int:
+        queue = self.queue
+        batch = []
+        try:
+            while True:
+                batch.append(queue.popleft())
+        except IndexError:
+            pass
+        if batch:
+            try:
+                self.stream.write(b''.join(batch))
+                self.stream.flush()
+            except (OSError, ValueError):
+                self.dropped += len(batch)
+                return 0
+            self.written += len(batch)
+        return len(batch)
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+def format_record(ts: float, method: str, path: str, route: Optional[str], status: int, duration: float,
+                  size: int, client: Optional[str]) -> bytes:
+    return (
+        f'{{"ts":{ts:.3f},"pid":{os.getpid()},"method":"{method}","path":{encode_basestring_ascii(path)},'
+        f'"route":{encode_basestring_ascii(route) if route else "null"},"status":{status},'
+        f'"duration_ms":{duration * 1000:.3f},"bytes":{size},'
+        f'"client":{encode_basestring_ascii(client) if client else "null"}}}\n'
+    ).encode()
+
+
+class AccessLogMiddleware:
+    def __init__(self, app: ASGIApp, writer: AccessLogWriter, sample: Optional[Dict[str, float]] = None,
+                 registry: Optional[Registry] = None):
+        self.app = app
+        self.writer = writer
+        self.sample = DEFAULT_SAMPLE if sample is None else sample
+        self.registry = registry
+        if registry is not None:
+            self.drops = registry.counter(
+                'access_log_dropped_total', 'Access-log records dropped because the queue was full.', 'reason')
+            self.drop_slot = self.drops.slot('queue_full')
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body':
+                size += len(message.get('body', b''))
+            await send(message)
+
+        ts = time.time()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            path = scope['path']
+            rate = self.sample.get(path)
+            if rate is None or status >= 500 or random.random() < rate:
+                client = scope.get('client')
+                line = format_record(ts, scope['method'], path, getattr(scope.get('route'), 'path', None),
+                                     status, duration, size, client[0] if client else None)
+                if not self.writer.submit(line) and self.registry is not None:
+                    self.drops.inc(self.drop_slot)
+
+
+def writer_from_env() -> Optional[AccessLogWriter]:
+    if os.environ.get('ACCESS_LOG_ENABLED', '1') == '0':
+        return None
+    path = os.environ.get('ACCESS_LOG_PATH', '-')
+    return AccessLogWriter(
+        path=None if path == '-' else path,
+        max_queue=int(os.environ.get('ACCESS_LOG_QUEUE', '8192')),
+        batch_size=int(os.environ.get('ACCESS_LOG_BATCH', '256')),
+        flush_interval=int(os.environ.get('ACCESS_LOG_FLUSH_MS', '200')) / 1000,
+    )
+
+
+def sample_from_env() -> Dict[str, float]:
+    raw = os.environ.get('ACCESS_LOG_SAMPLE')
+    if not raw:
+        return dict(DEFAULT_SAMPLE)
+    return {path: float(rate) for path, rate in json.loads(raw).items()}
@@ -0,0 +1,173 @@
+"""Admission control and load shedding.
+
+Each pool allows ``max_inflight`` concurrent requests. Requests beyond that
+wait in a FIFO queue of at most ``max_queue`` entries, for at most
+``queue_timeout`` seconds. Anything that does not fit, or waits too long, is
+rejected at once with ``503`` and ``Retry-After``, so latency stays bounded
+instead of growing until probes time out.
+
+Paths in the priority lane (``/healthz``, ``/readyz``, ``/v1/ping`` and
+``/metrics`` by default) skip admission entirely and are never starved.
+Per-route pools are matched by longest path prefix, on segment boundaries
+(``/reports`` covers ``/reports`` and ``/reports/1`` but not ``/reportsX``);
+``{param}`` segments of manifest paths match any one segment. All other
+paths share the default pool.
+
+Configuration (per worker):
+
+  ADMISSION_ENABLED=0            disable the middleware
+  ADMISSION_MAX_INFLIGHT=256     default pool concurrency
+  ADMISSION_MAX_QUEUE=512        default pool queue length
+  ADMISSION_QUEUE_TIMEOUT_MS=500 default pool queue deadline
+  ADMISSION_RETRY_AFTER=1        Retry-After seconds on rejection
+  ADMISSION_ROUTES='{"/reports": {"max_inflight": 4, "max_queue": 8, "queue_timeout": 0.2}}'
+
+Route manifest entries may also carry an ``admission`` object with the same
+keys; it applies to every path of that controller.
+"""
+import asyncio
+import json
+import os
+import re
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Pattern, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.application.metrics import DURATION_BUCKETS, Registry
+from src.application.static_responses import StaticJSON
+
+PRIORITY_PATHS = ('/healthz', '/readyz', '/v1/ping', '/metrics')
+DEFAULT_POOL = 'default'
+
+
+def prefix_pattern(prefix: str) -> Pattern:
+    """Match paths equal to ``prefix`` or below it; ``{param}`` matches one segment."""
+    parts = re.split(r'\{[^}]*\}', prefix.rstrip('/'))
+    return re.compile('[^/]+'.join(re.escape(part) for part in parts) + '(?:/|$)')
+
+
+class Limit:
+    def __init__(self, max_inflight: int = 256, max_queue: int = 512, queue_timeout: float = 0.5):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+    @classmethod
+    def from_dict(cls, data: dict, base: Optional['Limit'] = None) -> 'Limit':
+        base = base or cls()
+        return cls(
+            max_inflight=int(data.get('max_inflight', base.max_inflight)),
+            max_queue=int(data.get('max_queue', base.max_queue)),
+            queue_timeout=float(data.get('queue_timeout', base.queue_timeout)),
+        )
+
+
+class Pool:
+    def __init__(self, name: str, limit: Limit):
+        self.name = name
+        self.limit = limit
+        self.inflight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = 0
+
+    async def acquire(self) -> Optional[float]:
+        """Take a slot; returns seconds spent queued, or None when rejected."""
+        if self.inflight < self.limit.max_inflight and not self.waiters:
+            self.inflight += 1
+            self.admitted += 1
+            return 0.0
+        if len(self.waiters) >= self.limit.max_queue:
+            self.rejected += 1
+            return None
+
+        start = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait((waiter,), timeout=self.limit.queue_timeout)
+        except asyncio.CancelledError:
+            if waiter.done():
+                self.release()  # the slot was handed over just as the client went away
+            else:
+                self.waiters.remove(waiter)
+            raise
+        if not waiter.done():
+            self.waiters.remove(waiter)
+            self.rejected += 1
+            return None
+        self.admitted += 1
+        return time.perf_counter() - start
+
+    def release(self) -> None:
+        if self.waiters:
+            self.waiters.popleft().set_result(None)  # hand the slot straight to the next waiter
+            return
+        self.inflight -= 1
+
+
+class AdmissionMiddleware:
+    def __init__(self, app: ASGIApp, default: Optional[Limit] = None,
+                 routes: Optional[Dict[str, Limit]] = None,
+                 priority_paths: Iterable[str] = PRIORITY_PATHS,
+                 retry_after: int = 1, registry: Optional[Registry] = None):
+        self.app = app
+        self.default = Pool(DEFAULT_POOL, default or Limit())
+        self.pools: List[Tuple[Pattern, Pool]] = [
+            (prefix_pattern(prefix), Pool(prefix, limit))
+            for prefix, limit in sorted((routes or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        ]
+        self.priority_paths = frozenset(priority_paths)
+        overloaded = StaticJSON({'detail': 'Service overloaded'}, status_code=503)
+        overloaded.raw_headers.append((b'retry-after', str(retry_after).encode('latin-1')))
+        self.overloaded = overloaded
+        self.registry = registry
+        if registry is not None:
+            self.rejections = registry.counter(
+                'admission_rejected_total', 'Requests shed by admission control, by pool.', 'pool')
+            self.queue_time = registry.histogram(
+                'admission_queue_seconds', 'Time admitted requests spent queued, by pool.', DURATION_BUCKETS, 'pool')
+
+    def pool_for(self, path: str) -> Pool:
+        for pattern, pool in self.pools:
+            if pattern.match(path):
+                return pool
+        return self.default
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['path'] in self.priority_paths:
+            await self.app(scope, receive, send)
+            return
+
+        pool = self.pool_for(scope['path'])
+        waited = await pool.acquire()
+        if waited is None:
+            if self.registry is not None:
+                self.rejections.inc(self.rejections.slot(pool.name))
+            await self.overloaded.response()(scope, receive, send)
+            return
+        if self.registry is not None and waited:
+            self.queue_time.observe(self.queue_time.slot(pool.name), waited)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            pool.release()
+
+
+def limits_from_env(manifest_specs: Iterable = ()) -> Tuple[Limit, Dict[str, Limit]]:
+    default = Limit(
+        max_inflight=int(os.environ.get('ADMISSION_MAX_INFLIGHT', '256')),
+        max_queue=int(os.environ.get('ADMISSION_MAX_QUEUE', '512')),
+        queue_timeout=int(os.environ.get('ADMISSION_QUEUE_TIMEOUT_MS', '500')) / 1000,
+    )
+    routes: Dict[str, Limit] = {}
+    for spec in manifest_specs:
+        admission = spec.metadata.get('admission')
+        if admission:
+            for route in spec.routes:
+                routes[route['path']] = Limit.from_dict(admission, default)
+    for prefix, data in json.loads(os.environ.get('ADMISSION_ROUTES') or '{}').items():
+        routes[prefix] = Limit.from_dict(data, default)
+    return default, routes
@@ -0,0 +1,152 @@
+"""Runtime enforcement of the ``@resource`` budgets declared in feature files.
+
+The generator copies each feature's ``@resource:cpu=…,memory=…,storage=…``
+tags into its route-manifest entry as a ``budget`` (largest value across
+the feature's scenarios)::
+
+    "budget": {"cpu": 0.1, "memory_mib": 128, "storage_mib": 10}
+
+For every request to a budgeted route the middleware measures:
+
+* CPU -- ``time.thread_time()`` on the event-loop thread across the
+  request, plus the CPU time of the ``thread`` and ``process`` calls the
+  handler made, measured on the thread or in the worker process that ran
+  them (see ``offloaded_cpu`` in ``src.core.execution``). The route's CPU
+  seconds are summed over a window (``RESOURCE_BUDGET_WINDOW``, default
+  10s). When the window closes, a route that averaged more than ``cpu``
+  cores counts one CPU overage.
+* memory -- the peak of Python allocations made while the request ran,
+  above what was allocated when it started (``tracemalloc``). A request
+  that allocated more than ``memory_mib`` counts one memory overage.
+  Allocations in the process pool are not seen.
+
+Tracing allocations slows every allocation in the process, so memory is
+only measured while ``tracemalloc`` is tracing. ``RESOURCE_BUDGET_MEMORY=1``
+starts it when a budget declares ``memory``; otherwise memory budgets are
+checked only while tracing was started some other way (for example via
+``/admin/memory/tracemalloc/start``). Other requests interleaved on the
+same loop add to a route's CPU and memory (and reset the allocation peak),
+so treat the numbers as attribution, not accounting. ``storage_mib`` is
+carried in the manifest but cannot be observed per request. Routes without
+a budget are not measured. Overages are exported as
+``route_cpu_budget_exceeded_total`` / ``route_memory_budget_exceeded_total``
+and CPU use as ``route_cpu_seconds_total``. They are also kept on
+``middleware.overages`` for tests and admin tooling.
+
+``RESOURCE_BUDGETS_ENABLED=0`` disables the middleware.
+"""
+import os
+import time
+import tracemalloc
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.application.metrics import Registry
+from src.core.execution import offloaded_cpu
+
+WINDOW = float(os.environ.get('RESOURCE_BUDGET_WINDOW', '10'))
+
+
+class Budget:
+    def __init__(self, route: str, cpu: Optional[float] = None, memory_mib: Optional[float] = None,
+                 storage_mib: Optional[float] = None):
+        self.route = route
+        self.cpu = cpu
+        self.memory_bytes = memory_mib * 1024 * 1024 if memory_mib else None
+        self.storage_mib = storage_mib
+        self.window_start = time.monotonic()
+        self.window_cpu = 0.0
+
+    @classmethod
+    def from_dict(cls, route: str, data: dict) -> 'Budget':
+        def number(key):
+            return float(data[key]) if data.get(key) is not None else None
+        return cls(route, number('cpu'), number('memory_mib'), number('storage_mib'))
+
+
+def budgets_from_manifest(manifest_specs: Iterable) -> List[Budget]:
+    budgets = []
+    for spec in manifest_specs:
+        data = spec.metadata.get('budget')
+        if data:
+            budgets.extend(Budget.from_dict(route['path'], data) for route in spec.routes)
+    return budgets
+
+
+class BudgetMiddleware:
+    def __init__(self, app: ASGIApp, budgets: Iterable[Budget], registry: Optional[Registry] = None,
+                 window: float = WINDOW, trace_memory: bool = False):
+        budgets = list(budgets)
+        self.app = app
+        self.window = window
+        self.exact: Dict[str, Budget] = {}
+        self.patterns: List[Tuple[Pattern, Budget]] = []
+        for budget in budgets:
+            if '{' in budget.route:
+                self.patterns.append((compile_path(budget.route)[0], budget))
+            else:
+                self.exact[budget.route] = budget
+        self.overages: Dict[str, Dict[str, int]] = {}
+        if trace_memory and any(b.memory_bytes is not None for b in budgets) and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.registry = registry
+        if registry is not None:
+            self.cpu_seconds = registry.counter(
+                'route_cpu_seconds_total', 'CPU seconds (event loop and offloaded calls) attributed to budgeted routes.',
+                'route')
+            self.cpu_exceeded = registry.counter(
+                'route_cpu_budget_exceeded_total', 'Windows in which a route used more CPU than its budget.', 'route')
+            self.memory_exceeded = registry.counter(
+                'route_memory_budget_exceeded_total', 'Requests that allocated more memory than the route budget.', 'route')
+
+    def budget_for(self, path: str) -> Optional[Budget]:
+        budget = self.exact.get(path)
+        if budget is None and self.patterns:
+            for pattern, candidate in self.patterns:
+                if pattern.match(path):
+                    return candidate
+        return budget
+
+    def _exceeded(self, budget: Budget, kind: str) -> None:
+        counts = self.overages.setdefault(budget.route, {'cpu': 0, 'memory': 0})
+        counts[kind] += 1
+        if self.registry is not None:
+            counter = self.cpu_exceeded if kind == 'cpu' else self.memory_exceeded
+            counter.inc(counter.slot(budget.route))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        budget = self.budget_for(scope['path']) if scope['type'] == 'http' else None
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            allocated_before = tracemalloc.get_traced_memory()[0]
+        offloaded = [0.0]
+        token = offloaded_cpu.set(offloaded)
+        cpu_before = time.thread_time()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            cpu = time.thread_time() - cpu_before + offloaded[0]
+            offloaded_cpu.reset(token)
+            allocated = tracemalloc.get_traced_memory()[1] - allocated_before if tracing else 0
+            self._account(budget, cpu, allocated)
+
+    def _account(self, budget: Budget, cpu: float, allocated: int) -> None:
+        if self.registry is not None:
+            self.cpu_seconds.inc(self.cpu_seconds.slot(budget.route), cpu)
+        if budget.cpu is not None:
+            budget.window_cpu += cpu
+            now = time.monotonic()
+            elapsed = now - budget.window_start
+            if elapsed >= self.window:
+                if budget.window_cpu > budget.cpu * elapsed:
+                    self._exceeded(budget, 'cpu')
+                budget.window_start, budget.window_cpu = now, 0.0
+        if budget.memory_bytes is not None and allocated > budget.memory_bytes:
+            self._exceeded(budget, 'memory')
@@ -0,0 +1,227 @@
+"""Production launcher: size uvicorn from resource estimates and the cgroup.
+
+Usage: python -m src.application.launcher [--dry-run]
+
+The worker count, listen backlog, keep-alive and loop/HTTP implementations
+are derived from ``reports/resource-estimates.json`` (written by
+``scripts/resource_estimator.py``), the container's cgroup CPU quota and
+memory limit, and the CPUs the process may run on. Every value can be pinned
+with an environment variable:
+
+  WEB_CONCURRENCY, BACKLOG, KEEP_ALIVE, UVICORN_LOOP, UVICORN_HTTP,
+  MAX_REQUESTS, GRACEFUL_TIMEOUT, HOST, PORT, APP_MODULE, RESOURCE_ESTIMATES,
+  CORE_PROCESS_WORKERS, METRICS_DIR (defaults to a fresh temporary directory
+  per launch)
+
+When a controller in the route manifest runs with the ``process`` execution
+policy (or ``CORE_PROCESS_WORKERS`` is set), every uvicorn worker also owns
+a core process pool (see ``src.core.execution``). The plan then splits the
+cores between uvicorn workers and their pools, and counts each pool
+process at the per-worker memory estimate. Measured estimates also carry
+``inflight_memory_mib``, the memory of the requests in flight at the target
+rate; it is set aside from the memory limit once, whatever the worker count.
+
+Workers run under uvicorn's multiprocess supervisor. The parent binds the
+listening socket before spawning workers (pre-fork), replaces workers that
+die, restarts them one at a time on SIGHUP, and adds or removes one worker
+on SIGTTIN/SIGTTOU.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_ESTIMATES = ROOT / 'reports' / 'resource-estimates.json'
+ROUTE_MANIFEST = ROOT / 'src' / 'adapters' / 'http' / 'routes.json'
+CGROUP_ROOT = Path('/sys/fs/cgroup')
+
+# Fallbacks when resource-estimates.json is missing (mirrors the estimator's base values).
+DEFAULT_MEMORY_MIB = 64
+
+
+@dataclass
+class LaunchPlan:
+    app: str
+    host: str
+    port: int
+    workers: int
+    backlog: int
+    keep_alive: int
+    loop: str
+    http: str
+    max_requests: Optional[int]
+    graceful_timeout: int
+    cpu_limit: Optional[float]
+    memory_limit_mib: Optional[int]
+    process_workers: int = 0  # core process-pool size per uvicorn worker
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit(root: Path = CGROUP_ROOT) -> Optional[float]:
+    """CPU cores granted by the cgroup quota, or None when unlimited."""
+    v2 = _read(root / 'cpu.max')
+    if v2:
+        quota, _, period = v2.partition(' ')
+        if quota != 'max' and period:
+            return int(quota) / int(period)
+        return None
+    quota = _read(root / 'cpu' / 'cpu.cfs_quota_us')
+    period = _read(root / 'cpu' / 'cpu.cfs_period_us')
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+    return None
+
+
+def cgroup_memory_limit_mib(root: Path = CGROUP_ROOT) -> Optional[int]:
+    raw = _read(root / 'memory.max') or _read(root / 'memory' / 'memory.limit_in_bytes')
+    if not raw or raw == 'max':
+        return None
+    limit = int(raw) // (1024 * 1024)
+    # cgroup v1 reports "unlimited" as a huge page-aligned number
+    return limit if limit < 1 << 40 else None
+
+
+def available_cpus() -> int:
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def somaxconn() -> int:
+    raw = _read(Path('/proc/sys/net/core/somaxconn'))
+    return int(raw) if raw else 4096
+
+
+def load_estimates(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text())
+    except ValueError:
+        return {}
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+def uses_process_pool(manifest: Path = ROUTE_MANIFEST) -> bool:
+    if os.environ.get('CORE_PROCESS_WORKERS'):
+        return True
+    try:
+        routers = json.loads(manifest.read_text()).get('routers', [])
+    except (OSError, ValueError):
+        return False
+    return any(entry.get('execution') == 'process' for entry in routers)
+
+
+def plan_launch(estimates: dict, cpus: int, cpu_limit: Optional[float],
+                memory_limit_mib: Optional[int], max_backlog: int, process_pool: bool = False) -> LaunchPlan:
+    # One process per usable core: the quota caps fractional CPUs, affinity caps the rest.
+    cores = max(1, int(min(cpus, cpu_limit) if cpu_limit else cpus))
+    # With a process pool, each uvicorn worker brings its pool's processes along.
+    pool = (_env_int('CORE_PROCESS_WORKERS') or 1) if process_pool else 0
+    workers = max(1, cores // (1 + pool))
+    # Never plan more workers than the memory limit can hold at the estimated per-process RSS,
+    # after the requests in flight at the target rate (shared by all workers).
+    per_worker_mib = (estimates.get('memory_mib') or DEFAULT_MEMORY_MIB) * (1 + pool)
+    if memory_limit_mib:
+        usable_mib = memory_limit_mib - (estimates.get('inflight_memory_mib') or 0)
+        workers = max(1, min(workers, usable_mib // per_worker_mib))
+    workers = _env_int('WEB_CONCURRENCY') or workers
+
+    backlog = _env_int('BACKLOG') or min(max_backlog, max(2048, 1024 * workers))
+    keep_alive = _env_int('KEEP_ALIVE') or int(estimates.get('keep_alive_s', 5))
+
+    loop = os.environ.get('UVICORN_LOOP') or ('uvloop' if importlib.util.find_spec('uvloop') else 'asyncio')
+    http = os.environ.get('UVICORN_HTTP') or ('httptools' if importlib.util.find_spec('httptools') else 'h11')
+
+    return LaunchPlan(
+        app=os.environ.get('APP_MODULE', 'src.application.main:app'),
+        host=os.environ.get('HOST', '0.0.0.0'),
+        port=_env_int('PORT') or 8000,
+        workers=workers,
+        backlog=backlog,
+        keep_alive=keep_alive,
+        loop=loop,
+        http=http,
+        max_requests=_env_int('MAX_REQUESTS'),
+        graceful_timeout=_env_int('GRACEFUL_TIMEOUT') or 30,
+        cpu_limit=cpu_limit,
+        memory_limit_mib=memory_limit_mib,
+        process_workers=pool,
+    )
+
+
+def current_plan() -> LaunchPlan:
+    estimates_path = Path(os.environ.get('RESOURCE_ESTIMATES', str(DEFAULT_ESTIMATES)))
+    return plan_launch(
+        load_estimates(estimates_path),
+        cpus=available_cpus(),
+        cpu_limit=cgroup_cpu_limit(),
+        memory_limit_mib=cgroup_memory_limit_mib(),
+        max_backlog=somaxconn(),
+        process_pool=uses_process_pool(),
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dry-run', action='store_true', help='Print the launch plan and exit')
+    args = parser.parse_args(argv)
+
+    plan = current_plan()
+    print('Launch plan:', json.dumps(asdict(plan)), file=sys.stderr, flush=True)
+    if args.dry_run:
+        return 0
+
+    import uvicorn
+    from uvicorn.supervisors import Multiprocess
+
+    # Workers write per-process metric files here; /metrics merges them.
+    os.environ.setdefault('METRICS_DIR', tempfile.mkdtemp(prefix='example-service-metrics-'))
+    if plan.process_workers:
+        os.environ['CORE_PROCESS_WORKERS'] = str(plan.process_workers)  # the size the plan assumed
+    # One token-bucket table for every worker (src.application.ratelimit).
+    os.environ.setdefault('RATELIMIT_FILE', os.path.join(os.environ['METRICS_DIR'], 'ratelimit.db'))
+
+    config = uvicorn.Config(
+        plan.app,
+        host=plan.host,
+        port=plan.port,
+        workers=plan.workers,
+        backlog=plan.backlog,
+        timeout_keep_alive=plan.keep_alive,
+        loop=plan.loop,
+        http=plan.http,
+        limit_max_requests=plan.max_requests,
+        timeout_graceful_shutdown=plan.graceful_timeout,
+        proxy_headers=True,
+        # The app writes its own non-blocking access log (src.application.access_log).
+        access_log=os.environ.get('ACCESS_LOG_ENABLED', '1') == '0',
+    )
+    # Always supervise, even with one worker, so SIGHUP restarts are available.
+    sock = config.bind_socket()
+    try:
+        supervisor = Multiprocess(config, sockets=[sock])
+    except TypeError:  # older uvicorn releases take the worker target explicitly
+        supervisor = Multiprocess(config, target=uvicorn.Server(config).run, sockets=[sock])
+    supervisor.run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
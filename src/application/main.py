@@ -1,16 +1,187 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Optional
+
+from fastapi import FastAPI, Request, Response
 import os
 
+from src.application.access_log import AccessLogMiddleware, sample_from_env, writer_from_env
+from src.application.admission import AdmissionMiddleware, limits_from_env
+from src.application.budgets import BudgetMiddleware, budgets_from_manifest
+from src.application.memory import admin_router as memory_admin_router
+from src.application.metrics import CONTENT_TYPE, MetricsMiddleware, get_registry
+from src.application.openapi_snapshot import load_snapshot, serve_snapshot
+from src.application.profiling import ProfilingMiddleware, recent_profiles, settings_from_env, verify_token
+from src.application.ratelimit import RateLimitMiddleware, rules_from_env, table_from_env
+from src.application.readiness import ReadinessRegistry, readiness as default_readiness
+from src.application.routers import MANIFEST_PATH, RouterLoader, load_manifest
+from src.application.static_responses import StaticJSON
+from src.application.tracing import TracingMiddleware
+from src.core.cache import set_cache_observer
+from src.core.execution import ExecutionQueueFull, process_executor, shutdown_process_executor
+from src.core.tracing import shutdown as shutdown_tracing, tracer_from_env
+
+
+SERVICE_NAME = 'example-service'
+
+
+def build_info() -> dict:
+    """Build metadata baked into /v1/ping; read once per worker."""
+    return {"pong": True, "service": SERVICE_NAME, "commit": os.environ.get('COMMIT_SHA', 'dev')}
+
+
+def add_probe_routes(app: FastAPI, static: bool = True) -> None:
+    """Register /healthz and /v1/ping.
+
+    In static-response mode (the default) both bodies are encoded once here
+    and every request replays the same bytes, ETag and Content-Length.
+    ``static=False`` keeps the original per-request dict handlers.
+    """
+    if static:
+        healthz_body = StaticJSON({"status": "ok"})
+        ping_body = StaticJSON(build_info())
+
+        @app.get('/healthz')
+        async def healthz(request: Request):
+            return healthz_body.response(request)
+
+        @app.get('/v1/ping')
+        async def ping(request: Request):
+            return ping_body.response(request)
+        return
+
+    @app.get('/healthz')
+    async def healthz():
+        return {"status": "ok"}
+
+    @app.get('/v1/ping')
+    async def ping():
+        commit = os.environ.get('COMMIT_SHA', 'dev')
+        return {"pong": True, "service": SERVICE_NAME, "commit": commit}
+
+
+def create_app(manifest: Optional[Path] = None, readiness: Optional[ReadinessRegistry] = None) -> FastAPI:
+    """Build the service app: probe routes plus every generated controller.
+
+    Generated controllers are discovered from the router manifest and mounted
+    according to their ``load`` mode (see ``src.application.routers``). The
+    optional middleware and admin routes are switched by environment
+    variables documented in their own modules under ``src.application``.
+    """
+    loader: Optional[RouterLoader] = None
+    readiness = default_readiness if readiness is None else readiness
+    access_log = writer_from_env()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if loader.pending:
+            warmup = asyncio.ensure_future(loader.warm())
+        else:
+            warmup = None
+        if access_log is not None:
+            access_log.start()
+        if os.environ.get('CORE_PROCESS_PREWARM') == '1':
+            await asyncio.to_thread(process_executor().start)
+        await readiness.start()
+        yield
+        await readiness.stop()
+        await asyncio.to_thread(shutdown_process_executor)
+        if access_log is not None:
+            access_log.stop()
+        await asyncio.to_thread(shutdown_tracing)  # export spans still queued
+        if warmup is not None and not warmup.done():
+            warmup.cancel()
+
+    app = FastAPI(lifespan=lifespan)
+    add_probe_routes(app, static=os.environ.get('STATIC_RESPONSES', '1') != '0')
+
+    process_pool_full = StaticJSON({'detail': 'Service overloaded'}, status_code=503)
+    process_pool_full.raw_headers.append((b'retry-after', b'1'))
+
+    @app.exception_handler(ExecutionQueueFull)
+    async def execution_queue_full(request: Request, exc: ExecutionQueueFull):
+        return process_pool_full.response()
+
+    @app.get('/readyz')
+    async def readyz(request: Request):
+        return readiness.response(request)
+
+    loader = RouterLoader(app, load_manifest(manifest or MANIFEST_PATH))
+    loader.install(force_eager=os.environ.get('ROUTER_LOADING') == 'eager')
+    app.state.router_loader = loader
+
+    snapshot = None
+    if os.environ.get('OPENAPI_SNAPSHOT', '1') != '0':
+        snapshot = load_snapshot(manifest or MANIFEST_PATH)
+    if snapshot is not None:
+        serve_snapshot(app, snapshot)
+    else:
+        openapi = app.openapi
+
+        def openapi_with_all_routers():
+            # The schema must describe every controller, not just the ones hit so far.
+            loader.load_all()
+            return openapi()
+
+        app.openapi = openapi_with_all_routers
+
+    registry = get_registry() if os.environ.get('METRICS_ENABLED', '1') != '0' else None
+
+    profiling = settings_from_env()
+    if profiling is not None:
+        # Innermost, so queueing in admission control is not profiled.
+        app.add_middleware(ProfilingMiddleware, **profiling)
+
+    if profiling is not None and profiling['secret']:
+        # Never mounted without a secret: profiles expose code paths and timings.
+        @app.get('/admin/profiles', include_in_schema=False)
+        def profiles(request: Request, limit: int = 20):  # reads files, so let it run on the threadpool
+            if not verify_token(profiling['secret'], request.headers.get('x-profile-token', '')):
+                return Response(status_code=403)
+            return {'profiles': recent_profiles(profiling['output_dir'], limit)}
+
+    memory_secret = os.environ.get('MEMORY_ADMIN_SECRET')
+    if os.environ.get('MEMORY_ADMIN_ENABLED') == '1' and memory_secret:
+        # Never mounted without a secret: tracemalloc and heap scans slow the worker down.
+        app.include_router(memory_admin_router(secret=memory_secret))
+
+    if os.environ.get('RESOURCE_BUDGETS_ENABLED', '1') != '0':
+        budgets = budgets_from_manifest(loader.specs)
+        if budgets:
+            app.add_middleware(BudgetMiddleware, budgets=budgets, registry=registry,
+                               trace_memory=os.environ.get('RESOURCE_BUDGET_MEMORY') == '1')
+
+    if registry is not None:
+        app.add_middleware(MetricsMiddleware, registry=registry)
+        set_cache_observer(registry.cache_event)
+
+        @app.get('/metrics', include_in_schema=False)
+        async def metrics():
+            return Response(registry.exposition(), media_type=CONTENT_TYPE)
+
+    if os.environ.get('TRACING_ENABLED', '1') != '0':
+        app.add_middleware(TracingMiddleware, tracer=tracer_from_env())
+
+    if os.environ.get('ADMISSION_ENABLED', '1') != '0':
+        # Outside everything but rate limiting and the access log: shed load before any other work.
+        default_limit, route_limits = limits_from_env(loader.specs)
+        app.add_middleware(AdmissionMiddleware, default=default_limit, routes=route_limits,
+                           retry_after=int(os.environ.get('ADMISSION_RETRY_AFTER', '1')), registry=registry)
 
-app = FastAPI()
+    if os.environ.get('RATELIMIT_ENABLED', '1') != '0':
+        default_rule, route_rules = rules_from_env(loader.specs)
+        if default_rule is not None or route_rules:
+            # Outside admission control, so over-limit clients never take a slot or a queue place.
+            app.add_middleware(RateLimitMiddleware, table=table_from_env(), default=default_rule,
+                               routes=route_rules, key=os.environ.get('RATELIMIT_KEY', 'client'),
+                               registry=registry)
 
+    if access_log is not None:
+        # Outermost, so shed requests are logged too.
+        app.add_middleware(AccessLogMiddleware, writer=access_log, sample=sample_from_env(), registry=registry)
 
-@app.get('/healthz')
-async def healthz():
-    return {"status": "ok"}
+    return app
 
 
-@app.get('/v1/ping')
-async def ping():
-    commit = os.environ.get('COMMIT_SHA', 'dev')
-    return {"pong": True, "service": "example-service", "commit": commit}
+app = create_app()
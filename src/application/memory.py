@@ -0,0 +1,196 @@
+"""Memory introspection for long-running workers.
+
+Disabled unless ``MEMORY_ADMIN_ENABLED=1``. When enabled, /admin/memory
+exposes:
+
+  POST /admin/memory/tracemalloc/start?frames=25  start tracing allocations
+  POST /admin/memory/tracemalloc/stop             stop tracing, drop snapshots
+  POST /admin/memory/snapshots/{name}             take a named snapshot
+  GET  /admin/memory/snapshots                    list snapshots
+  GET  /admin/memory/snapshots/{name}?limit=20    top allocation sites
+  GET  /admin/memory/diff?base=a&target=b         growth between two snapshots
+  GET  /admin/memory/gc                           GC generation stats
+  GET  /admin/memory/objects?limit=30             live object counts by type
+
+Every state is per worker: with several workers, each request inspects
+whichever process accepted it (see ``pid`` in the responses). Requests
+must carry ``X-Admin-Token`` signed with ``MEMORY_ADMIN_SECRET``
+(``src.application.profiling.sign_token``); without a secret the routes
+are not mounted at all.
+
+Snapshots are kept in memory, at most ``MAX_SNAPSHOTS`` at a time; the
+oldest is dropped first. tracemalloc slows allocation-heavy code
+noticeably, so start it only while investigating.
+"""
+import gc
+import os
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from src.application.profiling import verify_token
+
+MAX_SNAPSHOTS = 8
+GROUP_BY = ('lineno', 'filename', 'traceback')
+
+
+def rss_bytes() -> Optional[int]:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def _site(stat) -> Dict:
+    frame = stat.traceback[0]
+    return {'file': frame.filename, 'line': frame.lineno, 'size_bytes': stat.size, 'count': stat.count}
+
+
+class MemoryInspector:
+    def __init__(self, max_snapshots: int = MAX_SNAPSHOTS):
+        self.max_snapshots = max_snapshots
+        self.snapshots: 'OrderedDict[str, tracemalloc.Snapshot]' = OrderedDict()
+        self.taken_at: Dict[str, float] = {}
+
+    def start(self, frames: int = 25) -> Dict:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        return self.status()
+
+    def stop(self) -> Dict:
+        tracemalloc.stop()
+        self.snapshots.clear()
+        self.taken_at.clear()
+        return self.status()
+
+    def status(self) -> Dict:
+        current, peak = tracemalloc.get_traced_memory()
+        return {'pid': os.getpid(), 'tracing': tracemalloc.is_tracing(),
+                'traceback_limit': tracemalloc.get_traceback_limit(),
+                'traced_bytes': current, 'traced_peak_bytes': peak, 'rss_bytes': rss_bytes()}
+
+    def snapshot(self, name: str) -> Dict:
+        if not tracemalloc.is_tracing():
+            raise ValueError('tracemalloc is not running; start it first')
+        snap = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        self.snapshots.pop(name, None)
+        self.snapshots[name] = snap
+        self.taken_at[name] = time.time()
+        while len(self.snapshots) > self.max_snapshots:
+            dropped, _ = self.snapshots.popitem(last=False)
+            self.taken_at.pop(dropped, None)
+        return self.describe(name)
+
+    def _get(self, name: str) -> tracemalloc.Snapshot:
+        try:
+            return self.snapshots[name]
+        except KeyError:
+            raise KeyError(f'No snapshot named {name!r}') from None
+
+    def describe(self, name: str) -> Dict:
+        snap = self._get(name)
+        return {'name': name, 'taken_at': self.taken_at[name],
+                'traced_bytes': sum(t.size for t in snap.traces), 'traces': len(snap.traces)}
+
+    def top(self, name: str, limit: int = 20, group_by: str = 'lineno') -> List[Dict]:
+        stats = self._get(name).statistics(group_by)
+        if group_by == 'traceback':
+            return [dict(_site(s), traceback=s.traceback.format()) for s in stats[:limit]]
+        return [_site(s) for s in stats[:limit]]
+
+    def diff(self, base: str, target: str, limit: int = 20, group_by: str = 'lineno') -> Dict:
+        stats = self._get(target).compare_to(self._get(base), group_by)
+        return {
+            'base': base,
+            'target': target,
+            'size_diff_bytes': sum(s.size_diff for s in stats),
+            'count_diff': sum(s.count_diff for s in stats),
+            'top': [dict(_site(s), size_diff_bytes=s.size_diff, count_diff=s.count_diff) for s in stats[:limit]],
+        }
+
+
+def gc_stats() -> Dict:
+    return {
+        'pid': os.getpid(),
+        'enabled': gc.isenabled(),
+        'thresholds': gc.get_threshold(),
+        'counts': gc.get_count(),
+        'generations': gc.get_stats(),
+        'garbage': len(gc.garbage),
+    }
+
+
+def object_counts(limit: int = 30) -> Dict:
+    counts = Counter(type(o).__qualname__ for o in gc.get_objects())
+    return {'pid': os.getpid(), 'tracked_objects': sum(counts.values()),
+            'types': [{'type': name, 'count': n} for name, n in counts.most_common(limit)]}
+
+
+def admin_router(inspector: Optional[MemoryInspector] = None, secret: Optional[str] = None) -> APIRouter:
+    """Routes under /admin/memory; handlers are sync so the heavy work runs on the threadpool."""
+    inspector = inspector or MemoryInspector()
+
+    def require_token(request: Request) -> None:
+        if not secret or not verify_token(secret, request.headers.get('x-admin-token', '')):
+            raise HTTPException(status_code=403)
+
+    def check_group_by(group_by: str) -> str:
+        if group_by not in GROUP_BY:
+            raise HTTPException(status_code=422, detail=f'group_by must be one of {", ".join(GROUP_BY)}')
+        return group_by
+
+    router = APIRouter(prefix='/admin/memory', include_in_schema=False, dependencies=[Depends(require_token)])
+
+    @router.post('/tracemalloc/start')
+    def start(frames: int = 25):
+        return inspector.start(frames)
+
+    @router.post('/tracemalloc/stop')
+    def stop():
+        return inspector.stop()
+
+    @router.get('/tracemalloc')
+    def status():
+        return inspector.status()
+
+    @router.post('/snapshots/{name}')
+    def snapshot(name: str):
+        try:
+            return inspector.snapshot(name)
+        except ValueError as exc:
+            raise HTTPException(status_code=409, detail=str(exc))
+
+    @router.get('/snapshots')
+    def snapshots():
+        return {'pid': os.getpid(), 'snapshots': [inspector.describe(n) for n in inspector.snapshots]}
+
+    @router.get('/snapshots/{name}')
+    def top(name: str, limit: int = 20, group_by: str = 'lineno'):
+        try:
+            return {'name': name, 'top': inspector.top(name, limit, check_group_by(group_by))}
+        except KeyError as exc:
+            raise HTTPException(status_code=404, detail=exc.args[0])
+
+    @router.get('/diff')
+    def diff(base: str, target: str, limit: int = 20, group_by: str = 'lineno'):
+        try:
+            return inspector.diff(base, target, limit, check_group_by(group_by))
+        except KeyError as exc:
+            raise HTTPException(status_code=404, detail=exc.args[0])
+
+    @router.get('/gc')
+    def gc_generations():
+        return gc_stats()
+
+    @router.get('/objects')
+    def objects(limit: int = 30):
+        return object_counts(limit)
+
+    return router
@@ -0,0 +1,344 @@
+"""Per-route latency and response-size histograms exposed at ``/metrics``.
+
+Values live in one flat array of float64 slots per worker. Each time series
+(one label combination of a histogram or counter) owns a fixed run of slots,
+allocated the first time the series is seen. After that, recording an
+observation is a dict lookup plus in-place adds on the array, and the
+middleware reuses its ``send`` wrappers, so steady-state requests allocate
+nothing that outlives them. Histograms are written only by the worker's
+event-loop thread and need no lock. Cache counters are also bumped from
+threadpool threads, so ``Registry.cache_event`` takes a lock.
+
+Single-process apps use an anonymous mapping. When ``METRICS_DIR`` is set
+(the launcher sets it for multi-worker runs), each worker maps
+``<METRICS_DIR>/metrics-<pid>.db`` and records its series table in a JSON
+sidecar (rewritten by a background thread when a new series appears,
+never on the event loop). ``/metrics`` then sums every worker's file into
+one Prometheus text exposition, so counters survive worker restarts just
+as in prometheus_client's multiprocess mode.
+"""
+import atexit
+import json
+import mmap
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+CAPACITY = 1 << 16  # float64 slots per worker (512 KiB)
+OVERFLOW_RESERVE = 256  # tail slots kept for the overflow series
+OVERFLOW_LABEL = '__overflow__'
+UNMATCHED_ROUTE = '__unmatched__'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DURATION_SUM = len(DURATION_BUCKETS) + 1
+SIZE_SUM = len(SIZE_BUCKETS) + 1
+
+Merged = Dict[str, List[float]]
+
+
+class MetricsStore:
+    """Fixed-size float64 slot array, optionally file-backed for cross-worker merges."""
+
+    def __init__(self, directory: Optional[str] = None, capacity: int = CAPACITY,
+                 worker_id: Optional[str] = None):
+        self.directory = Path(directory) if directory else None
+        self.capacity = capacity
+        size = capacity * 8
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.path = self.directory / f'metrics-{worker_id or os.getpid()}.db'
+            # A file left by an earlier worker with the same id (a recycled pid) starts from zero,
+            # and its series table goes with it until this worker writes its own.
+            self.path.with_suffix('.json').unlink(missing_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+                self._mmap = mmap.mmap(fd, size)
+            finally:
+                os.close(fd)
+        else:
+            self.path = None
+            self._mmap = mmap.mmap(-1, size)
+        self.values = memoryview(self._mmap).cast('d')
+        self.series: Dict[str, Tuple[int, int]] = {}
+        self._next = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+
+    def allocate(self, key: str, width: int) -> Optional[int]:
+        """Reserve ``width`` slots for ``key``; None once the array is full."""
+        with self._lock:
+            if key in self.series:
+                return self.series[key][0]
+            limit = self.capacity if key.endswith('|' + OVERFLOW_LABEL) else self.capacity - OVERFLOW_RESERVE
+            if self._next + width > limit:
+                return None
+            offset = self._next
+            self._next += width
+            self.series[key] = (offset, width)
+            if self.path:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name='metrics-sidecar', daemon=True)
+                    self._writer.start()
+                    atexit.register(self.flush)
+                self._dirty.set()
+        return offset
+
+    def _write_loop(self) -> None:
+        while True:
+            self._dirty.wait()
+            self._dirty.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the series table to the sidecar now."""
+        if not self.path:
+            return
+        with self._write_lock:
+            with self._lock:
+                data = json.dumps(self.series)
+            sidecar = self.path.with_suffix('.json')
+            tmp = sidecar.with_suffix('.json.tmp')
+            try:
+                tmp.write_text(data)
+                os.replace(tmp, sidecar)
+            except OSError:
+                pass
+
+    def merged(self) -> Merged:
+        """Series values summed across every worker sharing the directory.
+
+        Other workers' newest series show up once their sidecar thread has
+        written them.
+        """
+        if not self.directory:
+            with self._lock:
+                series = list(self.series.items())
+            return {key: list(self.values[o:o + w]) for key, (o, w) in series}
+        self.flush()
+        out: Merged = {}
+        for sidecar in sorted(self.directory.glob('metrics-*.json')):
+            try:
+                series = json.loads(sidecar.read_text())
+                raw = array('d')
+                raw.frombytes(sidecar.with_suffix('.db').read_bytes())
+            except (OSError, ValueError):
+                continue
+            for key, (offset, width) in series.items():
+                values = raw[offset:offset + width]
+                acc = out.get(key)
+                if acc is None:
+                    out[key] = list(values)
+                else:
+                    for i, v in enumerate(values):
+                        acc[i] += v
+        return out
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+class Histogram:
+    """Fixed-bucket histogram keyed by a single label."""
+
+    def __init__(self, store: MetricsStore, name: str, help: str, buckets: Tuple[float, ...], label: str):
+        self.store = store
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.label = label
+        self.width = len(buckets) + 2  # per-bucket counts, +Inf, sum
+        self._sum = len(buckets) + 1
+        self._slots: Dict[str, int] = {}
+
+    def slot(self, label_value: str) -> int:
+        try:
+            return self._slots[label_value]
+        except KeyError:
+            pass
+        offset = self.store.allocate(f'{self.name}|{label_value}', self.width)
+        if offset is None:
+            offset = self.store.allocate(f'{self.name}|{OVERFLOW_LABEL}', self.width)
+        self._slots[label_value] = offset
+        return offset
+
+    def observe(self, slot: int, value: float) -> None:
+        values = self.store.values
+        values[slot + bisect_left(self.buckets, value)] += 1
+        values[slot + self._sum] += value
+
+    def render(self, merged: Merged) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} histogram'
+        prefix = self.name + '|'
+        for key in sorted(k for k in merged if k.startswith(prefix)):
+            values = merged[key]
+            label = f'{self.label}="{_escape(key[len(prefix):])}"'
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                yield f'{self.name}_bucket{{{label},le="{_fmt(bound)}"}} {_fmt(cumulative)}'
+            cumulative += values[len(self.buckets)]
+            yield f'{self.name}_bucket{{{label},le="+Inf"}} {_fmt(cumulative)}'
+            yield f'{self.name}_sum{{{label}}} {_fmt(values[self._sum])}'
+            yield f'{self.name}_count{{{label}}} {_fmt(cumulative)}'
+
+
+class Counter:
+    """Monotonic counter keyed by a single label."""
+
+    def __init__(self, store: MetricsStore, name: str, help: str, label: str):
+        self.store = store
+        self.name = name
+        self.help = help
+        self.label = label
+        self._slots: Dict[str, int] = {}
+
+    def slot(self, label_value: str) -> int:
+        try:
+            return self._slots[label_value]
+        except KeyError:
+            pass
+        offset = self.store.allocate(f'{self.name}|{label_value}', 1)
+        if offset is None:
+            offset = self.store.allocate(f'{self.name}|{OVERFLOW_LABEL}', 1)
+        self._slots[label_value] = offset
+        return offset
+
+    def inc(self, slot: int, amount: float = 1.0) -> None:
+        self.store.values[slot] += amount
+
+    def render(self, merged: Merged) -> Iterable[str]:
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} counter'
+        prefix = self.name + '|'
+        for key in sorted(k for k in merged if k.startswith(prefix)):
+            yield f'{self.name}{{{self.label}="{_escape(key[len(prefix):])}"}} {_fmt(merged[key][0])}'
+
+
+class Registry:
+    def __init__(self, store: MetricsStore):
+        self.store = store
+        self.families: List = []
+        self.request_duration = self.histogram(
+            'http_request_duration_seconds', 'Request latency by route template.', DURATION_BUCKETS, 'route')
+        self.response_size = self.histogram(
+            'http_response_size_bytes', 'Response body size by route template.', SIZE_BUCKETS, 'route')
+        self.cache_events = {
+            'hit': self.counter('service_cache_hits_total', 'Cache hits by cache name.', 'cache'),
+            'miss': self.counter('service_cache_misses_total', 'Cache misses by cache name.', 'cache'),
+            'eviction': self.counter('service_cache_evictions_total', 'LRU evictions by cache name.', 'cache'),
+        }
+        self._cache_lock = threading.Lock()
+
+    def _family(self, name: str, factory):
+        # Re-registering a name (e.g. one create_app() per test) returns the existing family.
+        for family in self.families:
+            if family.name == name:
+                return family
+        family = factory()
+        self.families.append(family)
+        return family
+
+    def histogram(self, name: str, help: str, buckets: Tuple[float, ...], label: str) -> Histogram:
+        return self._family(name, lambda: Histogram(self.store, name, help, buckets, label))
+
+    def counter(self, name: str, help: str, label: str) -> Counter:
+        return self._family(name, lambda: Counter(self.store, name, help, label))
+
+    def cache_event(self, cache_name: str, event: str) -> None:
+        """Observer for ``src.core.cache.set_cache_observer``.
+
+        Sync services run on the threadpool, so this is called from several
+        threads at once; the lock keeps the read-modify-write of a slot whole.
+        """
+        counter = self.cache_events[event]
+        with self._cache_lock:
+            counter.inc(counter.slot(cache_name))
+
+    def exposition(self) -> bytes:
+        merged = self.store.merged()
+        lines: List[str] = []
+        for family in self.families:
+            lines.extend(family.render(merged))
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+_registry: Optional[Registry] = None
+
+
+def get_registry() -> Registry:
+    """The worker's registry, created on first use (after the worker has started)."""
+    global _registry
+    if _registry is None:
+        _registry = Registry(MetricsStore(os.environ.get('METRICS_DIR') or None))
+    return _registry
+
+
+class _SizeRecorder:
+    """``send`` wrapper that counts response body bytes; reused across requests."""
+
+    __slots__ = ('send', 'size')
+
+    async def __call__(self, message: Message) -> None:
+        if message['type'] == 'http.response.body':
+            self.size += len(message.get('body', b''))
+        await self.send(message)
+
+
+class MetricsMiddleware:
+    """Record duration and response size per matched route template."""
+
+    def __init__(self, app: ASGIApp, registry: Optional[Registry] = None):
+        self.app = app
+        self.registry = registry or get_registry()
+        # route template -> (duration slot, size slot); the hot path below
+        # inlines Histogram.observe to keep per-request cost to a few adds.
+        self._slots: Dict[str, Tuple[int, int]] = {}
+        # Idle recorders; the pool grows to the peak number of requests in flight.
+        self._recorders: List[_SizeRecorder] = []
+
+    def _route_slots(self, template: str) -> Tuple[int, int]:
+        slots = (self.registry.request_duration.slot(template), self.registry.response_size.slot(template))
+        self._slots[template] = slots
+        return slots
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        recorder = self._recorders.pop() if self._recorders else _SizeRecorder()
+        recorder.send = send
+        recorder.size = 0
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, recorder)
+        finally:
+            elapsed = perf_counter() - start
+            size = recorder.size
+            recorder.send = None
+            self._recorders.append(recorder)
+            route = scope.get('route')
+            template = getattr(route, 'path', UNMATCHED_ROUTE)
+            slots = self._slots.get(template) or self._route_slots(template)
+            values = self.registry.store.values
+            values[slots[0] + bisect_left(DURATION_BUCKETS, elapsed)] += 1
+            values[slots[0] + DURATION_SUM] += elapsed
+            values[slots[1] + bisect_left(SIZE_BUCKETS, size)] += 1
+            values[slots[1] + SIZE_SUM] += size
@@ -0,0 +1,119 @@
+"""Static OpenAPI document built at generation time.
+
+``scripts/generate_from_spec.py`` runs ``python -m
+src.application.openapi_snapshot`` after rendering the controllers. That
+builds the app with every router loaded and writes its schema to
+``openapi.json`` next to the route manifest. Two extension keys are added:
+
+* ``x-schema-sha256`` -- hash of the schema itself (the document's version
+  stamp), and
+* ``x-route-manifest-sha256`` -- hash of the ``routes.json`` it was built
+  from.
+
+At startup ``create_app()`` serves the snapshot from memory, as
+precomputed bytes with a strong ETag. The snapshot is used only while its
+manifest hash matches the manifest being loaded; otherwise the schema is
+generated live as before. So /openapi.json never imports lazy
+controllers, and a stale snapshot is never served for a changed route
+table. ``OPENAPI_SNAPSHOT=0`` always generates live.
+
+``--check`` exits 1 when the snapshot on disk differs from the live
+schema (for CI).
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, Request
+from starlette.routing import Route
+
+from src.application.routers import MANIFEST_PATH
+from src.application.static_responses import StaticJSON
+
+SCHEMA_HASH = 'x-schema-sha256'
+MANIFEST_HASH = 'x-route-manifest-sha256'
+
+
+def snapshot_path(manifest: Path = MANIFEST_PATH) -> Path:
+    return manifest.with_name('openapi.json')
+
+
+def canonical(schema: Dict[str, Any]) -> bytes:
+    return json.dumps(schema, sort_keys=True, separators=(',', ':')).encode()
+
+
+def file_sha256(path: Path) -> Optional[str]:
+    return hashlib.sha256(path.read_bytes()).hexdigest() if path.exists() else None
+
+
+def strip_stamps(document: Dict[str, Any]) -> Dict[str, Any]:
+    """The schema without the snapshot's extension keys."""
+    return {k: v for k, v in document.items() if k not in (SCHEMA_HASH, MANIFEST_HASH)}
+
+
+def build_document(app: FastAPI, manifest: Path = MANIFEST_PATH) -> Dict[str, Any]:
+    schema = app.openapi()
+    document = dict(schema)
+    document[SCHEMA_HASH] = hashlib.sha256(canonical(schema)).hexdigest()
+    document[MANIFEST_HASH] = file_sha256(manifest)
+    return document
+
+
+def load_snapshot(manifest: Path = MANIFEST_PATH) -> Optional[Dict[str, Any]]:
+    """The snapshot for ``manifest``, or None when missing or built from another manifest."""
+    path = snapshot_path(manifest)
+    if not path.exists():
+        return None
+    try:
+        document = json.loads(path.read_text())
+    except ValueError:
+        return None
+    if document.get(MANIFEST_HASH) != file_sha256(manifest):
+        return None
+    return document
+
+
+def serve_snapshot(app: FastAPI, document: Dict[str, Any]) -> None:
+    """Answer ``app.openapi_url`` from ``document`` instead of generating the schema."""
+    schema = strip_stamps(document)
+    body = StaticJSON(schema)
+    app.openapi_schema = schema  # app.openapi() (and /docs) returns it without loading routers
+    app.state.openapi_snapshot = True  # so mounting a router later does not discard it
+    app.router.routes[:] = [r for r in app.router.routes
+                            if not (isinstance(r, Route) and r.path == app.openapi_url)]
+
+    async def openapi(request: Request):
+        return body.response(request)
+
+    app.add_route(app.openapi_url, openapi, include_in_schema=False)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Write or check the static OpenAPI snapshot')
+    parser.add_argument('--manifest', type=Path, default=MANIFEST_PATH)
+    parser.add_argument('--check', action='store_true', help='exit 1 if the snapshot is out of date')
+    args = parser.parse_args(argv)
+
+    os.environ['OPENAPI_SNAPSHOT'] = '0'
+    from src.application.main import create_app
+
+    document = build_document(create_app(args.manifest), args.manifest)
+    path = snapshot_path(args.manifest)
+    if args.check:
+        current = json.loads(path.read_text()) if path.exists() else None
+        if current != document:
+            print(f'{path} is out of date; run python -m src.application.openapi_snapshot', file=sys.stderr)
+            return 1
+        print(f'{path} is up to date')
+        return 0
+    path.write_text(json.dumps(document, indent=2) + '\n')
+    print(f'OpenAPI snapshot written to {path}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""On-demand per-request CPU profiling.
+
+Disabled unless ``PROFILING_ENABLED=1``. When disabled the middleware is
+never installed, so the cost is zero. When enabled, a request is profiled
+if either:
+
+* it carries ``X-Profile-Token: <expiry>.<hmac>``, signed with
+  ``PROFILING_SECRET`` (see ``sign_token``, or
+  ``python -m src.application.profiling --sign``), or
+* it is picked by ``PROFILING_SAMPLE_RATE`` (0.0-1.0, default 0).
+
+Two profilers are available (``PROFILING_MODE``):
+
+* ``sampling`` (default) -- a helper thread samples the event-loop
+  thread's stack every ``PROFILING_INTERVAL_MS`` (default 1) and writes
+  folded stacks (``<profile>.folded``), ready for flamegraph.pl or
+  speedscope.
+* ``cprofile`` -- deterministic cProfile around the request, written as a
+  pstats file (``<profile>.prof``). Only one cProfile session can be active
+  per process, so a request picked while another is being profiled (or
+  while another profiler is attached) is served unprofiled.
+
+Both profile the event-loop thread while the request is in flight, so other
+requests interleaved on the same loop can show up in the output. Every
+profile also gets a JSON summary with its top frames. ``GET
+/admin/profiles`` lists the most recent summaries; it requires a token and
+is only mounted when ``PROFILING_SECRET`` is set.
+"""
+import argparse
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_OUTPUT_DIR = ROOT / 'reports' / 'profiles'
+TOKEN_HEADER = b'x-profile-token'
+TOP_FRAMES = 15
+
+# cProfile hooks are per interpreter: a second enable() raises (3.12+) or
+# silently steals the first session's hooks (earlier versions).
+_cprofile_active = threading.Lock()
+
+
+def sign_token(secret: str, ttl: float = 300.0, now: Optional[float] = None) -> str:
+    expiry = int((now or time.time()) + ttl)
+    digest = hmac.new(secret.encode(), str(expiry).encode(), hashlib.sha256).hexdigest()
+    return f'{expiry}.{digest}'
+
+
+def verify_token(secret: str, token: str, now: Optional[float] = None) -> bool:
+    expiry, _, digest = token.partition('.')
+    if not expiry.isdigit() or int(expiry) < (now or time.time()):
+        return False
+    expected = hmac.new(secret.encode(), expiry.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, digest)
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(str(ROOT)):
+        filename = os.path.relpath(filename, ROOT)
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ':')
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer from a helper thread."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+
+def folded(stacks: Counter) -> str:
+    return ''.join(f"{';'.join(_frame_label(c) for c in stack)} {count}\n" for stack, count in stacks.items())
+
+
+def top_frames_from_samples(stacks: Counter, limit: int = TOP_FRAMES) -> List[Dict]:
+    total = sum(stacks.values()) or 1
+    own: Counter = Counter()
+    for stack, count in stacks.items():
+        own[stack[-1]] += count
+    return [{'frame': _frame_label(code), 'samples': n, 'percent': round(100.0 * n / total, 1)}
+            for code, n in own.most_common(limit)]
+
+
+def top_frames_from_pstats(profile: cProfile.Profile, limit: int = TOP_FRAMES) -> List[Dict]:
+    stats = pstats.Stats(profile)
+    rows = []
+    for (filename, line, name), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append((tottime, cumtime, ncalls, f'{name} ({filename}:{line})'))
+    rows.sort(reverse=True)
+    return [{'frame': label, 'own_seconds': round(tot, 6), 'cumulative_seconds': round(cum, 6), 'calls': n}
+            for tot, cum, n, label in rows[:limit]]
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp, secret: Optional[str] = None, sample_rate: float = 0.0,
+                 mode: str = 'sampling', interval: float = 0.001, output_dir: Path = DEFAULT_OUTPUT_DIR):
+        if mode not in ('sampling', 'cprofile'):
+            raise ValueError(f'Unknown profiling mode {mode!r}')
+        self.app = app
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.interval = interval
+        self.output_dir = Path(output_dir)
+        self._seq = 0
+
+    def wants_profile(self, scope: Scope) -> bool:
+        if self.secret:
+            for name, value in scope['headers']:
+                if name == TOKEN_HEADER:
+                    return verify_token(self.secret, value.decode('latin-1'))
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or not self.wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.time()
+        start = time.perf_counter()
+        if self.mode == 'cprofile':
+            if not _cprofile_active.acquire(blocking=False):
+                await self.app(scope, receive, send)
+                return
+            profiler: Optional[cProfile.Profile] = cProfile.Profile()
+            try:
+                try:
+                    profiler.enable()
+                except ValueError:  # another profiling tool is active
+                    profiler = None
+                try:
+                    await self.app(scope, receive, send)
+                finally:
+                    if profiler is not None:
+                        profiler.disable()
+                    elapsed = time.perf_counter() - start
+            finally:
+                _cprofile_active.release()
+            if profiler is not None:
+                await asyncio.to_thread(self._write_cprofile, scope, started, elapsed, profiler)
+        else:
+            sampler = StackSampler(threading.get_ident(), self.interval)
+            sampler.start()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                stacks = sampler.stop()
+                elapsed = time.perf_counter() - start
+            await asyncio.to_thread(self._write_samples, scope, started, elapsed, stacks)
+
+    def _base(self, scope: Scope, started: float) -> Tuple[Path, Dict]:
+        self._seq += 1
+        slug = scope['path'].strip('/').replace('/', '_') or 'root'
+        name = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(started))}-{os.getpid()}-{self._seq}-{slug}"
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        summary = {'id': name, 'method': scope['method'], 'path': scope['path'], 'started_at': started,
+                   'mode': self.mode}
+        return self.output_dir / name, summary
+
+    def _write_samples(self, scope: Scope, started: float, elapsed: float, stacks: Counter) -> None:
+        base, summary = self._base(scope, started)
+        base.with_suffix('.folded').write_text(folded(stacks))
+        summary.update(duration_ms=round(elapsed * 1000, 3), samples=sum(stacks.values()),
+                       output=base.with_suffix('.folded').name, top_frames=top_frames_from_samples(stacks))
+        base.with_suffix('.json').write_text(json.dumps(summary, indent=2))
+
+    def _write_cprofile(self, scope: Scope, started: float, elapsed: float, profiler: cProfile.Profile) -> None:
+        base, summary = self._base(scope, started)
+        profiler.dump_stats(str(base.with_suffix('.prof')))
+        summary.update(duration_ms=round(elapsed * 1000, 3), output=base.with_suffix('.prof').name,
+                       top_frames=top_frames_from_pstats(profiler))
+        base.with_suffix('.json').write_text(json.dumps(summary, indent=2))
+
+
+def recent_profiles(output_dir: Path = DEFAULT_OUTPUT_DIR, limit: int = 20) -> List[Dict]:
+    if not output_dir.exists():
+        return []
+    summaries = sorted(output_dir.glob('*.json'), key=lambda p: p.stat().st_mtime, reverse=True)
+    out = []
+    for path in summaries[:limit]:
+        try:
+            out.append(json.loads(path.read_text()))
+        except ValueError:
+            continue
+    return out
+
+
+def settings_from_env() -> Optional[Dict]:
+    """Middleware kwargs when ``PROFILING_ENABLED=1``, else None."""
+    if os.environ.get('PROFILING_ENABLED') != '1':
+        return None
+    return {
+        'secret': os.environ.get('PROFILING_SECRET') or None,
+        'sample_rate': float(os.environ.get('PROFILING_SAMPLE_RATE', '0')),
+        'mode': os.environ.get('PROFILING_MODE', 'sampling'),
+        'interval': float(os.environ.get('PROFILING_INTERVAL_MS', '1')) / 1000,
+        'output_dir': Path(os.environ.get('PROFILING_OUTPUT_DIR', str(DEFAULT_OUTPUT_DIR))),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Profiling helpers')
+    parser.add_argument('--sign', action='store_true', help='Print an X-Profile-Token signed with $PROFILING_SECRET')
+    parser.add_argument('--ttl', type=float, default=300.0)
+    args = parser.parse_args()
+    if not args.sign or not os.environ.get('PROFILING_SECRET'):
+        parser.error('--sign requires PROFILING_SECRET')
+    print(sign_token(os.environ['PROFILING_SECRET'], args.ttl))
@@ -0,0 +1,193 @@
+"""Token-bucket rate limiting shared by every worker on the host.
+
+Buckets live in a fixed-size table in a memory-mapped file
+(``RATELIMIT_FILE``; the launcher creates one per pod), so all uvicorn
+workers draw from the same buckets without a network round-trip. A bucket
+is keyed on ``(route rule, client)``, where the client is the peer address
+or, with ``RATELIMIT_KEY=api_key``, the ``X-API-Key`` header (falling back
+to the address when the header is missing).
+
+The table is 4-way set-associative: a key hashes to one set of four
+32-byte slots, and that set is locked with ``fcntl.lockf`` for the
+read-refill-take-write cycle, so updates are atomic across processes.
+POSIX record locks do not exclude threads of one process; that is fine
+here, because only the event-loop thread touches the table. When all four
+ways hold other live keys, the least recently used one is evicted and
+that client restarts with a full bucket.
+
+Paths in the allow list (the probe routes by default) return before any
+hashing or locking. Route rules match like admission pools: by longest
+prefix, on segment boundaries, with ``{param}`` matching one segment.
+Paths without a matching rule are not limited.
+
+Configuration (per worker):
+
+  RATELIMIT_ENABLED=0        disable the middleware
+  RATELIMIT_FILE=/path       shared table; anonymous (per-process) when unset
+  RATELIMIT_SLOTS=65536      table size, rounded to whole sets
+  RATELIMIT_RATE=0           default tokens per second (0: no default limit)
+  RATELIMIT_BURST=           default bucket size (default: 2 x rate)
+  RATELIMIT_KEY=client       ``client`` or ``api_key``
+  RATELIMIT_ROUTES='{"/reports": {"rate": 5, "burst": 10}}'
+
+Route manifest entries may carry a ``rate_limit`` object with the same keys
+(the generator writes it from ``@ratelimit:rate=5,burst=10`` feature tags).
+"""
+import fcntl
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Pattern, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.application.admission import PRIORITY_PATHS, prefix_pattern
+from src.application.metrics import Registry
+from src.application.static_responses import PrecomputedResponse, StaticJSON
+
+SLOT = struct.Struct('<Qdd8x')  # key hash, tokens, last refill (monotonic seconds)
+WAYS = 4
+SET_BYTES = SLOT.size * WAYS
+API_KEY_HEADER = b'x-api-key'
+
+
+class Rule:
+    def __init__(self, name: str, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError(f'rate for {name!r} must be positive')
+        self.name = name
+        self.rate = float(rate)
+        self.burst = float(burst) if burst else 2 * self.rate
+
+    @classmethod
+    def from_dict(cls, name: str, data: dict) -> 'Rule':
+        return cls(name, float(data['rate']), data.get('burst'))
+
+
+def key_hash(rule: str, client: str) -> int:
+    digest = hashlib.blake2b(f'{rule}\0{client}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1  # 0 marks an empty slot
+
+
+class BucketTable:
+    """Shared token buckets; see the module docstring for the layout."""
+
+    def __init__(self, path: Optional[str] = None, slots: int = 65536,
+                 clock: Callable[[], float] = time.monotonic):
+        self.sets = max(1, slots // WAYS)
+        size = self.sets * SET_BYTES
+        self.clock = clock
+        if path:
+            self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            if os.fstat(self.fd).st_size < size:
+                os.ftruncate(self.fd, size)  # the first worker sizes it; zeroed slots read as empty
+            self.mm = mmap.mmap(self.fd, size)
+        else:
+            self.fd = None
+            self.mm = mmap.mmap(-1, size)
+
+    def take(self, key: int, rule: Rule) -> float:
+        """Take one token for ``key``; returns 0 when allowed, else seconds until one is available."""
+        base = (key % self.sets) * SET_BYTES
+        if self.fd is not None:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, SET_BYTES, base)
+        try:
+            now = self.clock()
+            victim, victim_seen = base, math.inf
+            for offset in range(base, base + SET_BYTES, SLOT.size):
+                slot_key, tokens, seen = SLOT.unpack_from(self.mm, offset)
+                if slot_key == key:
+                    tokens = min(rule.burst, tokens + (now - seen) * rule.rate)
+                    break
+                if slot_key == 0:
+                    victim, victim_seen = offset, -math.inf
+                elif seen < victim_seen:
+                    victim, victim_seen = offset, seen
+            else:
+                offset, tokens = victim, rule.burst
+            if tokens >= 1.0:
+                SLOT.pack_into(self.mm, offset, key, tokens - 1.0, now)
+                return 0.0
+            SLOT.pack_into(self.mm, offset, key, tokens, now)
+            return (1.0 - tokens) / rule.rate
+        finally:
+            if self.fd is not None:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, SET_BYTES, base)
+
+
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp, table: BucketTable, default: Optional[Rule] = None,
+                 routes: Optional[Dict[str, Rule]] = None, allow: Iterable[str] = PRIORITY_PATHS,
+                 key: str = 'client', registry: Optional[Registry] = None):
+        if key not in ('client', 'api_key'):
+            raise ValueError(f'Unknown rate-limit key {key!r}')
+        self.app = app
+        self.table = table
+        self.default = default
+        self.rules: List[Tuple[Pattern, Rule]] = [
+            (prefix_pattern(prefix), rule)
+            for prefix, rule in sorted((routes or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        ]
+        self.allow = frozenset(allow)
+        self.by_api_key = key == 'api_key'
+        limited = StaticJSON({'detail': 'Too Many Requests'}, status_code=429)
+        self.body, self.headers = limited.body, limited.raw_headers
+        self.registry = registry
+        if registry is not None:
+            self.limited = registry.counter('ratelimit_limited_total', 'Requests rejected by rate limiting, by rule.',
+                                            'rule')
+
+    def rule_for(self, path: str) -> Optional[Rule]:
+        for pattern, rule in self.rules:
+            if pattern.match(path):
+                return rule
+        return self.default
+
+    def client_key(self, scope: Scope) -> str:
+        if self.by_api_key:
+            for name, value in scope['headers']:
+                if name == API_KEY_HEADER:
+                    return 'key:' + value.decode('latin-1')
+        client = scope.get('client')
+        return 'ip:' + (client[0] if client else '-')
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['path'] in self.allow:
+            await self.app(scope, receive, send)
+            return
+        rule = self.rule_for(scope['path'])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        wait = self.table.take(key_hash(rule.name, self.client_key(scope)), rule)
+        if wait:
+            if self.registry is not None:
+                self.limited.inc(self.limited.slot(rule.name))
+            headers = self.headers + [(b'retry-after', str(math.ceil(wait)).encode('latin-1'))]
+            await PrecomputedResponse(self.body, headers, status_code=429)(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+def rules_from_env(manifest_specs: Iterable = ()) -> Tuple[Optional[Rule], Dict[str, Rule]]:
+    rate = float(os.environ.get('RATELIMIT_RATE', '0'))
+    burst = os.environ.get('RATELIMIT_BURST')
+    default = Rule('default', rate, float(burst) if burst else None) if rate > 0 else None
+    routes: Dict[str, Rule] = {}
+    for spec in manifest_specs:
+        limit = spec.metadata.get('rate_limit')
+        if limit:
+            for route in spec.routes:
+                routes[route['path']] = Rule.from_dict(route['path'], limit)
+    for prefix, data in json.loads(os.environ.get('RATELIMIT_ROUTES') or '{}').items():
+        routes[prefix] = Rule.from_dict(prefix, data)
+    return default, routes
+
+
+def table_from_env() -> BucketTable:
+    return BucketTable(os.environ.get('RATELIMIT_FILE') or None, int(os.environ.get('RATELIMIT_SLOTS', '65536')))
@@ -0,0 +1,156 @@
+"""Readiness probes run in the background and served from a cached verdict.
+
+Services register probe callables (sync or async, returning truthy when
+healthy or raising on failure)::
+
+    from src.application.readiness import readiness
+    readiness.register('database', check_database, interval=5.0, timeout=1.0)
+
+Once the app has started, each probe runs on its own asyncio schedule with a
+timeout and jittered intervals, so workers and probes do not line up. Sync
+probes run on a small executor of their own, never the default one that
+``asyncio.to_thread`` and router warm-up share. A sync probe that timed out
+keeps its thread until it returns; until then its next runs are skipped
+(and reported unhealthy), so a hung dependency holds at most one thread. Every
+state change re-encodes the ``/readyz`` body once. The endpoint only returns
+that pre-built response, so kubelet and load-balancer traffic never triggers
+a dependency check and never waits on one.
+"""
+import asyncio
+import inspect
+import random
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from src.application.static_responses import StaticJSON
+
+DEFAULT_INTERVAL = 5.0
+DEFAULT_TIMEOUT = 1.0
+DEFAULT_JITTER = 0.1
+PROBE_THREADS = 4
+
+
+class Probe:
+    def __init__(self, name: str, check: Callable[[], Any], interval: float, timeout: float, jitter: float):
+        self.name = name
+        self.check = check
+        self.interval = interval
+        self.timeout = timeout
+        self.jitter = jitter
+        self.healthy: Optional[bool] = None
+        self.error: Optional[str] = None
+        self.last_checked: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self._inflight: Optional[Future] = None  # sync check still running on the executor
+
+    async def run_once(self, executor: Optional[ThreadPoolExecutor] = None) -> None:
+        if self._inflight is not None and not self._inflight.done():
+            self.healthy, self.error = False, 'previous check still running'
+            self.last_checked = time.time()
+            return
+        start = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(self.check):
+                result = await asyncio.wait_for(self.check(), self.timeout)
+            else:
+                self._inflight = (executor or _fallback_executor()).submit(self.check)
+                # on timeout the thread cannot be stopped; _inflight keeps it from being doubled up
+                result = await asyncio.wait_for(asyncio.wrap_future(self._inflight), self.timeout)
+            self.healthy = result is None or bool(result)
+            self.error = None if self.healthy else 'probe returned a falsy result'
+        except asyncio.TimeoutError:
+            self.healthy, self.error = False, f'timed out after {self.timeout}s'
+        except Exception as e:
+            self.healthy, self.error = False, f'{type(e).__name__}: {e}'
+        self.last_duration = time.perf_counter() - start
+        self.last_checked = time.time()
+
+    def next_delay(self) -> float:
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+_fallback: Optional[ThreadPoolExecutor] = None
+
+
+def _fallback_executor() -> ThreadPoolExecutor:
+    # For Probe.run_once called outside a registry.
+    global _fallback
+    if _fallback is None:
+        _fallback = ThreadPoolExecutor(PROBE_THREADS, thread_name_prefix='readiness')
+    return _fallback
+
+
+class ReadinessRegistry:
+    def __init__(self):
+        self.probes: Dict[str, Probe] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._running = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._current = self._render('starting')
+
+    def register(self, name: str, check: Callable[[], Any], interval: float = DEFAULT_INTERVAL,
+                 timeout: float = DEFAULT_TIMEOUT, jitter: float = DEFAULT_JITTER) -> None:
+        if name in self.probes:
+            raise ValueError(f'Readiness probe {name!r} is already registered')
+        self.probes[name] = Probe(name, check, interval, timeout, jitter)
+        if self._running:
+            self._spawn(self.probes[name])
+            self._refresh()
+
+    async def start(self) -> None:
+        self._running = True
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(PROBE_THREADS, thread_name_prefix='readiness')
+        for probe in self.probes.values():
+            self._spawn(probe)
+        self._refresh()
+
+    async def stop(self) -> None:
+        self._running = False
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)  # a hung probe must not block shutdown
+            self._executor = None
+        self._current = self._render('stopping')
+
+    def _spawn(self, probe: Probe) -> None:
+        self._tasks[probe.name] = asyncio.ensure_future(self._loop(probe))
+
+    async def _loop(self, probe: Probe) -> None:
+        while True:
+            before = (probe.healthy, probe.error)
+            await probe.run_once(self._executor)
+            if (probe.healthy, probe.error) != before:
+                self._refresh()
+            await asyncio.sleep(probe.next_delay())
+
+    @property
+    def ready(self) -> bool:
+        return self._running and all(p.healthy for p in self.probes.values())
+
+    def _refresh(self) -> None:
+        if not self._running:
+            return
+        pending = any(p.healthy is None for p in self.probes.values())
+        self._current = self._render('ready' if self.ready else 'starting' if pending else 'not_ready')
+
+    def _render(self, status: str) -> StaticJSON:
+        probes = {
+            name: {'healthy': p.healthy, **({'error': p.error} if p.error else {})}
+            for name, p in sorted(self.probes.items())
+        }
+        return StaticJSON({'status': status, 'probes': probes}, status_code=200 if status == 'ready' else 503)
+
+    def response(self, request: Optional[Request] = None) -> Response:
+        return self._current.response(request)
+
+
+readiness = ReadinessRegistry()
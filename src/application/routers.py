@@ -0,0 +1,118 @@
+"""Manifest-driven router loading for generated controllers.
+
+``scripts/generate_from_spec.py`` writes ``src/adapters/http/routes.json``,
+one entry per generated controller::
+
+    {"module": "src.adapters.http.ping_endpoint_controller",
+     "attr": "router",
+     "load": "background",
+     "routes": [{"path": "/ping_endpoint", "methods": ["GET"]}]}
+
+``load`` decides when the controller module is imported:
+
+* ``eager``      -- at ``create_app()`` time.
+* ``lazy``       -- on the first request that hits one of its routes.
+* ``background`` -- like ``lazy``, but also warmed in a worker thread once
+  the app has started, so the first real request rarely pays the import.
+
+Until a module is imported its paths are served by placeholder routes that
+import it, swap the real router in, and re-dispatch the request.
+"""
+import asyncio
+import importlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI
+from starlette.routing import Route
+from starlette.types import Receive, Scope, Send
+
+MANIFEST_PATH = Path(__file__).resolve().parent.parent / 'adapters' / 'http' / 'routes.json'
+LOAD_MODES = ('eager', 'lazy', 'background')
+
+
+class RouterSpec:
+    def __init__(self, module: str, attr: str = 'router', load: str = 'background',
+                 routes: Optional[List[Dict[str, Any]]] = None, **metadata: Any):
+        if load not in LOAD_MODES:
+            raise ValueError(f'Unknown load mode {load!r} for {module}; expected one of {LOAD_MODES}')
+        self.module = module
+        self.attr = attr
+        self.load = load
+        self.routes = routes or []
+        self.metadata = metadata
+        self.loaded = False
+        self.placeholders: List[Route] = []
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> List[RouterSpec]:
+    if not path.exists():
+        return []
+    data = json.loads(path.read_text())
+    return [RouterSpec(**entry) for entry in data.get('routers', [])]
+
+
+class _Placeholder:
+    """ASGI app standing in for a controller that has not been imported yet."""
+
+    def __init__(self, loader: 'RouterLoader', spec: RouterSpec):
+        self.loader = loader
+        self.spec = spec
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.loader.ensure_loaded(self.spec)
+        await self.loader.app.router(scope, receive, send)
+
+
+class RouterLoader:
+    def __init__(self, app: FastAPI, specs: List[RouterSpec]):
+        self.app = app
+        self.specs = specs
+
+    def install(self, force_eager: bool = False) -> None:
+        for spec in self.specs:
+            if force_eager or spec.load == 'eager':
+                self.ensure_loaded(spec)
+                continue
+            placeholder = _Placeholder(self, spec)
+            for route in spec.routes:
+                r = Route(route['path'], endpoint=placeholder, methods=route.get('methods', ['GET']),
+                          include_in_schema=False)
+                spec.placeholders.append(r)
+                self.app.router.routes.append(r)
+
+    @property
+    def pending(self) -> List[RouterSpec]:
+        return [s for s in self.specs if not s.loaded]
+
+    def ensure_loaded(self, spec: RouterSpec) -> None:
+        if spec.loaded:
+            return
+        self._mount(spec, importlib.import_module(spec.module))
+
+    def load_all(self) -> None:
+        for spec in self.pending:
+            self.ensure_loaded(spec)
+
+    async def warm(self) -> None:
+        """Import ``background`` controllers off the event loop, then mount them."""
+        for spec in self.pending:
+            if spec.load != 'background':
+                continue
+            module = await asyncio.to_thread(importlib.import_module, spec.module)
+            self._mount(spec, module)
+
+    def _mount(self, spec: RouterSpec, module: Any) -> None:
+        # Runs on the event loop thread only, so the check-and-swap is atomic.
+        if spec.loaded:
+            return
+        routes = self.app.router.routes
+        for placeholder in spec.placeholders:
+            if placeholder in routes:
+                routes.remove(placeholder)
+        spec.placeholders.clear()
+        self.app.include_router(getattr(module, spec.attr))
+        spec.loaded = True
+        if not getattr(self.app.state, 'openapi_snapshot', False):
+            self.app.openapi_schema = None  # regenerate; a served snapshot already covers every router
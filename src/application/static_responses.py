@@ -0,0 +1,96 @@
+"""Responses that are encoded once at startup and replayed per request.
+
+Probe-style endpoints (``/healthz``, ``/v1/ping``) return the same document
+for the whole life of a worker. ``StaticJSON`` serializes that document a
+single time, derives a strong ETag and Content-Length from the bytes, and
+hands out ``PrecomputedResponse`` objects that skip FastAPI's validation and
+``jsonable_encoder`` path entirely. ``StaticBody`` does the same for bytes
+that were already encoded (any media type, optionally content-coded).
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+RawHeaders = List[Tuple[bytes, bytes]]
+
+
+class PrecomputedResponse(Response):
+    """A ``Response`` whose body and raw headers were built ahead of time.
+
+    ``Response.__init__`` re-encodes the body and headers on every call; this
+    subclass only copies references. The header list is shallow-copied so
+    middleware that appends to ``message["headers"]`` cannot leak into the
+    shared template.
+    """
+
+    def __init__(self, body: bytes, raw_headers: RawHeaders, status_code: int = 200):
+        self.status_code = status_code
+        self.body = body
+        self.raw_headers = list(raw_headers)
+        self.background = None
+
+
+def encode_json(content: Any) -> bytes:
+    """Encode ``content`` exactly like ``starlette.responses.JSONResponse``."""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(',', ':'),
+    ).encode('utf-8')
+
+
+class StaticBody:
+    """Pre-encoded bytes served with a strong ETag.
+
+    ``headers`` (e.g. ``content-encoding``, ``vary``) are sent with the body;
+    a ``vary`` header is also sent with 304s.
+    """
+
+    def __init__(self, body: bytes, media_type: str = 'application/json', status_code: int = 200,
+                 headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.body = body
+        self.etag = '"%s"' % hashlib.sha256(self.body).hexdigest()[:32]
+        etag = self.etag.encode('latin-1')
+        extra = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in (headers or {}).items()]
+        self.raw_headers: RawHeaders = [
+            (b'content-type', media_type.encode('latin-1')),
+            (b'content-length', str(len(self.body)).encode('latin-1')),
+            (b'etag', etag),
+        ] + extra
+        self._not_modified_headers: RawHeaders = [(b'etag', etag)] + [h for h in extra if h[0] == b'vary']
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Return True when an ``If-None-Match`` value names this body."""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        for candidate in if_none_match.split(','):
+            candidate = candidate.strip()
+            if candidate.startswith('W/'):
+                candidate = candidate[2:]
+            if candidate == self.etag:
+                return True
+        return False
+
+    def response(self, request: Optional[Request] = None) -> Response:
+        # Only successful bodies are revalidated; a cached 304 must never mask an error status.
+        if self.status_code == 200 and request is not None and self.matches(request.headers.get('if-none-match')):
+            return PrecomputedResponse(b'', self._not_modified_headers, status_code=304)
+        return PrecomputedResponse(self.body, self.raw_headers, status_code=self.status_code)
+
+
+class StaticJSON(StaticBody):
+    """A JSON document serialized once, served with a strong ETag."""
+
+    media_type = 'application/json'
+
+    def __init__(self, content: Any, status_code: int = 200):
+        self.content = content
+        super().__init__(encode_json(content), self.media_type, status_code)
@@ -0,0 +1,80 @@
+"""Server spans for HTTP requests (see ``src.core.tracing``).
+
+Each request continues the caller's trace when it carries a valid
+``traceparent``; otherwise the tracer's head sampler decides whether a new
+trace is recorded. The span is named ``"<METHOD> <route template>"`` once
+routing has matched, and is current while the controller runs, so
+``@traced`` core-service methods become its children and outbound calls
+can forward it with ``src.core.tracing.inject``.
+
+Every traced response carries a ``traceresponse`` header naming the
+server span (W3C Trace Context level 2). An incoming unsampled trace is
+continued without recording anything, so it still propagates.
+
+Configuration (per worker):
+
+  TRACING_ENABLED=0        do not install the middleware
+  TRACE_SAMPLE_RATE=0.01   fraction of new traces to record (default 0)
+  TRACE_EXPORTER=batch     ``batch`` (JSON lines) or ``ring`` (in memory)
+  TRACE_EXPORT_PATH=...    file for the batch exporter; default stderr
+"""
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.tracing import (Tracer, activate, deactivate, format_traceparent, parse_traceparent,
+                              tracer as default_tracer)
+
+TRACEPARENT = b'traceparent'
+TRACERESPONSE = b'traceresponse'
+
+
+class TracingMiddleware:
+    def __init__(self, app: ASGIApp, tracer: Optional[Tracer] = None):
+        self.app = app
+        self.tracer = tracer or default_tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        parent = None
+        for name, value in scope['headers']:
+            if name == TRACEPARENT:
+                parent = parse_traceparent(value.decode('latin-1'))
+                break
+        if parent is None and not self.tracer.sample_rate:
+            await self.app(scope, receive, send)
+            return
+        span = self.tracer.start_span(scope['method'], parent, kind='server')
+        if span is None:
+            if parent is None:
+                await self.app(scope, receive, send)
+                return
+            span = self.tracer.continue_unsampled(scope['method'], parent, kind='server')
+        header = (TRACERESPONSE, format_traceparent(span.context).encode('latin-1'))
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                span.attributes['http.status_code'] = message['status']
+                if message['status'] >= 500:
+                    span.status = 'error'
+                message['headers'] = list(message.get('headers', ())) + [header]
+            await send(message)
+
+        span.attributes['http.method'] = scope['method']
+        span.attributes['http.target'] = scope['path']
+        token = activate(span)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            span.record_exception(exc)
+            raise
+        finally:
+            deactivate(token)
+            route = getattr(scope.get('route'), 'path', None)
+            if route is not None:
+                span.attributes['http.route'] = route
+                span.name = f"{scope['method']} {route}"
+            span.finish()
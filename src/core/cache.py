@@ -0,0 +1,133 @@
+"""Bounded TTL + LRU cache for core-service methods.
+
+    class PriceService:
+        @cached(ttl=30, maxsize=256)
+        def quote(self, symbol: str) -> str:
+            ...
+
+There is one cache per decorated method, but entries are keyed on the
+instance as well as the call arguments, so two instances never see each
+other's results (an entry keeps its instance alive until it expires or is
+evicted). Entries expire ``ttl`` seconds after they are stored, and the least recently used entry is evicted once
+``maxsize`` is reached. Coroutine methods are supported; their awaited
+result is cached.
+
+Hit/miss/eviction counts are kept on each cache (``stats()``) and reported
+to an optional process-wide observer, which the application layer uses to
+export them as metrics. This module has no framework dependencies.
+"""
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+CacheObserver = Callable[[str, str], None]
+
+_MISSING = object()
+_observer: Optional[CacheObserver] = None
+
+
+def set_cache_observer(observer: Optional[CacheObserver]) -> None:
+    """Receive ``(cache_name, event)`` for every hit, miss and eviction."""
+    global _observer
+    _observer = observer
+
+
+class TTLCache:
+    def __init__(self, name: str, maxsize: int = 128, ttl: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        # Blocking services run on the threadpool, so guard the OrderedDict.
+        self._lock = threading.Lock()
+
+    def _event(self, event: str) -> None:
+        if _observer is not None:
+            _observer(self.name, event)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self._data.move_to_end(key)
+                self.hits += 1
+                hit = True
+            else:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                hit = False
+        self._event('hit' if hit else 'miss')
+        return entry[1] if hit else default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        evicted = 0
+        with self._lock:
+            self._data[key] = (self.clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                evicted += 1
+            self.evictions += evicted
+        for _ in range(evicted):
+            self._event('eviction')
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self._data)}
+
+
+def _key(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Hashable:
+    if not kwargs:
+        return args
+    return args + (_MISSING,) + tuple(sorted(kwargs.items()))
+
+
+def cached(ttl: float = 60.0, maxsize: int = 128, name: Optional[str] = None):
+    """Cache a service method's results; see the module docstring."""
+
+    def decorator(method: Callable[..., Any]) -> Callable[..., Any]:
+        cache = TTLCache(name or method.__qualname__, maxsize=maxsize, ttl=ttl)
+
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, *args, **kwargs):
+                key = _key((self,) + args, kwargs)
+                value = cache.get(key, _MISSING)
+                if value is _MISSING:
+                    value = await method(self, *args, **kwargs)
+                    cache.set(key, value)
+                return value
+
+            async_wrapper.cache = cache
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = _key((self,) + args, kwargs)
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = method(self, *args, **kwargs)
+                cache.set(key, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
@@ -0,0 +1,216 @@
+"""Execution policies for core-service methods.
+
+A service says where its work should run, and the HTTP adapter's
+``invoke`` dispatches each call accordingly::
+
+    class ReportService:
+        execution = PROCESS            # default for every method
+
+        def render(self, spec: dict) -> bytes:
+            ...
+
+        @execution_policy(INLINE)      # per-method override
+        def cached_summary(self) -> str:
+            ...
+
+Policies:
+
+* ``async``   -- coroutine methods, awaited on the event loop (IO-bound).
+  Implied by ``async def``.
+* ``inline``  -- called directly on the event loop. Only for work that
+  takes microseconds. This is the default.
+* ``thread``  -- light or blocking CPU work, run on the threadpool. A
+  service with ``blocking = True`` gets this policy.
+* ``process`` -- heavy CPU work, run in a pool of worker processes so it
+  neither holds the GIL nor fills the threadpool.
+
+Process calls never pickle the service instance. Each worker process
+builds its own instance (once) with the service's factory and calls the
+method by name, so only the factory reference, the arguments and the
+result cross the process boundary. The factory comes from the resolver set
+with ``set_factory_resolver`` (the HTTP adapter's service registry), so
+services registered with a custom factory are built the same way in the
+pool as on the event loop; such factories must be picklable (module-level
+functions or classes). Calls with the other policies pass values by reference,
+with no copy at all. The pool is bounded: at most ``workers`` calls run and
+``max_queue`` wait. Further calls fail fast with ``ExecutionQueueFull``
+instead of queueing without limit. Workers are started and warmed (spawned
+and handed a no-op) all at once, when the pool is first used or at
+startup with ``CORE_PROCESS_PREWARM=1``.
+
+CPU spent by ``thread`` and ``process`` calls is invisible to the event
+loop. When the caller's context holds a cell in ``offloaded_cpu`` (a
+one-item list, set by the resource-budget middleware), the thread or
+worker process measures its own CPU time for the call and adds it there.
+
+Configuration: ``CORE_PROCESS_WORKERS`` (default: CPUs, at most 4),
+``CORE_PROCESS_QUEUE`` (default 64). This module has no framework
+dependencies.
+"""
+import asyncio
+import inspect
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ASYNC = 'async'
+INLINE = 'inline'
+THREAD = 'thread'
+PROCESS = 'process'
+POLICIES = (ASYNC, INLINE, THREAD, PROCESS)
+
+
+class ExecutionQueueFull(RuntimeError):
+    """Raised when the process pool already has ``max_queue`` calls waiting."""
+
+
+def execution_policy(policy: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Set the policy of one method, overriding the class-level ``execution``."""
+    if policy not in POLICIES:
+        raise ValueError(f'Unknown execution policy {policy!r}; expected one of {POLICIES}')
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        fn.__execution__ = policy
+        return fn
+
+    return decorator
+
+
+offloaded_cpu: ContextVar[Optional[List[float]]] = ContextVar('offloaded_cpu', default=None)
+
+_policies: Dict[Any, str] = {}
+_factory_resolver: Callable[[type], Callable[[], Any]] = lambda service_cls: service_cls  # noqa: E731
+
+
+def set_factory_resolver(resolver: Callable[[type], Callable[[], Any]]) -> None:
+    """Decide how worker processes build a service class (default: call the class)."""
+    global _factory_resolver
+    _factory_resolver = resolver
+
+
+def policy_of(method: Callable[..., Any]) -> str:
+    """Resolve (and cache) the policy of a bound or plain callable."""
+    func = getattr(method, '__func__', method)
+    owner = type(getattr(method, '__self__', None))
+    key = (owner, func)
+    try:
+        return _policies[key]
+    except KeyError:
+        pass
+    if inspect.iscoroutinefunction(func):
+        policy = ASYNC
+    else:
+        policy = getattr(func, '__execution__', None) or getattr(owner, 'execution', None)
+        if policy is None:
+            policy = THREAD if getattr(owner, 'blocking', False) else INLINE
+        if policy not in POLICIES:
+            raise ValueError(f'Unknown execution policy {policy!r} on {owner.__qualname__}')
+    _policies[key] = policy
+    return policy
+
+
+def metered(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap ``fn`` for another thread so its CPU time is charged to the caller's ``offloaded_cpu``."""
+    cell = offloaded_cpu.get()
+    if cell is None:
+        return fn
+
+    def call(*args: Any, **kwargs: Any) -> Any:
+        start = time.thread_time()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            cell[0] += time.thread_time() - start
+
+    return call
+
+
+# Worker-process side ---------------------------------------------------------
+
+_worker_instances: Dict[Any, Any] = {}
+
+
+def _warm() -> int:
+    return os.getpid()
+
+
+def _call_in_worker(factory: Callable[[], Any], name: str, args: tuple, kwargs: dict) -> Tuple[Any, float]:
+    """Run one call; returns its result and the CPU seconds it took in this worker."""
+    start = time.thread_time()
+    instance = _worker_instances.get(factory)
+    if instance is None:
+        instance = _worker_instances[factory] = factory()
+    result = getattr(instance, name)(*args, **kwargs)
+    return result, time.thread_time() - start
+
+
+# Parent side -----------------------------------------------------------------
+
+class ProcessExecutor:
+    def __init__(self, workers: int, max_queue: int = 64):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Spawn and warm every worker; blocks until they all answered."""
+        with self._lock:
+            if self._pool is not None:
+                return
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            pool = ProcessPoolExecutor(self.workers, mp_context=context)
+            # One no-op per worker, submitted together, makes the pool start them all now.
+            for future in [pool.submit(_warm) for _ in range(self.workers)]:
+                future.result()
+            self._pool = pool
+
+    async def run(self, method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if self.pending >= self.workers + self.max_queue:
+            raise ExecutionQueueFull(f'{self.pending} calls already in the process pool')
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            if self._pool is None:
+                await loop.run_in_executor(None, self.start)
+            service = getattr(method, '__self__', None)
+            if service is None:
+                raise TypeError(f'{method!r}: the process policy needs a bound core-service method')
+            result, cpu = await loop.run_in_executor(
+                self._pool, _call_in_worker, _factory_resolver(type(service)), method.__name__, args, kwargs)
+            cell = offloaded_cpu.get()
+            if cell is not None:
+                cell[0] += cpu
+            return result
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+
+_executor: Optional[ProcessExecutor] = None
+
+
+def process_executor() -> ProcessExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessExecutor(
+            workers=int(os.environ.get('CORE_PROCESS_WORKERS') or min(4, os.cpu_count() or 1)),
+            max_queue=int(os.environ.get('CORE_PROCESS_QUEUE', '64')),
+        )
+    return _executor
+
+
+def shutdown_process_executor() -> None:
+    if _executor is not None:
+        _executor.shutdown()
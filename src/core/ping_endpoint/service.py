@@ -1,3 +1,7 @@
+from src.core.tracing import traced
+
+
 class PingEndpointService:
+    @traced
     def check(self) -> str:
         return "pong"
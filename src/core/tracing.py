@@ -0,0 +1,382 @@
+"""Lightweight tracing with W3C ``traceparent`` propagation.
+
+    class PriceService:
+        @traced
+        def quote(self, symbol: str) -> str:
+            ...
+
+The HTTP layer opens a server span per request, continuing the caller's
+trace when a valid ``traceparent`` header is present. ``@traced`` methods
+open child spans of whatever span is current (tracked in a contextvar, so
+it follows awaits and threadpool hops).
+
+Sampling is decided once, at the head of the trace: an incoming
+``traceparent`` keeps its sampled flag, otherwise the tracer's
+``sample_rate`` decides. Nothing is recorded for unsampled traces, but an
+incoming unsampled trace is still carried by a non-recording span
+(``Tracer.continue_unsampled``) so it can be propagated. With no sampled
+span current, a ``@traced`` call costs one contextvar lookup.
+
+``inject(headers)`` adds the current ``traceparent`` to the headers of an
+outbound call, so downstream services continue the trace.
+
+Finished spans go to the tracer's exporter: ``RingBufferExporter`` keeps
+the last N in memory (tests, debugging), and ``BatchExporter`` hands
+batches to a sink from a background thread. This module has no framework
+dependencies.
+
+``BatchExporter.close`` drains the queue and stops its thread; the app
+lifespan calls ``shutdown()`` so buffered spans are not lost on exit.
+"""
+import functools
+import inspect
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+_current: ContextVar[Optional['Span']] = ContextVar('current_span', default=None)
+_HEX = frozenset('0123456789abcdef')
+
+
+class SpanContext:
+    __slots__ = ('trace_id', 'span_id', 'sampled')
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[SpanContext]:
+    """Parse a version-00 ``traceparent``; None when absent or malformed."""
+    if not header or len(header) < 55:
+        return None
+    parts = header.strip().split('-')
+    if len(parts) < 4 or parts[0] == 'ff' or len(parts[0]) != 2:
+        return None
+    version, trace_id, span_id, flags = parts[:4]
+    if version == '00' and len(parts) != 4:
+        return None
+    if len(trace_id) != 32 or len(span_id) != 16 or len(flags) != 2:
+        return None
+    if not _HEX.issuperset(version + trace_id + span_id + flags):  # lowercase hex only
+        return None
+    if trace_id == '0' * 32 or span_id == '0' * 16:
+        return None
+    return SpanContext(trace_id, span_id, bool(int(flags, 16) & 1))
+
+
+def format_traceparent(context: SpanContext) -> str:
+    return f"00-{context.trace_id}-{context.span_id}-{'01' if context.sampled else '00'}"
+
+
+def _span_id() -> str:
+    return f'{random.getrandbits(64):016x}'
+
+
+class Span:
+    __slots__ = ('name', 'context', 'parent_id', 'kind', 'start', 'end', 'attributes', 'status', '_tracer')
+
+    def __init__(self, tracer: 'Tracer', name: str, context: SpanContext, parent_id: Optional[str],
+                 kind: str = 'internal', attributes: Optional[Dict[str, Any]] = None):
+        self._tracer = tracer
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.status = 'ok'
+        self.start = time.time_ns()
+        self.end: Optional[int] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = 'error'
+        self.attributes['exception.type'] = type(exc).__name__
+        self.attributes['exception.message'] = str(exc)
+
+    def finish(self) -> None:
+        if self.end is None:
+            self.end = time.time_ns()
+            if self.context.sampled:
+                self._tracer.export(self)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end is None else (self.end - self.start) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'trace_id': self.context.trace_id,
+            'span_id': self.context.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'kind': self.kind,
+            'start_ns': self.start,
+            'end_ns': self.end,
+            'duration_ms': self.duration_ms,
+            'status': self.status,
+            'attributes': self.attributes,
+        }
+
+
+class RingBufferExporter:
+    """Keeps the most recent ``capacity`` finished spans in memory."""
+
+    def __init__(self, capacity: int = 2048):
+        self.buffer: Deque[Span] = deque(maxlen=capacity)
+
+    def export(self, span: Span) -> None:
+        self.buffer.append(span)
+
+    def spans(self, trace_id: Optional[str] = None) -> List[Span]:
+        return [s for s in self.buffer if trace_id is None or s.context.trace_id == trace_id]
+
+    def clear(self) -> None:
+        self.buffer.clear()
+
+
+def json_lines_sink(stream=None) -> Callable[[List[Dict[str, Any]]], None]:
+    """Sink writing each span as a JSON line to ``stream`` (default stderr)."""
+
+    def sink(batch: List[Dict[str, Any]]) -> None:
+        out = stream or sys.stderr
+        out.write(''.join(json.dumps(span, separators=(',', ':')) + '\n' for span in batch))
+        out.flush()
+
+    return sink
+
+
+class BatchExporter:
+    """Queues finished spans and hands them to ``sink`` in batches from a background thread.
+
+    The queue is bounded; spans that do not fit are dropped and counted. The
+    thread starts with the first exported span.
+    """
+
+    def __init__(self, sink: Callable[[List[Dict[str, Any]]], None], max_queue: int = 4096,
+                 batch_size: int = 512, interval: float = 1.0):
+        self.sink = sink
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue: Deque[Span] = deque()
+        self.exported = 0
+        self.dropped = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        if len(self.queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self.queue.append(span)
+        if self._thread is None:
+            self._start()
+        if len(self.queue) >= self.batch_size:
+            self._wake.set()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+                self._thread.start()
+
+    def flush(self) -> int:
+        batch = []
+        try:
+            while len(batch) < self.batch_size:
+                batch.append(self.queue.popleft().to_dict())
+        except IndexError:
+            pass
+        if batch:
+            try:
+                self.sink(batch)
+            except Exception:
+                self.dropped += len(batch)
+                return 0
+            self.exported += len(batch)
+        return len(batch)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the thread and hand every queued span to the sink.
+
+        A later ``export`` starts a new thread, so a closed exporter can be reused.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            self._wake.set()
+            thread.join(timeout)
+            self._stop.clear()
+        while self.flush():
+            pass
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            while self.flush() == self.batch_size:
+                pass
+
+
+class Tracer:
+    def __init__(self, sample_rate: float = 0.0, exporter=None):
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+
+    def export(self, span: Span) -> None:
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+    def start_span(self, name: str, parent: Optional[SpanContext] = None, kind: str = 'internal',
+                   attributes: Optional[Dict[str, Any]] = None) -> Optional[Span]:
+        """Start a span, or return None when the trace is not sampled.
+
+        ``parent`` defaults to the current span. Without one, a new trace is
+        started and the sample rate decides whether it is recorded.
+        """
+        if parent is None:
+            current = _current.get()
+            parent = current.context if current is not None else None
+        if parent is not None:
+            if not parent.sampled:
+                return None
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            if not self.sample_rate or random.random() >= self.sample_rate:
+                return None
+            trace_id, parent_id = f'{random.getrandbits(128):032x}', None
+        context = SpanContext(trace_id, _span_id(), True)
+        return Span(self, name, context, parent_id, kind, attributes)
+
+    def continue_unsampled(self, name: str, parent: SpanContext, kind: str = 'internal') -> Span:
+        """A span that is never recorded; it only carries ``parent``'s trace onward."""
+        return Span(self, name, SpanContext(parent.trace_id, _span_id(), False), parent.span_id, kind)
+
+
+tracer = Tracer()
+
+
+def configure(sample_rate: Optional[float] = None, exporter=None) -> Tracer:
+    """Adjust the process-wide tracer in place (so existing references stay valid)."""
+    if sample_rate is not None:
+        tracer.sample_rate = sample_rate
+    if exporter is not None:
+        tracer.exporter = exporter
+    return tracer
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def inject(headers: Dict[str, str]) -> Dict[str, str]:
+    """Add the current span's ``traceparent`` to an outbound request's ``headers``."""
+    current = _current.get()
+    if current is not None:
+        headers['traceparent'] = format_traceparent(current.context)
+    return headers
+
+
+def activate(span: Span):
+    """Make ``span`` current; pass the returned token to ``deactivate``."""
+    return _current.set(span)
+
+
+def deactivate(token) -> None:
+    _current.reset(token)
+
+
+def traced(name: Any = None):
+    """Record a child span around each call; usable as ``@traced`` or ``@traced('name')``."""
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        span_name = name if isinstance(name, str) else fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                current = _current.get()
+                if current is None or not current.context.sampled:
+                    return await fn(*args, **kwargs)
+                span = tracer.start_span(span_name, current.context)
+                token = _current.set(span)
+                try:
+                    return await fn(*args, **kwargs)
+                except BaseException as exc:
+                    span.record_exception(exc)
+                    raise
+                finally:
+                    _current.reset(token)
+                    span.finish()
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            current = _current.get()
+            if current is None or not current.context.sampled:
+                return fn(*args, **kwargs)
+            span = tracer.start_span(span_name, current.context)
+            token = _current.set(span)
+            try:
+                return fn(*args, **kwargs)
+            except BaseException as exc:
+                span.record_exception(exc)
+                raise
+            finally:
+                _current.reset(token)
+                span.finish()
+
+        return wrapper
+
+    if callable(name):
+        return decorator(name)
+    return decorator
+
+
+_from_env: Dict[str, Any] = {}  # settings, exporter and file opened by the last tracer_from_env()
+
+
+def tracer_from_env() -> Tracer:
+    """Configure the process-wide tracer from ``TRACE_SAMPLE_RATE`` / ``TRACE_EXPORTER``.
+
+    Calling it again with the same settings keeps the current exporter (and
+    its open file); changed settings close the old exporter first.
+    """
+    kind = os.environ.get('TRACE_EXPORTER', 'batch')
+    settings = (kind, os.environ.get('TRACE_RING_SIZE', '2048'), os.environ.get('TRACE_EXPORT_PATH'))
+    sample_rate = float(os.environ.get('TRACE_SAMPLE_RATE', '0'))
+    if _from_env.get('settings') == settings and tracer.exporter is _from_env.get('exporter'):
+        return configure(sample_rate)
+    if kind == 'ring':
+        exporter, stream = RingBufferExporter(int(settings[1])), None
+    elif kind == 'batch':
+        stream = open(settings[2], 'a') if settings[2] else None
+        exporter = BatchExporter(json_lines_sink(stream))
+    else:
+        raise ValueError(f'Unknown TRACE_EXPORTER {kind!r}')
+    shutdown()
+    if _from_env.get('stream') is not None:
+        _from_env['stream'].close()
+    _from_env.update(settings=settings, exporter=exporter, stream=stream)
+    return configure(sample_rate, exporter)
+
+
+def shutdown() -> None:
+    """Flush the process-wide tracer's exporter and stop its thread, if it has one."""
+    close = getattr(tracer.exporter, 'close', None)
+    if close is not None:
+        close()
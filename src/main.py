@@ -1,6 +1,3 @@
-from fastapi import FastAPI
-
-app = FastAPI()
-
-from src.adapters.http.ping_endpoint_controller import router as ping_endpoint_router
-app.include_router(ping_endpoint_router)
+# Kept for backwards compatibility: generated controllers are now mounted by
+# src.application.main.create_app() from src/adapters/http/routes.json.
+from src.application.main import app  # noqa: F401
@@ -0,0 +1,22 @@
+import os
+
+import pytest
+
+from harness import BenchRecorder
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.environ.get('RUN_BENCHMARKS') == '1':
+        return
+    skip = pytest.mark.skip(reason='benchmarks run only with RUN_BENCHMARKS=1')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope='session')
+def bench_recorder():
+    recorder = BenchRecorder()
+    yield recorder
+    path = recorder.write()
+    print(f'\nBenchmark report written to {path}')
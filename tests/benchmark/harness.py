@@ -0,0 +1,185 @@
+"""Load generation, measurement and baseline storage for tests/benchmark.
+
+Two drivers are provided:
+
+* ``asgi_bench`` drives an app in-process through httpx's ASGI transport,
+  isolating framework and handler cost.
+* ``closed_loop`` (from ``scripts/load_driver.py``, shared with the
+  resource estimator) drives a real HTTP server with a fixed number of
+  connections, each issuing its next request as soon as the previous one
+  completes.
+
+``soak`` hammers a real server across several routes for minutes at a time
+and fits a line through its RSS samples, to catch slow leaks.
+
+Results are stored per commit in ``reports/bench-<sha>.json`` and compared
+with the most recent earlier report that did not regress.
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(ROOT / 'scripts'))
+
+from load_driver import (CONCURRENCY, DURATION, ROUTE_MANIFEST, UvicornServer, closed_loop,  # noqa: E402,F401
+                         rss_mib, run_workers, slope, summarize)
+
+REPORTS_DIR = ROOT / 'reports'
+
+REQUESTS = int(os.environ.get('BENCH_REQUESTS', '2000'))
+THRESHOLD = float(os.environ.get('BENCH_REGRESSION_THRESHOLD', '0.20'))
+SOAK_MINUTES = float(os.environ.get('BENCH_SOAK_MINUTES', '0'))
+SOAK_MAX_SLOPE = float(os.environ.get('BENCH_SOAK_MAX_SLOPE_MIB_PER_MIN', '0.5'))
+
+
+def bench_routes() -> List[str]:
+    """Probe routes plus every parameter-free generated route in the manifest."""
+    routes = ['/v1/ping', '/healthz']
+    if ROUTE_MANIFEST.exists():
+        for entry in json.loads(ROUTE_MANIFEST.read_text()).get('routers', []):
+            for route in entry.get('routes', []):
+                if '{' not in route['path'] and 'GET' in route.get('methods', ['GET']):
+                    routes.append(route['path'])
+    return routes
+
+
+def asgi_bench(app, path: str, requests: int = REQUESTS, concurrency: int = CONCURRENCY) -> Dict[str, float]:
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            await run_workers(client, path, concurrency, requests=min(200, requests))  # warm-up
+            return await run_workers(client, path, concurrency, requests=requests)
+
+    latencies, elapsed, errors = asyncio.run(run())
+    return summarize(latencies, elapsed, errors, rss_mib())
+
+
+def soak(base_url: str, paths: List[str], server_pid: int, minutes: float = SOAK_MINUTES,
+         concurrency: int = CONCURRENCY, sample_every: float = 5.0, warmup: float = 0.2) -> Dict:
+    """Drive ``paths`` round-robin for ``minutes`` and measure RSS growth.
+
+    RSS is sampled every ``sample_every`` seconds. The first ``warmup``
+    fraction of samples (allocator arenas, caches and lazy imports filling
+    up) is left out of the fit. The result's ``slope_mib_per_min`` is the
+    retained-memory growth rate.
+    """
+    duration = minutes * 60
+
+    async def run():
+        samples: List[Tuple[float, float]] = []
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+            started = time.perf_counter()
+            deadline = started + duration
+            counts = {'requests': 0, 'errors': 0}
+
+            async def worker(offset: int):
+                i = offset
+                while time.perf_counter() < deadline:
+                    r = await client.get(paths[i % len(paths)])
+                    counts['requests'] += 1
+                    if r.status_code >= 400:
+                        counts['errors'] += 1
+                    i += 1
+
+            async def sampler():
+                while True:
+                    now = time.perf_counter()
+                    samples.append(((now - started) / 60, rss_mib(server_pid)))
+                    if now >= deadline:
+                        return
+                    await asyncio.sleep(min(sample_every, max(0.0, deadline - now)))
+
+            await asyncio.gather(sampler(), *(worker(n) for n in range(concurrency)))
+        return samples, counts
+
+    samples, counts = asyncio.run(run())
+    fitted = samples[int(len(samples) * warmup):]
+    return {
+        'minutes': minutes,
+        'requests': counts['requests'],
+        'errors': counts['errors'],
+        'rss_start_mib': samples[0][1],
+        'rss_end_mib': samples[-1][1],
+        'slope_mib_per_min': round(slope(fitted), 4),
+        'samples': samples,
+    }
+
+
+def current_sha() -> str:
+    sha = os.environ.get('COMMIT_SHA') or os.environ.get('GITHUB_SHA')
+    if not sha:
+        try:
+            sha = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                                 text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            sha = 'local'
+    return sha[:12]
+
+
+class BenchRecorder:
+    """Collects results for one run, checks them against a baseline, writes the report."""
+
+    def __init__(self, reports_dir: Path = REPORTS_DIR, sha: Optional[str] = None,
+                 threshold: float = THRESHOLD):
+        self.reports_dir = reports_dir
+        self.sha = sha or current_sha()
+        self.threshold = threshold
+        self.path = reports_dir / f'bench-{self.sha}.json'
+        self.results: Dict[str, Dict[str, float]] = {}
+        self.regressions: List[str] = []
+        self.baseline_path = self._find_baseline()
+        self.baseline = json.loads(self.baseline_path.read_text()) if self.baseline_path else None
+
+    def _find_baseline(self) -> Optional[Path]:
+        pinned = os.environ.get('BENCH_BASELINE')
+        if pinned:
+            return Path(pinned)
+        candidates = []
+        for p in self.reports_dir.glob('bench-*.json'):
+            if p == self.path:
+                continue
+            try:
+                data = json.loads(p.read_text())
+            except ValueError:
+                continue
+            if not data.get('regressed'):
+                candidates.append((p.stat().st_mtime, p))
+        return max(candidates)[1] if candidates else None
+
+    def record(self, key: str, result: Dict[str, float]) -> List[str]:
+        """Store ``result`` and return regression messages versus the baseline."""
+        self.results[key] = result
+        base = (self.baseline or {}).get('results', {}).get(key)
+        if not base:
+            return []
+        problems = []
+        if result['rps'] < base['rps'] * (1 - self.threshold):
+            problems.append(f"{key}: rps {result['rps']} < baseline {base['rps']} (-{self.threshold:.0%})")
+        if result['p99_ms'] > base['p99_ms'] * (1 + self.threshold):
+            problems.append(f"{key}: p99 {result['p99_ms']}ms > baseline {base['p99_ms']}ms (+{self.threshold:.0%})")
+        self.regressions.extend(problems)
+        return problems
+
+    def write(self) -> Path:
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        report = {
+            'sha': self.sha,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'baseline': str(self.baseline_path) if self.baseline_path else None,
+            'threshold': self.threshold,
+            'regressed': bool(self.regressions),
+            'regressions': self.regressions,
+            'results': self.results,
+        }
+        self.path.write_text(json.dumps(report, indent=2))
+        return self.path
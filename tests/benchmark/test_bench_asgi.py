@@ -0,0 +1,18 @@
+import pytest
+
+from harness import asgi_bench, bench_routes
+from src.application.main import create_app
+
+
+@pytest.fixture(scope='module')
+def app():
+    return create_app()
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('path', bench_routes())
+def test_asgi_route(app, path, bench_recorder):
+    result = asgi_bench(app, path)
+    assert result['errors'] == 0
+    regressions = bench_recorder.record(f'asgi {path}', result)
+    assert not regressions, regressions
@@ -0,0 +1,54 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from src.application.metrics import MetricsMiddleware, MetricsStore, Registry
+
+MAX_OVERHEAD_US = float(os.environ.get('BENCH_METRICS_OVERHEAD_US', '5'))
+ITERATIONS = 50000
+
+
+class _Route:
+    path = '/v1/ping'
+
+
+async def endpoint(scope, receive, send):
+    scope['route'] = _Route
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b'{"pong":true}'})
+
+
+async def receive():
+    return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+
+async def send(message):
+    pass
+
+
+async def per_request_us(app) -> float:
+    scope = {'type': 'http', 'path': '/v1/ping', 'method': 'GET'}
+    for _ in range(1000):
+        await app(scope, receive, send)
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+@pytest.mark.benchmark
+def test_metrics_middleware_overhead():
+    wrapped = MetricsMiddleware(endpoint, registry=Registry(MetricsStore()))
+
+    async def measure():
+        # best of several rounds to reduce scheduler noise
+        bare = min([await per_request_us(endpoint) for _ in range(3)])
+        instrumented = min([await per_request_us(wrapped) for _ in range(3)])
+        return bare, instrumented
+
+    bare, instrumented = asyncio.run(measure())
+    overhead = instrumented - bare
+    print(f'\nbare {bare:.2f}us, instrumented {instrumented:.2f}us, overhead {overhead:.2f}us')
+    assert overhead <= MAX_OVERHEAD_US
@@ -0,0 +1,16 @@
+import pytest
+
+from harness import SOAK_MAX_SLOPE, SOAK_MINUTES, UvicornServer, bench_routes, soak
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(SOAK_MINUTES <= 0, reason='soak runs only with BENCH_SOAK_MINUTES > 0')
+def test_soak_memory_growth(bench_recorder):
+    with UvicornServer() as server:
+        result = soak(server.base_url, bench_routes(), server.pid)
+    bench_recorder.results['soak'] = result  # not compared with the baseline; the slope bound is absolute
+    assert result['errors'] == 0
+    assert result['slope_mib_per_min'] <= SOAK_MAX_SLOPE, (
+        f"RSS grew {result['slope_mib_per_min']} MiB/min over {result['minutes']} min "
+        f"({result['rss_start_mib']} -> {result['rss_end_mib']} MiB), limit {SOAK_MAX_SLOPE}"
+    )
@@ -0,0 +1,72 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from src.application.tracing import TracingMiddleware
+from src.core.tracing import RingBufferExporter, Tracer, traced
+
+MAX_OVERHEAD_US = float(os.environ.get('BENCH_TRACING_OVERHEAD_US', '2'))
+ITERATIONS = 50000
+
+
+class Service:
+    def check(self):
+        return 'pong'
+
+    @traced
+    def traced_check(self):
+        return 'pong'
+
+
+service = Service()
+
+
+async def bare_endpoint(scope, receive, send):
+    service.check()
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b'{"message":"pong"}'})
+
+
+async def traced_endpoint(scope, receive, send):
+    service.traced_check()
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b'{"message":"pong"}'})
+
+
+async def receive():
+    return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+
+async def send(message):
+    pass
+
+
+async def per_request_us(app) -> float:
+    scope = {'type': 'http', 'path': '/ping_endpoint', 'method': 'GET',
+             'headers': [(b'host', b'bench'), (b'accept', b'*/*'), (b'user-agent', b'bench')]}
+    for _ in range(1000):
+        await app(scope, receive, send)
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+@pytest.mark.benchmark
+def test_tracing_overhead_with_sampling_off():
+    exporter = RingBufferExporter()
+    instrumented = TracingMiddleware(traced_endpoint, tracer=Tracer(sample_rate=0.0, exporter=exporter))
+
+    async def measure():
+        # best of several rounds to reduce scheduler noise
+        bare = min([await per_request_us(bare_endpoint) for _ in range(3)])
+        traced_us = min([await per_request_us(instrumented) for _ in range(3)])
+        return bare, traced_us
+
+    bare, traced_us = asyncio.run(measure())
+    overhead = traced_us - bare
+    print(f'\nbare {bare:.2f}us, traced (unsampled) {traced_us:.2f}us, overhead {overhead:.2f}us')
+    assert not exporter.spans()
+    assert overhead <= MAX_OVERHEAD_US
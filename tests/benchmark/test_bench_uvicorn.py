@@ -0,0 +1,18 @@
+import pytest
+
+from harness import UvicornServer, bench_routes, closed_loop
+
+
+@pytest.fixture(scope='module')
+def server():
+    with UvicornServer() as srv:
+        yield srv
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('path', bench_routes())
+def test_uvicorn_route(server, path, bench_recorder):
+    result = closed_loop(server.base_url, path, server_pid=server.pid)
+    assert result['errors'] == 0
+    regressions = bench_recorder.record(f'uvicorn {path}', result)
+    assert not regressions, regressions
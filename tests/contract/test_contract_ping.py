@@ -1,16 +1,34 @@
+import json
+
 import pytest
-from fastapi.testclient import TestClient
-from src.application.main import app
 
-# This is a minimal contract test that verifies the OpenAPI contains /v1/ping
-# In CI this should point to the running test server; here we check local app
-# via TestClient or start server.
+from src.application.openapi_snapshot import MANIFEST_HASH, file_sha256, snapshot_path
+from src.application.routers import MANIFEST_PATH
+
+# Contract tests read the OpenAPI snapshot written by the generator
+# (src/adapters/http/openapi.json) instead of booting the app; the unit
+# suite checks that the snapshot still matches the live schema.
+
+SNAPSHOT = json.loads(snapshot_path().read_text())
+
 
-client = TestClient(app)
+@pytest.mark.contract
+def test_snapshot_matches_route_manifest():
+    assert SNAPSHOT[MANIFEST_HASH] == file_sha256(MANIFEST_PATH)
 
 
 @pytest.mark.contract
 def test_contract_ping_path():
-    # ensure the path exists by calling the endpoint
-    r = client.get('/v1/ping')
-    assert r.status_code == 200
+    operation = SNAPSHOT['paths']['/v1/ping']['get']
+    assert '200' in operation['responses']
+
+
+@pytest.mark.contract
+def test_contract_generated_routes_are_typed():
+    manifest = json.loads(MANIFEST_PATH.read_text())
+    for entry in manifest['routers']:
+        for route in entry['routes']:
+            for method in route['methods']:
+                ok = SNAPSHOT['paths'][route['path']][method.lower()]['responses']['200']
+                ref = ok['content']['application/json']['schema']['$ref']
+                assert ref.split('/')[-1] in SNAPSHOT['components']['schemas']
@@ -0,0 +1,81 @@
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.application.access_log import AccessLogWriter, format_record, sample_from_env
+from src.application.main import create_app
+
+
+@pytest.mark.unit
+def test_record_is_one_json_line():
+    line = format_record(1.5, 'GET', '/a"b', None, 200, 0.0012, 10, '10.0.0.1')
+    assert line.endswith(b'\n')
+    assert json.loads(line) == {'ts': 1.5, 'pid': json.loads(line)['pid'], 'method': 'GET', 'path': '/a"b',
+                                'route': None, 'status': 200, 'duration_ms': 1.2, 'bytes': 10, 'client': '10.0.0.1'}
+
+
+@pytest.mark.unit
+def test_full_queue_drops_instead_of_blocking():
+    stream = io.BytesIO()
+    writer = AccessLogWriter(stream, max_queue=2)
+    assert writer.submit(b'1\n') and writer.submit(b'2\n')
+    assert not writer.submit(b'3\n')
+    assert writer.dropped == 1
+    assert writer.flush() == 2
+    assert stream.getvalue() == b'1\n2\n'
+    assert writer.submit(b'4\n')
+
+
+@pytest.mark.unit
+def test_app_logs_in_background_and_samples(monkeypatch, tmp_path):
+    log = tmp_path / 'access.log'
+    monkeypatch.setenv('ACCESS_LOG_PATH', str(log))
+    monkeypatch.setenv('ACCESS_LOG_SAMPLE', '{"/healthz": 0}')
+    with TestClient(create_app()) as client:
+        for _ in range(5):
+            client.get('/healthz')
+        client.get('/v1/ping')
+        client.get('/missing')
+    records = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [(r['path'], r['status'], r['route']) for r in records] == [
+        ('/v1/ping', 200, '/v1/ping'), ('/missing', 404, None)]
+
+
+@pytest.mark.unit
+def test_disabled(monkeypatch, tmp_path):
+    log = tmp_path / 'access.log'
+    monkeypatch.setenv('ACCESS_LOG_ENABLED', '0')
+    monkeypatch.setenv('ACCESS_LOG_PATH', str(log))
+    with TestClient(create_app()) as client:
+        client.get('/v1/ping')
+    assert not log.exists()
+
+
+@pytest.mark.unit
+def test_probe_routes_sampled_by_default(monkeypatch):
+    monkeypatch.delenv('ACCESS_LOG_SAMPLE', raising=False)
+    rates = sample_from_env()
+    assert rates['/v1/ping'] == rates['/healthz'] == 0.01
+
+
+@pytest.mark.unit
+def test_writer_closes_the_file_it_opened(tmp_path):
+    log = tmp_path / 'access.log'
+    writer = AccessLogWriter(path=str(log))
+    writer.start()
+    writer.submit(b'1\n')
+    writer.stop()
+    assert writer.stream.closed
+    writer.start()  # a second lifespan reopens it
+    writer.submit(b'2\n')
+    writer.stop()
+    assert writer.stream.closed
+    assert log.read_bytes() == b'1\n2\n'
+
+    stream = io.BytesIO()
+    borrowed = AccessLogWriter(stream)
+    borrowed.start()
+    borrowed.stop()
+    assert not stream.closed
@@ -0,0 +1,85 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.application.admission import AdmissionMiddleware, Limit, Pool
+from src.application.metrics import MetricsStore, Registry
+
+
+def build_app(registry):
+    app = FastAPI()
+
+    @app.get('/slow')
+    async def slow():
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    @app.get('/healthz')
+    async def healthz():
+        return {"status": "ok"}
+
+    app.add_middleware(AdmissionMiddleware, default=Limit(max_inflight=1, max_queue=1, queue_timeout=1),
+                       retry_after=3, registry=registry)
+    return app
+
+
+async def fire(app, paths):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        return await asyncio.gather(*(client.get(p) for p in paths))
+
+
+@pytest.mark.unit
+def test_excess_requests_are_shed_with_retry_after():
+    registry = Registry(MetricsStore())
+    responses = asyncio.run(fire(build_app(registry), ['/slow'] * 4))
+    statuses = sorted(r.status_code for r in responses)
+    assert statuses == [200, 200, 503, 503]
+    rejected = [r for r in responses if r.status_code == 503]
+    assert rejected[0].headers['retry-after'] == '3'
+    text = registry.exposition().decode()
+    assert 'admission_rejected_total{pool="default"} 2' in text
+    assert 'admission_queue_seconds_count{pool="default"} 1' in text
+
+
+@pytest.mark.unit
+def test_priority_lane_is_never_limited():
+    responses = asyncio.run(fire(build_app(None), ['/slow'] * 3 + ['/healthz'] * 20))
+    assert all(r.status_code == 200 for r in responses[3:])
+
+
+@pytest.mark.unit
+def test_queue_deadline_rejects_and_frees_queue_slot():
+    async def run():
+        pool = Pool('p', Limit(max_inflight=1, max_queue=1, queue_timeout=0.01))
+        assert await pool.acquire() == 0.0
+        assert await pool.acquire() is None      # waited past the deadline
+        assert not pool.waiters
+        waiter = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0)
+        pool.release()                           # slot handed to the queued request
+        assert await waiter >= 0
+        pool.release()
+        assert pool.inflight == 0
+
+    asyncio.run(run())
+
+
+@pytest.mark.unit
+def test_per_route_pools_by_prefix():
+    middleware = AdmissionMiddleware(None, routes={'/reports': Limit(max_inflight=2), '/reports/big': Limit(1)})
+    assert middleware.pool_for('/reports/big/1').limit.max_inflight == 1
+    assert middleware.pool_for('/reports/x').limit.max_inflight == 2
+    assert middleware.pool_for('/other') is middleware.default
+
+
+@pytest.mark.unit
+def test_prefixes_match_whole_segments_and_templates():
+    middleware = AdmissionMiddleware(None, routes={'/reports': Limit(2), '/items/{item_id}/history': Limit(1)})
+    assert middleware.pool_for('/reports').limit.max_inflight == 2
+    assert middleware.pool_for('/reportsX') is middleware.default
+    assert middleware.pool_for('/items/42/history').limit.max_inflight == 1
+    assert middleware.pool_for('/items/42/history/7').limit.max_inflight == 1
+    assert middleware.pool_for('/items/42/other') is middleware.default
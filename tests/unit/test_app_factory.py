@@ -0,0 +1,69 @@
+import json
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.application.main import create_app
+
+CONTROLLER = '''
+from fastapi import APIRouter
+
+router = APIRouter()
+
+@router.get("/lazy_feature")
+async def lazy_feature():
+    return {"message": "pong"}
+'''
+
+
+@pytest.fixture
+def manifest(tmp_path, monkeypatch):
+    (tmp_path / 'lazy_feature_controller.py').write_text(CONTROLLER)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    sys.modules.pop('lazy_feature_controller', None)
+
+    def write(load):
+        path = tmp_path / 'routes.json'
+        path.write_text(json.dumps({'version': 1, 'routers': [{
+            'module': 'lazy_feature_controller', 'attr': 'router', 'load': load,
+            'routes': [{'path': '/lazy_feature', 'methods': ['GET']}],
+        }]}))
+        return path
+
+    yield write
+    sys.modules.pop('lazy_feature_controller', None)
+
+
+@pytest.mark.unit
+def test_lazy_router_imported_on_first_request(manifest):
+    app = create_app(manifest('lazy'))
+    assert 'lazy_feature_controller' not in sys.modules
+    client = TestClient(app)
+    assert client.get('/lazy_feature').json() == {"message": "pong"}
+    assert 'lazy_feature_controller' in sys.modules
+    assert client.get('/lazy_feature').json() == {"message": "pong"}
+    assert not app.state.router_loader.pending
+
+
+@pytest.mark.unit
+def test_background_router_warmed_after_startup(manifest):
+    app = create_app(manifest('background'))
+    assert app.state.router_loader.pending
+    with TestClient(app) as client:
+        assert client.get('/v1/ping').status_code == 200
+        assert client.get('/lazy_feature').status_code == 200
+    assert not app.state.router_loader.pending
+
+
+@pytest.mark.unit
+def test_openapi_lists_unloaded_routers(manifest):
+    app = create_app(manifest('lazy'))
+    assert '/lazy_feature' in TestClient(app).get('/openapi.json').json()['paths']
+
+
+@pytest.mark.unit
+def test_eager_override(manifest, monkeypatch):
+    monkeypatch.setenv('ROUTER_LOADING', 'eager')
+    create_app(manifest('lazy'))
+    assert 'lazy_feature_controller' in sys.modules
@@ -0,0 +1,108 @@
+import asyncio
+import time
+import tracemalloc
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.adapters.http.registry import invoke
+from src.application.budgets import Budget, BudgetMiddleware
+from src.application.main import create_app
+from src.application.metrics import MetricsStore, Registry
+from src.core.execution import THREAD
+
+
+class Cruncher:
+    execution = THREAD
+
+    def crunch(self):
+        deadline = time.thread_time() + 0.02
+        while time.thread_time() < deadline:
+            pass
+
+
+async def burn(scope, receive, send):
+    deadline = time.thread_time() + 0.02
+    while time.thread_time() < deadline:
+        pass
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def receive():
+    return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+
+async def send(message):
+    pass
+
+
+def call(app, path):
+    asyncio.run(app({'type': 'http', 'path': path, 'method': 'GET', 'headers': []}, receive, send))
+
+
+@pytest.mark.unit
+def test_cpu_overage_counted_per_window():
+    registry = Registry(MetricsStore())
+    app = BudgetMiddleware(burn, [Budget('/items/{id}', cpu=0.1)], registry=registry, window=0)
+    call(app, '/items/7')
+    call(app, '/other')
+    assert app.overages == {'/items/{id}': {'cpu': 1, 'memory': 0}}
+    text = registry.exposition().decode()
+    assert 'route_cpu_budget_exceeded_total{route="/items/{id}"} 1' in text
+    assert 'route="/other"' not in text
+
+
+@pytest.mark.unit
+def test_within_budget_is_not_flagged():
+    app = BudgetMiddleware(burn, [Budget('/items', cpu=4)], window=0)
+    call(app, '/items')
+    assert app.overages == {}
+
+
+@pytest.mark.unit
+def test_memory_overage_per_request():
+    budget = Budget('/items', memory_mib=1)
+    app = BudgetMiddleware(burn, [budget], trace_memory=False)
+    app._account(budget, 0.0, 600 * 1024)
+    app._account(budget, 0.0, 600 * 1024)
+    assert app.overages == {}
+    app._account(budget, 0.0, 2 * 1024 * 1024)
+    assert app.overages == {'/items': {'cpu': 0, 'memory': 1}}
+
+
+@pytest.mark.unit
+def test_request_allocations_are_traced():
+    async def allocate(scope, receive, send):
+        chunk = bytearray(4 * 1024 * 1024)
+        del chunk
+        await burn(scope, receive, send)
+
+    was_tracing = tracemalloc.is_tracing()
+    try:
+        app = BudgetMiddleware(allocate, [Budget('/items', memory_mib=2)], trace_memory=True)
+        assert tracemalloc.is_tracing()
+        call(app, '/items')
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    assert app.overages == {'/items': {'cpu': 0, 'memory': 1}}
+
+
+@pytest.mark.unit
+def test_offloaded_cpu_is_charged_to_the_route():
+    async def offload(scope, receive, send):
+        await invoke(Cruncher().crunch)
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    app = BudgetMiddleware(offload, [Budget('/items', cpu=0.1)], window=0)
+    call(app, '/items')
+    assert app.overages == {'/items': {'cpu': 1, 'memory': 0}}
+
+
+@pytest.mark.unit
+def test_manifest_budget_applied_to_generated_route():
+    client = TestClient(create_app())
+    client.get('/ping_endpoint')
+    assert 'route_cpu_seconds_total{route="/ping_endpoint"}' in client.get('/metrics').text
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import types
+from pathlib import Path
+
+import pytest
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.testclient import TestClient
+from jinja2 import Environment, FileSystemLoader
+from pydantic import BaseModel
+
+from src.adapters.http import serialization
+from src.adapters.http.response_cache import CachedResponses
+from src.adapters.http.serialization import ResponseEncoder
+from src.application.metrics import MetricsStore, Registry
+from src.core.cache import TTLCache, cached, set_cache_observer
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+def test_ttl_expiry_and_lru_eviction():
+    clock = Clock()
+    cache = TTLCache('test', maxsize=2, ttl=10, clock=clock)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1          # 'a' becomes most recent
+    cache.set('c', 3)                   # evicts 'b'
+    assert cache.get('b') is None
+    clock.now = 11
+    assert cache.get('a') is None       # expired
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'evictions': 1, 'size': 1}
+
+
+@pytest.mark.unit
+def test_cached_method_sync_and_async():
+    calls = []
+
+    class Service:
+        @cached(ttl=60, maxsize=8)
+        def check(self, value='pong'):
+            calls.append(value)
+            return value
+
+        @cached(ttl=60, maxsize=8)
+        async def fetch(self, value):
+            calls.append(value)
+            return value
+
+    service = Service()
+    assert service.check() == service.check() == 'pong'
+    assert service.check(value='x') == 'x'
+    assert asyncio.run(service.fetch(1)) == asyncio.run(service.fetch(1)) == 1
+    assert calls == ['pong', 'x', 1]
+    assert Service.check.cache.stats()['hits'] == 1
+    assert Service().check() == 'pong'  # another instance does not share results
+    assert calls == ['pong', 'x', 1, 'pong']
+
+
+@pytest.mark.unit
+def test_cache_events_exported_as_metrics():
+    registry = Registry(MetricsStore())
+    set_cache_observer(registry.cache_event)
+    try:
+        cache = TTLCache('exported', maxsize=1)
+        cache.get('a')
+        cache.set('a', 1)
+        cache.get('a')
+        cache.set('b', 2)
+    finally:
+        set_cache_observer(None)
+    text = registry.exposition().decode()
+    assert 'service_cache_hits_total{cache="exported"} 1' in text
+    assert 'service_cache_misses_total{cache="exported"} 1' in text
+    assert 'service_cache_evictions_total{cache="exported"} 1' in text
+
+
+@pytest.mark.unit
+def test_if_none_match_answered_without_calling_service():
+    calls = []
+    responses = CachedResponses('/cached', ttl=60)
+    router = APIRouter()
+
+    async def payload():
+        calls.append(1)
+        return {"message": "pong"}
+
+    @router.get('/cached')
+    async def endpoint(request: Request):
+        return await responses.respond(request, payload)
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    first = client.get('/cached')
+    assert first.json() == {"message": "pong"}
+    etag = first.headers['etag']
+    assert client.get('/cached', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/cached').headers['etag'] == etag
+    assert client.get('/cached?other=1').status_code == 200
+    assert len(calls) == 2
+
+
+class Message(BaseModel):
+    message: str
+
+
+@pytest.mark.unit
+def test_cached_variants_follow_negotiation(monkeypatch):
+    # A stand-in packer, so the msgpack branch is exercised without the optional dependency.
+    packer = types.SimpleNamespace(packb=lambda value: b'packed:' + json.dumps(value).encode())
+    monkeypatch.setattr(serialization, 'msgpack', packer)
+    calls = []
+    responses = CachedResponses('/variants', ttl=60, encoder=ResponseEncoder(Message, compress_min_bytes=64))
+    router = APIRouter()
+
+    async def payload():
+        calls.append(1)
+        return Message(message='pong' * 50)
+
+    @router.get('/variants')
+    async def endpoint(request: Request):
+        return await responses.respond(request, payload)
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    plain = client.get('/variants', headers={'Accept-Encoding': 'identity'})
+    assert plain.headers['content-type'] == 'application/json'
+    assert 'content-encoding' not in plain.headers
+    assert plain.headers['vary'] == 'Accept, Accept-Encoding'
+    assert plain.json() == {'message': 'pong' * 50}
+
+    gzipped = client.get('/variants', headers={'Accept-Encoding': 'gzip'})
+    assert gzipped.headers['content-encoding'] == 'gzip'
+    assert gzipped.json() == {'message': 'pong' * 50}  # decoded by the client
+
+    packed = client.get('/variants', headers={'Accept': 'application/msgpack', 'Accept-Encoding': 'identity'})
+    assert packed.headers['content-type'] == 'application/msgpack'
+    assert packed.content.startswith(b'packed:')
+
+    etags = {r.headers['etag'] for r in (plain, gzipped, packed)}
+    assert len(etags) == 3
+    revalidate = {'Accept-Encoding': 'gzip', 'If-None-Match': gzipped.headers['etag']}
+    not_modified = client.get('/variants', headers=revalidate)
+    assert not_modified.status_code == 304
+    assert not_modified.headers['vary'] == 'Accept, Accept-Encoding'
+    assert client.get('/variants', headers={'Accept-Encoding': 'identity',
+                                            'If-None-Match': gzipped.headers['etag']}).status_code == 200
+    assert len(calls) == 1
+
+
+@pytest.mark.unit
+def test_generated_cacheable_controller_uses_the_route_encoder():
+    env = Environment(loader=FileSystemLoader(str(Path(__file__).resolve().parents[2] / 'templates')))
+    source = env.get_template('controller.py.j2').render(
+        endpoint='/ping_endpoint', class_name='PingEndpointService', model_name='PingEndpointResponse',
+        singleflight=False, cacheable=True, cache_ttl=30.0, cache_maxsize=8)
+    module = types.ModuleType('cached_ping_controller')
+    exec(compile(source, module.__name__, 'exec'), module.__dict__)
+    assert module.responses.encoder is module.encoder
+
+    app = FastAPI()
+    app.include_router(module.router)
+    r = TestClient(app).get('/ping_endpoint', headers={'Accept-Encoding': 'gzip'})
+    assert r.json() == {'message': 'pong'}
+    assert r.headers['vary'] == 'Accept, Accept-Encoding'
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import threading
+
+import pytest
+from fastapi import APIRouter, Depends
+from fastapi.testclient import TestClient
+
+from src.adapters.http.registry import invoke, provide, registry
+from src.application.main import create_app
+from src.core.execution import (INLINE, PROCESS, THREAD, ExecutionQueueFull, ProcessExecutor, execution_policy,
+                                policy_of)
+
+
+class CrunchService:
+    execution = PROCESS
+
+    def __init__(self):
+        self.calls = 0
+
+    def crunch(self, data: bytes) -> dict:
+        self.calls += 1
+        return {'pid': os.getpid(), 'size': len(data), 'calls': self.calls}
+
+    @execution_policy(INLINE)
+    def peek(self) -> int:
+        return threading.get_ident()
+
+    @execution_policy(THREAD)
+    def blocking_peek(self) -> int:
+        return threading.get_ident()
+
+
+@pytest.mark.unit
+def test_policy_resolution():
+    service = CrunchService()
+    assert policy_of(service.crunch) == PROCESS
+    assert policy_of(service.peek) == INLINE
+    assert policy_of(service.blocking_peek) == THREAD
+
+    class Legacy:
+        blocking = True
+
+        def check(self):
+            pass
+
+    class Bad:
+        execution = 'gpu'
+
+        def check(self):
+            pass
+
+    assert policy_of(Legacy().check) == THREAD
+    with pytest.raises(ValueError):
+        policy_of(Bad().check)
+
+
+@pytest.mark.unit
+def test_invoke_dispatches_by_policy():
+    service = CrunchService()
+
+    async def run():
+        return threading.get_ident(), await invoke(service.peek), await invoke(service.blocking_peek)
+
+    loop_thread, inline, threaded = asyncio.run(run())
+    assert inline == loop_thread and threaded != loop_thread
+
+
+@pytest.mark.unit
+def test_process_pool_reuses_warm_worker_instances():
+    executor = ProcessExecutor(workers=1, max_queue=0)
+    service = CrunchService()
+
+    async def run():
+        first = await executor.run(service.crunch, b'x' * 1024)
+        second = await executor.run(service.crunch, b'')
+        return first, second
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert first['pid'] == second['pid'] != os.getpid()
+    assert (first['size'], second['calls']) == (1024, 2)  # one service instance per worker process
+    assert service.calls == 0
+
+
+def crunch_from_factory() -> CrunchService:
+    service = CrunchService()
+    service.calls = 100
+    return service
+
+
+@pytest.mark.unit
+def test_process_pool_builds_services_with_registered_factory():
+    executor = ProcessExecutor(workers=1, max_queue=0)
+    registry.register(CrunchService, crunch_from_factory)
+    try:
+        result = asyncio.run(executor.run(CrunchService().crunch, b''))
+    finally:
+        executor.shutdown()
+        registry.register(CrunchService)
+    assert result['calls'] == 101
+
+
+@pytest.mark.unit
+def test_full_process_queue_returns_503(monkeypatch):
+    executor = ProcessExecutor(workers=1, max_queue=0)
+    executor.pending = 1
+    monkeypatch.setattr('src.adapters.http.registry.process_executor', lambda: executor)
+
+    router = APIRouter()
+
+    @router.get('/crunch')
+    async def crunch(service: CrunchService = Depends(provide(CrunchService))):
+        return await invoke(service.crunch, b'')
+
+    app = create_app()
+    app.include_router(router)
+    r = TestClient(app).get('/crunch')
+    assert r.status_code == 503 and r.headers['retry-after'] == '1'
+    with pytest.raises(ExecutionQueueFull):
+        asyncio.run(executor.run(CrunchService().crunch, b''))
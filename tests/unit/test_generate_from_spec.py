@@ -0,0 +1,140 @@
+import hashlib
+import json
+import multiprocessing
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'scripts'))
+
+import generate_from_spec as gen  # noqa: E402
+
+
+def manifest():
+    return {'version': 1, 'routers': []}
+
+
+@pytest.mark.unit
+def test_route_entry_drops_removed_rate_limit():
+    routes = manifest()
+    gen.apply_route_entry(routes, 'Reports', 'reports', ['/reports'], rate_limit={'rate': '5'})
+    assert routes['routers'][0]['rate_limit'] == {'rate': 5.0}
+    routes['routers'][0]['load'] = 'eager'  # hand-edited fields survive
+    gen.apply_route_entry(routes, 'Reports', 'reports', ['/reports'], rate_limit=None)
+    assert 'rate_limit' not in routes['routers'][0]
+    assert routes['routers'][0]['load'] == 'eager'
+
+
+@pytest.mark.unit
+def test_route_entry_drops_removed_budget():
+    routes = manifest()
+    gen.apply_route_entry(routes, 'Reports', 'reports', ['/reports'], budget={'cpu': 0.5})
+    assert routes['routers'][0]['budget'] == {'cpu': 0.5}
+    gen.apply_route_entry(routes, 'Reports', 'reports', ['/reports'], budget=None)
+    assert 'budget' not in routes['routers'][0]
+
+
+FEATURE = '''Feature: {name}
+
+Scenario: {name} works
+  Given the service is running
+  When I call GET /{slug}
+  {then} I receive a 200 OK
+'''
+
+
+@pytest.fixture
+def workspace(monkeypatch, tmp_path):
+    monkeypatch.setenv('SPEC_CACHE', '0')
+    monkeypatch.setattr(gen, 'ROOT', tmp_path)
+    monkeypatch.setattr(gen, 'REPORTS_DIR', tmp_path / 'reports')
+    monkeypatch.setattr(gen, 'GENERATION_MANIFEST', tmp_path / 'reports' / 'generation-manifest.json')
+    monkeypatch.setattr(gen, 'ROUTE_MANIFEST', tmp_path / 'src/adapters/http/routes.json')
+    monkeypatch.setattr(gen, 'TEMPLATE_CACHE', tmp_path / 'reports' / '.jinja-cache')
+    monkeypatch.setattr(gen, '_env', None)
+    (tmp_path / 'features').mkdir()
+    return tmp_path
+
+
+def write_feature(root, name, then='Then'):
+    slug = name.lower()
+    (root / 'features' / f'{slug}.feature').write_text(FEATURE.format(name=name, slug=slug, then=then))
+
+
+def routed_modules(root):
+    return [r['module'] for r in json.loads((root / 'src/adapters/http/routes.json').read_text())['routers']]
+
+
+@pytest.mark.unit
+def test_incremental_run_reuses_unchanged_features(workspace):
+    write_feature(workspace, 'Reports')
+    entries, changed, reused = gen.generate(workers=1)
+    assert reused == 0 and (workspace / 'src/core/reports/service.py') in map(Path, changed)
+
+    entries, changed, reused = gen.generate(incremental=True, workers=1)
+    assert (reused, changed) == (1, [])
+    assert entries['features/reports.feature']['module'] == 'src.adapters.http.reports_controller'
+
+
+@pytest.mark.unit
+def test_failing_feature_keeps_its_outputs_and_route(workspace):
+    write_feature(workspace, 'Reports')
+    before = gen.generate(workers=1)[0]['features/reports.feature']
+    write_feature(workspace, 'Reports', then='And')  # no Then step any more
+
+    entry = gen.generate(incremental=True, workers=1)[0]['features/reports.feature']
+    assert entry['errors']
+    assert (entry['outputs'], entry['module']) == (before['outputs'], before['module'])
+    assert all((workspace / o).exists() for o in entry['outputs'])
+    assert routed_modules(workspace) == ['src.adapters.http.reports_controller']
+
+
+@pytest.mark.unit
+def test_deleted_feature_is_pruned(workspace):
+    write_feature(workspace, 'Reports')
+    write_feature(workspace, 'Orders')
+    gen.generate(workers=1)
+    (workspace / 'features' / 'orders.feature').unlink()
+
+    entries, changed, reused = gen.generate(incremental=True, workers=1)
+    assert list(entries) == ['features/reports.feature'] and reused == 1
+    assert not (workspace / 'src/core/orders').exists()
+    assert not (workspace / 'src/adapters/http/orders_controller.py').exists()
+    assert (workspace / 'src/core/reports/service.py').exists()
+    assert routed_modules(workspace) == ['src.adapters.http.reports_controller']
+
+
+@pytest.mark.unit
+def test_spawned_workers_render_like_the_parent(workspace, monkeypatch):
+    for name in ('Reports', 'Orders', 'Invoices'):
+        write_feature(workspace, name)
+    jobs = [(f, hashlib.sha256(f.read_bytes()).hexdigest(), None)
+            for f in sorted((workspace / 'features').glob('*.feature'))]
+    serial = gen.build_features(jobs, workers=1)
+    monkeypatch.setattr(gen, 'PARALLEL_THRESHOLD', 1)
+    assert gen.build_features(jobs, workers=2, mp_context=multiprocessing.get_context('spawn')) == serial
+
+
+@pytest.mark.unit
+def test_parsed_features_are_not_read_again(workspace, monkeypatch):
+    write_feature(workspace, 'Reports')
+    paths = gen.spec_parser.discover(workspace / 'features')
+    parsed = dict(zip(paths, gen.spec_parser.parse_many(paths, workers=1)))
+    monkeypatch.setattr(gen.spec_parser, 'parse_bytes', None)  # any reparse would fail
+    paths[0].unlink()  # and so would reading the file again
+    entries = gen.generate(workers=1, features=parsed)[0]
+    assert entries['features/reports.feature']['sha'] == parsed[paths[0]].sha
+    assert entries['features/reports.feature']['module'] == 'src.adapters.http.reports_controller'
+
+
+@pytest.mark.unit
+def test_empty_tree_never_prunes(workspace):
+    write_feature(workspace, 'Reports')
+    gen.generate(workers=1)
+    (workspace / 'features' / 'reports.feature').unlink()
+    for features in ({}, None):
+        with pytest.raises(ValueError):
+            gen.generate(workers=1, features=features)
+    assert (workspace / 'src/core/reports/service.py').exists()
+    assert routed_modules(workspace) == ['src.adapters.http.reports_controller']
@@ -0,0 +1,66 @@
+import pytest
+
+from src.application.launcher import cgroup_cpu_limit, cgroup_memory_limit_mib, plan_launch
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for name in ('WEB_CONCURRENCY', 'BACKLOG', 'KEEP_ALIVE', 'UVICORN_LOOP', 'UVICORN_HTTP'):
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.mark.unit
+def test_cgroup_v2_limits(tmp_path):
+    (tmp_path / 'cpu.max').write_text('250000 100000\n')
+    (tmp_path / 'memory.max').write_text(str(512 * 1024 * 1024))
+    assert cgroup_cpu_limit(tmp_path) == 2.5
+    assert cgroup_memory_limit_mib(tmp_path) == 512
+
+
+@pytest.mark.unit
+def test_cgroup_unlimited(tmp_path):
+    (tmp_path / 'cpu.max').write_text('max 100000\n')
+    (tmp_path / 'memory.max').write_text('max\n')
+    assert cgroup_cpu_limit(tmp_path) is None
+    assert cgroup_memory_limit_mib(tmp_path) is None
+
+
+@pytest.mark.unit
+def test_workers_follow_cpu_quota():
+    plan = plan_launch({'memory_mib': 64}, cpus=16, cpu_limit=4.0, memory_limit_mib=None, max_backlog=65535)
+    assert plan.workers == 4
+    assert plan.backlog == 4096
+
+
+@pytest.mark.unit
+def test_workers_capped_by_memory_estimate():
+    plan = plan_launch({'memory_mib': 256}, cpus=8, cpu_limit=None, memory_limit_mib=600, max_backlog=4096)
+    assert plan.workers == 2
+
+
+@pytest.mark.unit
+def test_fractional_quota_keeps_one_worker_and_env_overrides(monkeypatch):
+    assert plan_launch({}, cpus=8, cpu_limit=0.5, memory_limit_mib=None, max_backlog=128).workers == 1
+    monkeypatch.setenv('WEB_CONCURRENCY', '3')
+    monkeypatch.setenv('KEEP_ALIVE', '75')
+    plan = plan_launch({}, cpus=8, cpu_limit=0.5, memory_limit_mib=None, max_backlog=128)
+    assert (plan.workers, plan.keep_alive, plan.backlog) == (3, 75, 128)
+
+
+@pytest.mark.unit
+def test_process_pool_shares_cores_and_memory(monkeypatch):
+    monkeypatch.delenv('CORE_PROCESS_WORKERS', raising=False)
+    plan = plan_launch({'memory_mib': 100}, cpus=8, cpu_limit=None, memory_limit_mib=None, max_backlog=4096,
+                       process_pool=True)
+    assert (plan.workers, plan.process_workers) == (4, 1)
+    monkeypatch.setenv('CORE_PROCESS_WORKERS', '3')
+    plan = plan_launch({'memory_mib': 100}, cpus=8, cpu_limit=None, memory_limit_mib=900, max_backlog=4096,
+                       process_pool=True)
+    assert (plan.workers, plan.process_workers) == (2, 3)
+
+
+@pytest.mark.unit
+def test_inflight_memory_is_set_aside_once():
+    estimates = {'memory_mib': 100, 'inflight_memory_mib': 200}
+    plan = plan_launch(estimates, cpus=8, cpu_limit=None, memory_limit_mib=700, max_backlog=4096)
+    assert plan.workers == 5
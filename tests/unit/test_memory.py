@@ -0,0 +1,86 @@
+import tracemalloc
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.application.main import create_app
+from src.application.memory import MemoryInspector, admin_router
+from src.application.profiling import sign_token
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv('MEMORY_ADMIN_ENABLED', '1')
+    monkeypatch.setenv('MEMORY_ADMIN_SECRET', 's3cret')
+    client = TestClient(create_app())
+    client.headers['X-Admin-Token'] = sign_token('s3cret')
+    yield client
+    tracemalloc.stop()
+
+
+@pytest.mark.unit
+def test_disabled_by_default(monkeypatch):
+    monkeypatch.delenv('MEMORY_ADMIN_ENABLED', raising=False)
+    assert TestClient(create_app()).get('/admin/memory/gc').status_code == 404
+
+
+@pytest.mark.unit
+def test_not_mounted_without_a_secret(monkeypatch):
+    monkeypatch.setenv('MEMORY_ADMIN_ENABLED', '1')
+    monkeypatch.delenv('MEMORY_ADMIN_SECRET', raising=False)
+    client = TestClient(create_app())
+    assert client.post('/admin/memory/tracemalloc/start').status_code == 404
+    assert client.get('/admin/memory/objects').status_code == 404
+
+
+@pytest.mark.unit
+def test_router_without_a_secret_rejects_everything():
+    app = FastAPI()
+    app.include_router(admin_router(MemoryInspector()))
+    assert TestClient(app).get('/admin/memory/gc', headers={'X-Admin-Token': sign_token('')}).status_code == 403
+
+
+@pytest.mark.unit
+def test_requires_signed_token(client):
+    del client.headers['X-Admin-Token']
+    assert client.get('/admin/memory/gc').status_code == 403
+
+
+@pytest.mark.unit
+def test_snapshot_top_and_diff(client):
+    assert client.post('/admin/memory/snapshots/early').status_code == 409
+    assert client.post('/admin/memory/tracemalloc/start').json()['tracing'] is True
+    assert client.post('/admin/memory/snapshots/before').status_code == 200
+    leak = [bytearray(1024) for _ in range(2000)]
+    assert client.post('/admin/memory/snapshots/after').status_code == 200
+
+    top = client.get('/admin/memory/snapshots/after', params={'limit': 5}).json()['top']
+    assert len(top) <= 5 and top[0]['size_bytes'] > 0
+
+    diff = client.get('/admin/memory/diff', params={'base': 'before', 'target': 'after'}).json()
+    assert diff['size_diff_bytes'] >= 2000 * 1024
+    assert any(site['file'].endswith('test_memory.py') for site in diff['top'])
+    assert client.get('/admin/memory/diff', params={'base': 'before', 'target': 'nope'}).status_code == 404
+    del leak
+
+
+@pytest.mark.unit
+def test_gc_and_object_counts(client):
+    gc_stats = client.get('/admin/memory/gc').json()
+    assert len(gc_stats['generations']) == 3
+    objects = client.get('/admin/memory/objects', params={'limit': 3}).json()
+    assert len(objects['types']) == 3
+    assert objects['tracked_objects'] >= sum(t['count'] for t in objects['types'])
+
+
+@pytest.mark.unit
+def test_oldest_snapshot_is_dropped():
+    inspector = MemoryInspector(max_snapshots=2)
+    inspector.start(1)
+    try:
+        for name in ('a', 'b', 'c'):
+            inspector.snapshot(name)
+        assert list(inspector.snapshots) == ['b', 'c']
+    finally:
+        inspector.stop()
@@ -0,0 +1,102 @@
+import json
+import threading
+from array import array
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.application.main import create_app
+from src.application.metrics import MetricsMiddleware, MetricsStore, Registry
+
+
+def sample(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(' ', 1)[1])
+    raise AssertionError(f'{line_prefix} not in exposition')
+
+
+@pytest.mark.unit
+def test_metrics_endpoint_reports_route_templates():
+    client = TestClient(create_app())
+    for _ in range(3):
+        client.get('/v1/ping')
+    client.get('/no-such-route')
+    text = client.get('/metrics').text
+    assert sample(text, 'http_request_duration_seconds_count{route="/v1/ping"}') >= 3
+    assert sample(text, 'http_response_size_bytes_bucket{route="/v1/ping",le="+Inf"}') >= 3
+    assert 'route="__unmatched__"' in text
+
+
+@pytest.mark.unit
+def test_workers_merge_through_shared_directory(tmp_path):
+    apps = []
+    for worker in ('a', 'b'):
+        registry = Registry(MetricsStore(str(tmp_path), capacity=4096, worker_id=worker))
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware, registry=registry)
+
+        @app.get('/items/{item_id}')
+        async def item(item_id: int):
+            return {"id": item_id}
+
+        apps.append((app, registry))
+
+    TestClient(apps[0][0]).get('/items/1')
+    TestClient(apps[1][0]).get('/items/2')
+    TestClient(apps[1][0]).get('/items/3')
+    apps[1][1].store.flush()  # worker b's sidecar thread may not have run yet
+    text = apps[0][1].exposition().decode()
+    assert sample(text, 'http_request_duration_seconds_count{route="/items/{item_id}"}') == 3
+
+
+@pytest.mark.unit
+def test_reclaimed_worker_file_starts_from_zero(tmp_path):
+    # What an earlier worker with the same id left behind.
+    (tmp_path / 'metrics-w.db').write_bytes(array('d', [7.0] * 4096).tobytes())
+    (tmp_path / 'metrics-w.json').write_text(json.dumps({'stale|series': [0, 4]}))
+
+    store = MetricsStore(str(tmp_path), capacity=4096, worker_id='w')
+    assert not any(store.values)
+    assert store.merged() == {}
+
+
+@pytest.mark.unit
+def test_series_overflow_is_bounded():
+    registry = Registry(MetricsStore(capacity=300))
+    first = registry.request_duration.slot('/a')
+    assert registry.request_duration.slot('/b') != first
+    overflow = registry.request_duration.slot('/c')
+    assert registry.request_duration.slot('/d') == overflow
+    registry.request_duration.observe(overflow, 0.01)
+    assert 'route="__overflow__"' in registry.exposition().decode()
+
+
+@pytest.mark.unit
+def test_send_wrappers_are_reused():
+    app = FastAPI()
+    middleware = MetricsMiddleware(app, registry=Registry(MetricsStore()))
+    app.get('/x')(lambda: {'ok': True})
+    client = TestClient(middleware)
+    client.get('/x')
+    recorder = middleware._recorders[0]
+    client.get('/x')
+    assert middleware._recorders == [recorder]
+    assert recorder.send is None
+
+
+@pytest.mark.unit
+def test_cache_events_from_threads_are_not_lost():
+    registry = Registry(MetricsStore())
+
+    def hits():
+        for _ in range(20000):
+            registry.cache_event('svc', 'hit')
+
+    threads = [threading.Thread(target=hits) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sample(registry.exposition().decode(), 'service_cache_hits_total{cache="svc"}') == 80000
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.application.main import create_app
+from src.application.openapi_snapshot import build_document, snapshot_path, strip_stamps
+from src.application.routers import MANIFEST_PATH
+
+
+def operations(document):
+    return {path: sorted(item) for path, item in document['paths'].items()}
+
+
+@pytest.mark.unit
+def test_snapshot_has_not_drifted_from_live_schema(monkeypatch):
+    # Paths and methods only: the exact schema output varies across fastapi/pydantic releases.
+    monkeypatch.setenv('OPENAPI_SNAPSHOT', '0')
+    live = build_document(create_app())
+    on_disk = json.loads(snapshot_path().read_text())
+    assert operations(on_disk) == operations(live), \
+        'run `python -m src.application.openapi_snapshot` to refresh the snapshot'
+
+
+@pytest.mark.unit
+def test_snapshot_served_from_memory_without_loading_routers():
+    app = create_app()
+    client = TestClient(app)
+    r = client.get('/openapi.json')
+    assert r.json() == strip_stamps(json.loads(snapshot_path().read_text()))
+    assert app.state.router_loader.pending  # lazy controllers were not imported for the schema
+    assert client.get('/openapi.json', headers={'If-None-Match': r.headers['etag']}).status_code == 304
+    app.state.router_loader.load_all()
+    assert app.openapi_schema == r.json()  # mounting routers keeps the snapshot
+
+
+@pytest.mark.unit
+def test_stale_snapshot_is_ignored(tmp_path):
+    manifest = tmp_path / 'routes.json'
+    manifest.write_text(MANIFEST_PATH.read_text().replace('"version": 1', '"version": 1 '))
+    snapshot_path(manifest).write_text(snapshot_path().read_text())  # stamped with the real manifest's hash
+    app = create_app(manifest)
+    assert app.openapi_schema is None
+    assert '/ping_endpoint' in TestClient(app).get('/openapi.json').json()['paths']
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.application.main import create_app
+from src.application import profiling
+from src.application.profiling import ProfilingMiddleware, sign_token, verify_token
+
+SECRET = 'test-secret'
+
+
+def profiling_app(monkeypatch, tmp_path, **env):
+    monkeypatch.setenv('PROFILING_ENABLED', '1')
+    monkeypatch.setenv('PROFILING_SECRET', SECRET)
+    monkeypatch.setenv('PROFILING_OUTPUT_DIR', str(tmp_path))
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return TestClient(create_app())
+
+
+@pytest.mark.unit
+def test_token_signature_and_expiry():
+    now = time.time()
+    token = sign_token(SECRET, ttl=60, now=now)
+    assert verify_token(SECRET, token, now=now)
+    assert not verify_token('other', token, now=now)
+    assert not verify_token(SECRET, token, now=now + 120)
+    assert not verify_token(SECRET, 'garbage')
+
+
+@pytest.mark.unit
+def test_disabled_by_default(monkeypatch):
+    monkeypatch.delenv('PROFILING_ENABLED', raising=False)
+    app = create_app()
+    assert all(m.cls is not ProfilingMiddleware for m in app.user_middleware)
+    assert TestClient(app).get('/admin/profiles').status_code == 404
+
+
+@pytest.mark.unit
+def test_signed_request_writes_folded_profile(monkeypatch, tmp_path):
+    client = profiling_app(monkeypatch, tmp_path)
+    assert client.get('/healthz').status_code == 200
+    assert not list(tmp_path.iterdir())
+
+    token = sign_token(SECRET)
+    assert client.get('/healthz', headers={'X-Profile-Token': token}).status_code == 200
+    assert len(list(tmp_path.glob('*.folded'))) == 1
+
+    assert client.get('/admin/profiles').status_code == 403
+    profiles = client.get('/admin/profiles', headers={'X-Profile-Token': token}).json()['profiles']
+    assert profiles[0]['path'] == '/healthz'
+    assert profiles[0]['mode'] == 'sampling'
+    assert 'top_frames' in profiles[0]
+
+
+@pytest.mark.unit
+def test_cprofile_mode_by_sampling_rate(monkeypatch, tmp_path):
+    client = profiling_app(monkeypatch, tmp_path, PROFILING_MODE='cprofile', PROFILING_SAMPLE_RATE='1')
+    assert client.get('/v1/ping').status_code == 200
+    assert len(list(tmp_path.glob('*.prof'))) == 1
+    summary = client.get('/admin/profiles', headers={'X-Profile-Token': sign_token(SECRET)}).json()['profiles'][0]
+    assert summary['mode'] == 'cprofile'
+    assert summary['top_frames']
+
+
+@pytest.mark.unit
+def test_profiles_route_needs_a_secret(monkeypatch, tmp_path):
+    monkeypatch.setenv('PROFILING_ENABLED', '1')
+    monkeypatch.setenv('PROFILING_SAMPLE_RATE', '1')
+    monkeypatch.setenv('PROFILING_OUTPUT_DIR', str(tmp_path))
+    monkeypatch.delenv('PROFILING_SECRET', raising=False)
+    client = TestClient(create_app())
+    assert client.get('/healthz').status_code == 200
+    assert client.get('/admin/profiles').status_code == 404
+
+
+@pytest.mark.unit
+def test_one_cprofile_session_at_a_time(tmp_path):
+    sent = []
+
+    async def app(scope, receive, send):
+        await asyncio.sleep(0.05)
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b'ok'})
+
+    async def send(message):
+        sent.append(message)
+
+    async def noop():
+        return {'type': 'http.request'}
+
+    middleware = ProfilingMiddleware(app, sample_rate=1.0, mode='cprofile', output_dir=tmp_path)
+    scope = {'type': 'http', 'method': 'GET', 'path': '/slow', 'headers': []}
+
+    async def run():
+        await asyncio.gather(middleware(scope, noop, send), middleware(scope, noop, send))
+
+    asyncio.run(run())
+    assert [m['status'] for m in sent if m['type'] == 'http.response.start'] == [200, 200]
+    assert len(list(tmp_path.glob('*.prof'))) == 1
+    assert not profiling._cprofile_active.locked()
@@ -0,0 +1,93 @@
+import multiprocessing
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.application.main import create_app
+from src.application.ratelimit import BucketTable, RateLimitMiddleware, Rule, key_hash
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+def test_bucket_refills_at_rate_up_to_burst():
+    clock = Clock()
+    table = BucketTable(slots=16, clock=clock)
+    rule = Rule('r', rate=2, burst=3)
+    key = key_hash('r', 'ip:1.2.3.4')
+    assert [table.take(key, rule) for _ in range(3)] == [0, 0, 0]
+    assert table.take(key, rule) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert table.take(key, rule) == 0
+    clock.now += 60
+    assert [table.take(key, rule) for _ in range(3)] == [0, 0, 0]
+    assert table.take(key, rule) > 0
+
+
+@pytest.mark.unit
+def test_full_set_evicts_least_recently_used():
+    clock = Clock()
+    table = BucketTable(slots=4, clock=clock)  # a single 4-way set
+    rule = Rule('r', rate=1, burst=1)
+    keys = [key_hash('r', f'ip:{n}') for n in range(5)]
+    for key in keys[:4]:
+        clock.now += 1
+        assert table.take(key, rule) == 0
+        assert table.take(key, rule) > 0
+    clock.now += 0.1
+    assert table.take(keys[4], rule) == 0  # evicts keys[0]
+    assert table.take(keys[1], rule) == 0  # keys[1] refilled after 3.1s, still tracked
+    assert table.take(keys[0], rule) == 0  # forgotten, so it starts with a full bucket
+
+
+def _drain(path, results):
+    table = BucketTable(path, slots=64)
+    rule = Rule('shared', rate=0.001, burst=50)
+    key = key_hash('shared', 'ip:10.0.0.1')
+    results.put(sum(1 for _ in range(40) if table.take(key, rule) == 0))
+
+
+@pytest.mark.unit
+def test_buckets_are_shared_across_processes(tmp_path):
+    path = str(tmp_path / 'ratelimit.db')
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_drain, args=(path, results)) for _ in range(3)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(30)
+    assert sum(results.get(timeout=5) for _ in workers) == 50
+
+
+@pytest.mark.unit
+def test_middleware_limits_routes_but_not_probes(monkeypatch):
+    monkeypatch.setenv('RATELIMIT_ROUTES', '{"/ping_endpoint": {"rate": 0.01, "burst": 2}}')
+    monkeypatch.setenv('RATELIMIT_KEY', 'api_key')
+    client = TestClient(create_app())
+    assert [client.get('/ping_endpoint').status_code for _ in range(3)] == [200, 200, 429]
+    limited = client.get('/ping_endpoint')
+    assert limited.json() == {'detail': 'Too Many Requests'}
+    assert int(limited.headers['retry-after']) >= 1
+    assert client.get('/ping_endpoint', headers={'X-API-Key': 'other'}).status_code == 200
+    assert all(client.get('/healthz').status_code == 200 for _ in range(5))
+
+
+@pytest.mark.unit
+def test_not_installed_without_rules(monkeypatch):
+    monkeypatch.delenv('RATELIMIT_ROUTES', raising=False)
+    monkeypatch.delenv('RATELIMIT_RATE', raising=False)
+    assert all(m.cls is not RateLimitMiddleware for m in create_app().user_middleware)
+
+
+@pytest.mark.unit
+def test_route_rules_match_whole_segments():
+    middleware = RateLimitMiddleware(None, BucketTable(None, 64), routes={'/reports': Rule('r', rate=1)})
+    assert middleware.rule_for('/reports/1').name == 'r'
+    assert middleware.rule_for('/reportsX') is None
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.application.main import create_app
+from src.application.readiness import ReadinessRegistry
+
+
+def wait_for(client, status, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        r = client.get('/readyz')
+        if r.json()['status'] == status:
+            return r
+        time.sleep(0.01)
+    raise AssertionError(f'/readyz never reported {status}: {r.json()}')
+
+
+@pytest.mark.unit
+def test_not_ready_before_startup():
+    r = TestClient(create_app(readiness=ReadinessRegistry())).get('/readyz')
+    assert r.status_code == 503
+    assert r.json()['status'] == 'starting'
+
+
+@pytest.mark.unit
+def test_ready_when_all_probes_pass():
+    registry = ReadinessRegistry()
+    registry.register('sync', lambda: True, interval=0.05)
+
+    async def async_ok():
+        return True
+
+    registry.register('async', async_ok, interval=0.05)
+    with TestClient(create_app(readiness=registry)) as client:
+        r = wait_for(client, 'ready')
+        assert r.status_code == 200
+        assert r.json()['probes'] == {'async': {'healthy': True}, 'sync': {'healthy': True}}
+
+
+@pytest.mark.unit
+def test_failing_and_slow_probes_return_503():
+    registry = ReadinessRegistry()
+
+    def broken():
+        raise ConnectionError('db down')
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    registry.register('db', broken, interval=0.05)
+    registry.register('cache', slow, interval=0.05, timeout=0.01)
+    with TestClient(create_app(readiness=registry)) as client:
+        r = wait_for(client, 'not_ready')
+        assert r.status_code == 503
+        assert r.json()['probes']['db']['error'] == 'ConnectionError: db down'
+        assert 'timed out' in r.json()['probes']['cache']['error']
+        # a matching If-None-Match must not turn an error into a 304
+        assert client.get('/readyz', headers={'If-None-Match': r.headers['etag']}).status_code == 503
+
+
+@pytest.mark.unit
+def test_probe_recovery_flips_cached_verdict():
+    registry = ReadinessRegistry()
+    state = {'ok': False}
+    registry.register('flaky', lambda: state['ok'], interval=0.02)
+    with TestClient(create_app(readiness=registry)) as client:
+        wait_for(client, 'not_ready')
+        state['ok'] = True
+        assert wait_for(client, 'ready').status_code == 200
+
+
+@pytest.mark.unit
+def test_hung_sync_probe_holds_one_dedicated_thread():
+    registry = ReadinessRegistry()
+    release = threading.Event()
+    calls = []
+
+    def hung():
+        calls.append(threading.current_thread().name)
+        release.wait(5)
+
+    registry.register('hung', hung, interval=0.01, timeout=0.01)
+    try:
+        with TestClient(create_app(readiness=registry)) as client:
+            wait_for(client, 'not_ready')
+            time.sleep(0.2)
+            assert client.get('/readyz').json()['probes']['hung']['error'] == 'previous check still running'
+            assert len(calls) == 1
+            assert calls[0].startswith('readiness')
+    finally:
+        release.set()
@@ -0,0 +1,85 @@
+import json
+import sys
+from itertools import count
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'scripts'))
+
+import load_driver  # noqa: E402
+import resource_estimator as est  # noqa: E402
+
+
+class FakeServer:
+    pid = 4242
+    base_url = 'http://127.0.0.1:1'
+
+
+@pytest.fixture
+def fake_load(monkeypatch):
+    ticks = count()
+    monkeypatch.setattr(est, 'cpu_seconds', lambda pid: next(ticks) * 0.25)  # 0.25s CPU per step
+    monkeypatch.setattr(est, 'peak_rss_mib', lambda pid: 120.0)
+    last = {}
+
+    def closed_loop(base_url, path, concurrency, duration, server_pid):
+        last['concurrency'] = concurrency
+        return {'requests': 90, 'errors': 0, 'rps': 90.0, 'p50_ms': 10.0 * concurrency, 'p95_ms': 12.0 * concurrency}
+
+    monkeypatch.setattr(load_driver, 'closed_loop', closed_loop)
+    monkeypatch.setattr(load_driver, 'rss_mib', lambda pid: 98.0 + 2.0 * last['concurrency'])
+
+
+@pytest.mark.unit
+def test_fit_line_clamps_at_zero():
+    assert est.fit_line([(1, 100.0), (4, 106.0), (16, 130.0)]) == pytest.approx((98.0, 2.0))
+    assert est.fit_line([(1, 10.0), (4, 4.0)]) == (7.0, 0.0)  # shrinking RSS is noise, not a negative cost
+    assert est.fit_line([(4, 50.0)]) == (50.0, 0.0)
+
+
+@pytest.mark.unit
+def test_measure_feature_fits_the_model(fake_load):
+    measured = est.measure_feature(FakeServer(), ['/reports'], [1, 4], seconds=1.0, idle=0.0)
+    assert [s['concurrency'] for s in measured['steps']] == [1, 4]
+    model = measured['model']
+    # 0.5 CPU seconds over 90 + 10 and 90 + 40 requests (timed plus warm-up).
+    assert model['cpu_ms_per_request'] == pytest.approx(500 / 230, abs=1e-4)
+    assert (model['base_rss_mib'], model['rss_mib_per_inflight']) == (98.0, 2.0)
+    assert (model['p50_ms'], model['peak_rss_mib'], model['max_rps']) == (10.0, 120.0, 90.0)
+
+
+@pytest.mark.unit
+def test_project_splits_worker_and_inflight_memory():
+    model = {'idle_cores': 0.0, 'cpu_ms_per_request': 2.0, 'base_rss_mib': 98.0, 'rss_mib_per_inflight': 2.0,
+             'peak_rss_mib': 120.0, 'p50_ms': 50.0, 'max_rps': 150.0}
+    projection = est.project(model, target_rps=200, headroom=0.25)
+    assert projection['inflight'] == 10.0  # Little's law: 200 rps x 50 ms
+    assert (projection['cpu_request_m'], projection['cpu_limit_m']) == (400, 500)
+    assert (projection['memory_request_mib'], projection['memory_limit_mib']) == (118, 150)
+    assert (projection['worker_memory_mib'], projection['inflight_memory_mib']) == (100, 20)
+    assert projection['saturated']
+
+
+@pytest.mark.unit
+def test_measured_estimate_reports_memory_per_worker(monkeypatch, tmp_path):
+    projection = {'cpu_request_m': 410, 'memory_request_mib': 118, 'worker_memory_mib': 100,
+                  'inflight_memory_mib': 20}
+    monkeypatch.setattr(est, 'measure', lambda *args: {'projection': projection, 'features': {}})
+    out = tmp_path / 'estimates.json'
+    report = est.estimate(measured=True, output=out)
+    assert json.loads(out.read_text()) == report
+    assert (report['source'], report['cpu_m'], report['memory_mib'], report['inflight_memory_mib']) == (
+        'measured', 410, 100, 20)
+    assert report['heuristic']['memory_mib'] >= 64
+
+
+@pytest.mark.unit
+def test_failed_measurement_falls_back_to_heuristic(monkeypatch, tmp_path):
+    def fail(*args):
+        raise RuntimeError('no parameter-free GET routes in the route manifest to measure')
+
+    monkeypatch.setattr(est, 'measure', fail)
+    report = est.estimate(measured=True, output=tmp_path / 'estimates.json')
+    assert report['source'] == 'heuristic'
+    assert 'no parameter-free' in report['measure_error']
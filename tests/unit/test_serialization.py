@@ -0,0 +1,93 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from src.adapters.http import serialization
+from src.adapters.http.serialization import ResponseEncoder, compress, wants_msgpack
+from src.application.main import create_app
+
+
+class Item(BaseModel):
+    name: str
+    tags: list
+
+
+def item_app(compress_min_bytes=64):
+    app = FastAPI()
+    encoder = ResponseEncoder(Item, compress_min_bytes=compress_min_bytes)
+
+    @app.get('/item', response_model=Item)
+    async def item(request: Request, size: int = 1):
+        return encoder.respond(request, Item(name='x', tags=['t'] * size))
+
+    return TestClient(app)
+
+
+@pytest.mark.unit
+def test_model_json_and_no_compression_below_threshold():
+    r = item_app().get('/item', headers={'Accept-Encoding': 'gzip'})
+    assert r.headers['content-type'] == 'application/json'
+    assert 'content-encoding' not in r.headers
+    assert r.content == b'{"name":"x","tags":["t"]}'
+
+
+@pytest.mark.unit
+def test_gzip_above_threshold_only_when_accepted():
+    client = item_app()
+    r = client.get('/item', params={'size': 100}, headers={'Accept-Encoding': 'gzip, deflate'})
+    assert r.headers['content-encoding'] == 'gzip'
+    assert r.headers['vary'] == 'Accept, Accept-Encoding'
+    assert r.json()['tags'] == ['t'] * 100
+    body, encoding = compress(b'x' * 100, 'identity', 64)
+    assert (body, encoding) == (b'x' * 100, None)
+    assert compress(b'x' * 100, 'gzip', 0) == (b'x' * 100, None)
+
+
+@pytest.mark.unit
+def test_zstd_preferred_when_installed():
+    zstandard = pytest.importorskip('zstandard')
+    body, encoding = compress(b'x' * 4096, 'gzip, zstd', 64)
+    assert encoding == 'zstd'
+    assert zstandard.ZstdDecompressor().decompress(body) == b'x' * 4096
+    assert gzip.decompress(compress(b'x' * 4096, 'gzip', 64)[0]) == b'x' * 4096
+
+
+@pytest.mark.unit
+def test_msgpack_negotiation():
+    if serialization.msgpack is None:
+        assert not wants_msgpack('application/msgpack')
+        r = item_app().get('/item', headers={'Accept': 'application/msgpack'})
+        assert r.headers['content-type'] == 'application/json'
+        return
+    assert wants_msgpack('application/json;q=0.5, application/msgpack')
+    assert not wants_msgpack('application/msgpack;q=0')
+    r = item_app().get('/item', headers={'Accept': 'application/msgpack'})
+    assert r.headers['content-type'] == 'application/msgpack'
+    assert serialization.msgpack.unpackb(r.content) == {'name': 'x', 'tags': ['t']}
+
+
+@pytest.mark.unit
+def test_generated_route_has_typed_schema():
+    client = TestClient(create_app())
+    assert client.get('/ping_endpoint').json() == {'message': 'pong'}
+    schema = client.get('/openapi.json').json()
+    ok = schema['paths']['/ping_endpoint']['get']['responses']['200']['content']['application/json']['schema']
+    assert ok == {'$ref': '#/components/schemas/PingEndpointResponse'}
+
+
+@pytest.mark.unit
+def test_q_values_rank_encodings_and_media_types(monkeypatch):
+    assert compress(b'x' * 100, 'gzip;q=0', 64) == (b'x' * 100, None)
+    assert compress(b'x' * 100, 'zstd;q=0, gzip;q=0.5', 64)[1] == 'gzip'
+    assert compress(b'x' * 100, '*', 64)[1] in ('gzip', 'zstd')
+    assert compress(b'x' * 100, '*;q=0, identity', 64)[1] is None
+
+    monkeypatch.setattr(serialization, 'msgpack', object())
+    assert wants_msgpack('application/msgpack')
+    assert wants_msgpack('application/msgpack, application/json')
+    assert not wants_msgpack('application/msgpack;q=0.5, application/json')
+    assert not wants_msgpack('application/msgpack;q=0.5, */*')
+    assert not wants_msgpack('application/json')
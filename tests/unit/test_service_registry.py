@@ -0,0 +1,70 @@
+import asyncio
+import inspect
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.adapters.http.ping_endpoint_controller import ping_endpoint
+from src.adapters.http.registry import ServiceRegistry, invoke, registry
+from src.core.ping_endpoint.service import PingEndpointService
+from src.application.main import app
+
+client = TestClient(app)
+
+
+@pytest.mark.unit
+def test_service_built_once_per_worker():
+    created = []
+
+    class Counting(PingEndpointService):
+        def __init__(self):
+            created.append(self)
+
+    registry.register(PingEndpointService, Counting)
+    try:
+        for _ in range(3):
+            assert client.get('/ping_endpoint').json() == {"message": "pong"}
+        assert len(created) == 1
+    finally:
+        registry.register(PingEndpointService)
+
+
+@pytest.mark.unit
+def test_generated_handler_runs_on_event_loop():
+    assert inspect.iscoroutinefunction(ping_endpoint)
+
+
+@pytest.mark.unit
+def test_invoke_dispatch():
+    loop_thread = []
+
+    class Inline:
+        def check(self):
+            loop_thread.append(threading.get_ident())
+            return 'inline'
+
+    class Blocking(Inline):
+        blocking = True
+
+    class Async:
+        async def check(self):
+            return 'async'
+
+    async def run():
+        here = threading.get_ident()
+        assert await invoke(Inline().check) == 'inline'
+        assert await invoke(Blocking().check) == 'inline'
+        assert await invoke(Async().check) == 'async'
+        return here
+
+    here = asyncio.run(run())
+    assert loop_thread[0] == here
+    assert loop_thread[1] != here
+
+
+@pytest.mark.unit
+def test_provider_is_cached():
+    reg = ServiceRegistry()
+    assert reg.provider(PingEndpointService) is reg.provider(PingEndpointService)
+    assert asyncio.run(reg.provider(PingEndpointService)()) is reg.get(PingEndpointService)
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from src.adapters.http.singleflight import SingleFlight
+
+
+class Backend:
+    def __init__(self, delay=0.01, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def fetch(self, value):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError('boom')
+        return value
+
+
+@pytest.mark.unit
+def test_concurrent_calls_share_one_execution():
+    flight, backend = SingleFlight(), Backend()
+
+    async def run():
+        return await asyncio.gather(*(flight.do('k', backend.fetch, 'v') for _ in range(100)))
+
+    assert asyncio.run(run()) == ['v'] * 100
+    assert backend.calls == 1
+    assert (flight.calls, flight.shared) == (1, 99)
+
+
+@pytest.mark.unit
+def test_distinct_keys_do_not_coalesce():
+    flight, backend = SingleFlight(), Backend()
+
+    async def run():
+        return await asyncio.gather(flight.do('a', backend.fetch, 1), flight.do('b', backend.fetch, 2))
+
+    assert asyncio.run(run()) == [1, 2]
+    assert backend.calls == 2
+
+
+@pytest.mark.unit
+def test_grace_window_absorbs_trailing_burst():
+    flight, backend = SingleFlight(grace=0.05), Backend(delay=0)
+
+    async def run():
+        await flight.do('k', backend.fetch, 'v')
+        await flight.do('k', backend.fetch, 'v')
+        await asyncio.sleep(0.1)
+        await flight.do('k', backend.fetch, 'v')
+
+    asyncio.run(run())
+    assert backend.calls == 2
+
+
+@pytest.mark.unit
+def test_errors_reach_every_caller_and_are_not_cached():
+    flight, backend = SingleFlight(grace=1), Backend(fail=True)
+
+    async def run():
+        results = await asyncio.gather(*(flight.do('k', backend.fetch, 'v') for _ in range(5)),
+                                       return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        backend.fail = False
+        return await flight.do('k', backend.fetch, 'v')
+
+    assert asyncio.run(run()) == 'v'
+    assert backend.calls == 2
+
+
+@pytest.mark.unit
+def test_cancelled_leader_does_not_cancel_followers():
+    flight, backend = SingleFlight(), Backend(delay=0.05)
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do('k', backend.fetch, 'v'))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do('k', backend.fetch, 'v'))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == 'v'
+    assert backend.calls == 1
@@ -0,0 +1,127 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'scripts'))
+
+import spec_parser as sp  # noqa: E402
+
+SPEC = '''# leading comment
+@billing @slow
+Feature: Invoices
+  In order to get paid
+  As a vendor
+
+  Background:
+    Given a signed-in vendor
+    And an open ledger
+
+  @smoke
+  Scenario: Send an invoice
+    Given a draft invoice
+    And a customer email
+    When I send it
+    Then the customer receives it
+    But no payment is recorded
+    * the ledger is unchanged
+    """
+    Then this line is a doc string, not a step
+    """
+    | Then | this is a table row |
+
+  Scenario Outline: Totals
+    Given <n> lines
+    Then the total is <total>
+
+    Examples:
+      | n | total |
+      Then this line belongs to the examples block
+'''
+
+
+@pytest.fixture
+def caches(monkeypatch, tmp_path):
+    monkeypatch.setattr(sp, 'CACHE_DIR', tmp_path)
+    monkeypatch.setattr(sp, '_memo', {})
+    monkeypatch.delenv('SPEC_CACHE', raising=False)
+    return tmp_path
+
+
+def no_parsing(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('parsed again')
+    monkeypatch.setattr(sp, 'parse_text', fail)
+
+
+@pytest.mark.unit
+def test_continuation_steps_take_the_previous_kind():
+    send = sp.parse_text(SPEC).scenarios[0]
+    assert [(s.keyword, s.kind) for s in send.steps] == [
+        ('Given', 'given'), ('And', 'given'), ('When', 'when'), ('Then', 'then'), ('But', 'then'), ('*', 'then')]
+    assert send.has('then') and send.line == 12
+
+
+@pytest.mark.unit
+def test_background_steps_are_kept_apart():
+    feature = sp.parse_text(SPEC)
+    assert [s.text for s in feature.background] == ['a signed-in vendor', 'an open ledger']
+    assert all(s.text != 'a signed-in vendor' for sc in feature.scenarios for s in sc.steps)
+    assert feature.description == ['In order to get paid', 'As a vendor']
+
+
+@pytest.mark.unit
+def test_tags_attach_to_the_next_block_and_are_inherited_through_tags_for():
+    feature = sp.parse_text(SPEC)
+    send, totals = feature.scenarios
+    assert feature.tags == ['@billing', '@slow']
+    assert send.tags == ['@smoke']
+    assert feature.tags_for(send) == ['@billing', '@slow', '@smoke']
+    assert feature.tags_for(totals) == ['@billing', '@slow']
+
+
+@pytest.mark.unit
+def test_doc_strings_tables_and_examples_are_skipped():
+    send, totals = sp.parse_text(SPEC).scenarios
+    assert len(send.steps) == 6
+    assert totals.keyword == 'Scenario Outline'
+    assert [s.text for s in totals.steps] == ['<n> lines', 'the total is <total>']
+
+
+@pytest.mark.unit
+def test_dict_round_trip():
+    feature = sp.parse_text(SPEC, path='features/invoices.feature', sha='abc')
+    assert sp.Feature.from_dict(feature.to_dict()) == feature
+
+
+@pytest.mark.unit
+def test_memo_serves_identical_content_under_each_path(caches, monkeypatch):
+    monkeypatch.setenv('SPEC_CACHE', '0')
+    first = sp.parse_bytes(SPEC.encode(), 'a.feature')
+    assert not list(caches.iterdir())
+    no_parsing(monkeypatch)
+    second = sp.parse_bytes(SPEC.encode(), 'b.feature')
+    assert (first.path, second.path) == ('a.feature', 'b.feature')
+    assert second.scenarios == first.scenarios
+
+
+@pytest.mark.unit
+def test_disk_cache_survives_a_new_process(caches, monkeypatch):
+    first = sp.parse_bytes(SPEC.encode(), 'a.feature')
+    assert [p.name for p in caches.iterdir()] == [f'v{sp.PARSER_VERSION}-{first.sha}.json']
+    monkeypatch.setattr(sp, '_memo', {})  # as if another tool started
+    no_parsing(monkeypatch)
+    assert sp.parse_bytes(SPEC.encode(), 'a.feature') == first
+
+
+@pytest.mark.unit
+def test_parse_many_goes_through_the_disk_cache(caches, monkeypatch, tmp_path):
+    spec = tmp_path / 'specs' / 'invoices.feature'
+    spec.parent.mkdir()
+    spec.write_bytes(SPEC.encode())
+    first, = sp.parse_many([spec], workers=1)
+    assert (caches / f'v{sp.PARSER_VERSION}-{first.sha}.json').exists()
+    monkeypatch.setattr(sp, '_memo', {})
+    no_parsing(monkeypatch)
+    assert sp.parse_many([spec], workers=1) == [first]
+    assert first.path == str(spec)
@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'scripts'))
+
+import spec_pipeline  # noqa: E402
+from spec_pipeline import Pipeline  # noqa: E402
+
+
+def fail(results):
+    raise RuntimeError('boom')
+
+
+@pytest.mark.unit
+def test_stages_after_a_failure_are_skipped():
+    pipeline = Pipeline()
+    pipeline.stage('parse')(lambda results: ['a.feature'])
+    pipeline.stage('generate', 'parse')(fail)
+    pipeline.stage('estimate', 'parse')(lambda results: len(results['parse']))
+    pipeline.stage('coverage', 'generate')(lambda results: 'never')
+    pipeline.stage('audit', 'coverage', 'estimate')(lambda results: 'never')
+
+    results, timings = pipeline.run()
+    assert results == {'parse': ['a.feature'], 'estimate': 1}
+    assert {name: t.get('status') for name, t in timings.items()} == {
+        'parse': 'ok', 'generate': 'failed', 'estimate': 'ok', 'coverage': 'skipped', 'audit': 'skipped',
+        'total': None}
+    assert 'RuntimeError: boom' in timings['generate']['error']
+
+
+def canned(valid=True, violations=(), audit=(), broken=None):
+    """A pipeline with main()'s result shape, optionally failing stage ``broken``."""
+    outputs = {'validate': {'valid': valid}, 'coverage': {'violations': list(violations)},
+               'audit': {'violations': list(audit)}}
+
+    def build(args):
+        pipeline = Pipeline()
+        for name, result in outputs.items():
+            pipeline.stage(name)(fail if name == broken else (lambda results, result=result: result))
+        return pipeline
+    return build
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('build, argv, code', [
+    (canned(), [], 0),
+    (canned(valid=False), [], 1),
+    (canned(violations=['uncovered']), [], 1),
+    (canned(audit=['unsigned']), [], 1),
+    (canned(audit=['unsigned']), ['--mode', 'sandbox'], 0),
+    (canned(broken='coverage'), [], 2),
+])
+def test_main_exit_codes(monkeypatch, tmp_path, build, argv, code):
+    monkeypatch.setattr(spec_pipeline, 'REPORTS_DIR', tmp_path)
+    monkeypatch.setattr(spec_pipeline, 'build', build)
+    assert spec_pipeline.main(argv + ['--timings', str(tmp_path / 'timings.json')]) == code
+    assert (tmp_path / 'timings.json').exists()
+
+
+@pytest.mark.unit
+def test_validator_takes_the_pipeline_mode(monkeypatch):
+    monkeypatch.setenv('VALIDATION_MODE', 'compliance')
+    assert spec_pipeline.SpecValidator('features', 'reports', mode='sandbox').mode == 'sandbox'
+    assert spec_pipeline.SpecValidator('features', 'reports').mode == 'compliance'
@@ -0,0 +1,47 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.application.main import add_probe_routes
+from src.application.static_responses import StaticJSON
+
+
+@pytest.mark.unit
+def test_static_json_headers_match_body():
+    body = StaticJSON({"status": "ok"})
+    assert body.body == b'{"status":"ok"}'
+    headers = dict(body.raw_headers)
+    assert headers[b'content-length'] == str(len(body.body)).encode()
+    assert headers[b'etag'] == body.etag.encode()
+
+
+@pytest.mark.unit
+def test_build_info_read_once_at_startup(monkeypatch):
+    monkeypatch.setenv('COMMIT_SHA', 'abc123')
+    app = FastAPI()
+    add_probe_routes(app)
+    monkeypatch.setenv('COMMIT_SHA', 'changed')
+    client = TestClient(app)
+    r = client.get('/v1/ping')
+    assert r.json() == {"pong": True, "service": "example-service", "commit": "abc123"}
+
+
+@pytest.mark.unit
+def test_if_none_match_returns_304():
+    app = FastAPI()
+    add_probe_routes(app)
+    client = TestClient(app)
+    first = client.get('/healthz')
+    assert first.json() == {"status": "ok"}
+    r = client.get('/healthz', headers={'If-None-Match': first.headers['etag']})
+    assert r.status_code == 304
+    assert r.content == b''
+
+
+@pytest.mark.unit
+def test_dynamic_mode_matches_static_payload():
+    static_app, dynamic_app = FastAPI(), FastAPI()
+    add_probe_routes(static_app, static=True)
+    add_probe_routes(dynamic_app, static=False)
+    for path in ('/healthz', '/v1/ping'):
+        assert TestClient(static_app).get(path).json() == TestClient(dynamic_app).get(path).json()
@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.application.main import create_app
+from src.core import tracing
+from src.core.tracing import (BatchExporter, RingBufferExporter, Tracer, activate, deactivate,
+                              format_traceparent, inject, parse_traceparent, traced, tracer_from_env)
+
+PARENT = '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'
+
+
+@pytest.fixture
+def ring(monkeypatch):
+    monkeypatch.setenv('TRACE_EXPORTER', 'ring')
+    monkeypatch.delenv('TRACE_SAMPLE_RATE', raising=False)
+    yield
+    tracing.configure(sample_rate=0.0, exporter=RingBufferExporter())
+
+
+@pytest.mark.unit
+def test_traceparent_round_trip_and_rejects_malformed():
+    context = parse_traceparent(PARENT)
+    assert (context.trace_id, context.span_id, context.sampled) == (
+        '4bf92f3577b34da6a3ce929d0e0e4736', '00f067aa0ba902b7', True)
+    assert format_traceparent(context) == PARENT
+    for bad in (None, '', 'garbage', PARENT.replace('-01', '-zz'), '00-' + '0' * 32 + '-00f067aa0ba902b7-01',
+                'ff' + PARENT[2:], PARENT + '-extra', PARENT.upper()):
+        assert parse_traceparent(bad) is None
+
+
+@pytest.mark.unit
+def test_head_sampling_decides_once_per_trace():
+    tracer = Tracer(sample_rate=0.0, exporter=RingBufferExporter())
+    assert tracer.start_span('root') is None
+    unsampled = parse_traceparent(PARENT[:-2] + '00')
+    assert tracer.start_span('child', unsampled) is None
+    tracer.sample_rate = 1.0
+    root = tracer.start_span('root')
+    child = tracer.start_span('child', root.context)
+    assert child.context.trace_id == root.context.trace_id and child.parent_id == root.context.span_id
+
+
+@pytest.mark.unit
+def test_traced_records_children_and_errors():
+    exporter = RingBufferExporter()
+    tracing.configure(exporter=exporter)
+
+    class Service:
+        @traced
+        def ok(self):
+            return 1
+
+        @traced('service.fail')
+        async def fail(self):
+            raise RuntimeError('boom')
+
+    service = Service()
+    assert service.ok() == 1
+    assert exporter.spans() == []  # no current span: nothing recorded
+
+    root = Tracer(sample_rate=1.0, exporter=exporter).start_span('root')
+    token = activate(root)
+    try:
+        service.ok()
+        with pytest.raises(RuntimeError):
+            asyncio.run(service.fail())
+    finally:
+        deactivate(token)
+    ok, fail = exporter.spans()
+    assert ok.name.endswith('Service.ok') and ok.parent_id == root.context.span_id
+    assert fail.name == 'service.fail' and fail.status == 'error'
+    assert fail.attributes['exception.type'] == 'RuntimeError'
+
+
+@pytest.mark.unit
+def test_request_continues_incoming_trace(ring):
+    client = TestClient(create_app())
+    assert client.get('/ping_endpoint', headers={'traceparent': PARENT}).status_code == 200
+    spans = tracing.tracer.exporter.spans('4bf92f3577b34da6a3ce929d0e0e4736')
+    by_kind = {s.kind: s for s in spans}
+    server, service = by_kind['server'], by_kind['internal']
+    assert server.name == 'GET /ping_endpoint' and server.parent_id == '00f067aa0ba902b7'
+    assert server.attributes['http.status_code'] == 200
+    assert service.name == 'PingEndpointService.check' and service.parent_id == server.context.span_id
+
+
+@pytest.mark.unit
+def test_unsampled_requests_record_nothing(ring):
+    client = TestClient(create_app())
+    client.get('/ping_endpoint')
+    client.get('/ping_endpoint', headers={'traceparent': PARENT[:-2] + '00'})
+    assert tracing.tracer.exporter.spans() == []
+
+
+@pytest.mark.unit
+def test_batch_exporter_flushes_and_drops_when_full():
+    batches = []
+    exporter = BatchExporter(batches.append, max_queue=2, batch_size=10, interval=60)
+    tracer = Tracer(sample_rate=1.0, exporter=exporter)
+    for _ in range(3):
+        tracer.start_span('s').finish()
+    assert exporter.dropped == 1
+    assert exporter.flush() == 2
+    assert [span['name'] for span in batches[0]] == ['s', 's']
+
+
+@pytest.mark.unit
+def test_trace_is_propagated_to_responses_and_outbound_calls(ring):
+    app = create_app()
+    seen = {}
+
+    @app.get('/outbound')
+    async def outbound():
+        seen.update(inject({}))
+        return {}
+
+    client = TestClient(app)
+    response = client.get('/outbound', headers={'traceparent': PARENT})
+    server = parse_traceparent(response.headers['traceresponse'])
+    assert server.trace_id == '4bf92f3577b34da6a3ce929d0e0e4736' and server.sampled
+    assert seen['traceparent'] == response.headers['traceresponse']
+
+    unsampled = client.get('/outbound', headers={'traceparent': PARENT[:-2] + '00'})
+    assert unsampled.headers['traceresponse'].endswith('-00')
+    assert seen['traceparent'] == unsampled.headers['traceresponse']
+    assert 'traceresponse' not in client.get('/outbound').headers
+    assert tracing.tracer.exporter.spans() != []
+
+
+@pytest.mark.unit
+def test_batch_exporter_close_drains_queue():
+    batches = []
+    exporter = BatchExporter(batches.append, batch_size=2, interval=60)
+    tracer = Tracer(sample_rate=1.0, exporter=exporter)
+    for _ in range(3):
+        tracer.start_span('s').finish()
+    exporter.close()
+    assert sum(len(batch) for batch in batches) == 3
+    assert exporter._thread is None
+
+
+@pytest.mark.unit
+def test_tracer_from_env_reuses_exporter(monkeypatch, tmp_path):
+    monkeypatch.setenv('TRACE_EXPORTER', 'batch')
+    monkeypatch.setenv('TRACE_EXPORT_PATH', str(tmp_path / 'spans.jsonl'))
+    try:
+        first = tracer_from_env().exporter
+        assert tracer_from_env().exporter is first
+        monkeypatch.setenv('TRACE_EXPORT_PATH', str(tmp_path / 'other.jsonl'))
+        assert tracer_from_env().exporter is not first
+    finally:
+        tracing.shutdown()
+        tracing.configure(sample_rate=0.0, exporter=RingBufferExporter())